@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+# Testing against these bases is enough to make Miller-Rabin deterministic for all n < 3.3 * 10**24.
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(n: int) -> bool:
+    """
+    Checks whether n is prime using the Miller-Rabin primality test.
+    With the fixed bases in MILLER_RABIN_BASES the test is deterministic for n < 3.3 * 10**24,
+    which covers any table size that fits in memory.
+
+    Args:
+        n: the number to be tested.
+
+    Returns:
+        True if n is prime, False otherwise.
+
+    Complexity:
+        Best Case Complexity: O(1), when n is small or divisible by one of the bases.
+        Worst Case Complexity: O(B * log(n)) modular multiplications, where B is the number of bases.
+    """
+    if n < 2:
+        return False
+    for p in MILLER_RABIN_BASES:
+        if n % p == 0:
+            return n == p
+
+    # Write n - 1 as d * 2^r with d odd.
+    d = n - 1
+    r = 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+
+    for a in MILLER_RABIN_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            # a is a witness that n is composite.
+            return False
+    return True
+
+
+def next_prime(n: int) -> int:
+    """
+    Returns the smallest prime larger than or equal to n.
+
+    Complexity:
+        Best Case Complexity: O(1), when n is prime.
+        Worst Case Complexity: O(G * log(n)) where G is the gap to the next prime, which is O(log(n)) on average.
+    """
+    if n <= 2:
+        return 2
+    if n % 2 == 0:
+        n += 1
+    while not is_prime(n):
+        n += 2
+    return n
@@ -0,0 +1,433 @@
+""" Benchmarks for the binary search tree implementations.
+
+Run all of them with:
+
+```
+python -m benchmarks.binary_search_trees
+```
+
+or only some of them by passing their names, e.g. `python -m benchmarks.binary_search_trees sorted`.
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from data_structures.avl_tree import AVLTree
+from data_structures.b_plus_tree import BPlusTree
+from data_structures.b_plus_tree_paged import PagedBPlusTree
+from data_structures.binary_search_tree import BinarySearchTree
+from data_structures.linked_stack import LinkedStack
+from data_structures.red_black_tree import RedBlackTree
+
+
+# Number of sorted keys given to trees which do not rebalance, as they take quadratic time to build.
+DEGENERATE_KEYS = 2000
+
+
+def timed(function, *args) -> float:
+    """ Returns the time taken (in seconds) to call function(*args). """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def height(tree) -> int:
+    """ Returns the height of a tree, walking it without recursion. """
+    res = 0
+    stack = LinkedStack()
+    if tree._root is not None:
+        stack.push((tree._root, 1))
+    while not stack.is_empty():
+        node, depth = stack.pop()
+        res = max(res, depth)
+        for child in (node._left, node._right):
+            if child is not None:
+                stack.push((child, depth + 1))
+    return res
+
+
+class CountingAVLTree(AVLTree):
+    """ AVL tree which counts its rotations. """
+    rotations = 0
+
+    def _rotate_left(self, current):
+        self.rotations += 1
+        return AVLTree._rotate_left(self, current)
+
+    def _rotate_right(self, current):
+        self.rotations += 1
+        return AVLTree._rotate_right(self, current)
+
+
+class CountingRedBlackTree(RedBlackTree):
+    """ Red-black tree which counts its rotations. """
+    rotations = 0
+
+    def _rotate_left(self, current):
+        self.rotations += 1
+        RedBlackTree._rotate_left(self, current)
+
+    def _rotate_right(self, current):
+        self.rotations += 1
+        RedBlackTree._rotate_right(self, current)
+
+
+def insert_all(tree, keys) -> None:
+    for key in keys:
+        tree[key] = key
+
+
+def lookup_all(tree, keys) -> None:
+    for key in keys:
+        _ = tree[key]
+
+
+def delete_all(tree, keys) -> None:
+    for key in keys:
+        del tree[key]
+
+
+def benchmark_sorted(n: int = 1_000_000) -> None:
+    """
+    Inserts n sorted keys into an AVL tree, then looks every one of them up, reporting the
+    time per operation and the height of the tree.
+    A BinarySearchTree degenerates into a linked list on sorted keys, which takes quadratic time
+    to build, so it is only run on the first DEGENERATE_KEYS keys.
+    """
+    print(f"{'tree':<20}{'keys':>10}{'insert':>14}{'lookup':>14}{'height':>10}")
+    bst_keys = range(min(n, DEGENERATE_KEYS))
+    for tree, keys in ((BinarySearchTree(), bst_keys), (AVLTree(), range(n))):
+        insert = timed(insert_all, tree, keys) / len(keys)
+        lookup = timed(lookup_all, tree, keys) / len(keys)
+        print(f"{type(tree).__name__:<20}{len(keys):>10,}{insert * 1e6:>11.2f}us{lookup * 1e6:>11.2f}us{height(tree):>10}")
+
+
+def benchmark_balanced(n: int = 100_000) -> None:
+    """
+    Compares the throughput of inserting n keys, looking them all up and deleting them all
+    (in a different random order) between BinarySearchTree, AVLTree and RedBlackTree, on random
+    and sorted keys, along with the height of the full tree and the rotations made while
+    inserting and while deleting.
+    On sorted keys, BinarySearchTree only gets the first DEGENERATE_KEYS keys (see benchmark_sorted).
+    """
+    random.seed(0)
+    workloads = {
+        "random": random.sample(range(10 * n), n),
+        "sorted": list(range(n)),
+    }
+    for name, keys in workloads.items():
+        print(f"-- {name} --")
+        print(f"{'tree':<16}{'keys':>10}{'insert':>12}{'lookup':>12}{'delete':>12}{'height':>8}"
+              f"{'rotations':>12}{'(delete)':>10}")
+        for tree_type in (BinarySearchTree, CountingAVLTree, CountingRedBlackTree):
+            tree_keys = keys
+            if tree_type is BinarySearchTree and name == "sorted":
+                tree_keys = keys[:DEGENERATE_KEYS]
+            deletions = random.sample(tree_keys, len(tree_keys))
+            tree = tree_type()
+            insert = timed(insert_all, tree, tree_keys) / len(tree_keys)
+            lookup = timed(lookup_all, tree, deletions) / len(tree_keys)
+            tree_height = height(tree)
+            insert_rotations = getattr(tree, 'rotations', 0)
+            delete = timed(delete_all, tree, deletions) / len(tree_keys)
+            delete_rotations = getattr(tree, 'rotations', 0) - insert_rotations
+            print(f"{tree_type.__name__.replace('Counting', ''):<16}{len(tree_keys):>10,}{insert * 1e6:>10.2f}us"
+                  f"{lookup * 1e6:>10.2f}us{delete * 1e6:>10.2f}us{tree_height:>8}{insert_rotations:>12,}{delete_rotations:>10,}")
+
+
+def recursive_lookup(tree, key):
+    """ The recursive lookup BinarySearchTree used to have, rebuilding its closure on every call. """
+    def get_tree_node_by_key(current, key):
+        if current is None:
+            raise KeyError(f'Key not found: {key}')
+        elif key == current._key:
+            return current
+        elif key < current._key:
+            return get_tree_node_by_key(current._left, key)
+        else:
+            return get_tree_node_by_key(current._right, key)
+
+    return get_tree_node_by_key(tree._root, key)._item
+
+
+def benchmark_lookup(n: int = 100_000, degenerate: int = 900) -> None:
+    """
+    Compares the throughput of looking up every key of a BinarySearchTree with the iterative
+    lookup against the recursive one it replaced, on a tree of n random keys (balanced on average)
+    and on a degenerate tree of sorted keys (short enough for the recursive lookup to work).
+    """
+    random.seed(0)
+    workloads = {
+        "balanced": random.sample(range(10 * n), n),
+        "degenerate": list(range(degenerate)),
+    }
+    print(f"{'tree':<12}{'keys':>10}{'height':>8}{'recursive':>14}{'iterative':>14}{'speedup':>9}")
+    for name, keys in workloads.items():
+        tree = BinarySearchTree()
+        insert_all(tree, keys)
+        recursive = timed(lambda: [recursive_lookup(tree, key) for key in keys]) / len(keys)
+        iterative = timed(lookup_all, tree, keys) / len(keys)
+        print(f"{name:<12}{len(keys):>10,}{height(tree):>8}{1 / recursive:>12,.0f}/s"
+              f"{1 / iterative:>12,.0f}/s{recursive / iterative:>9.1f}x")
+
+
+def iterated_rank(tree, key) -> int:
+    """ Counts the keys smaller than key by iterating the tree in order, as without subtree sizes. """
+    res = 0
+    for other, _ in tree:
+        if other >= key:
+            break
+        res += 1
+    return res
+
+
+def benchmark_rank(n: int = 100_000, queries: int = 200) -> None:
+    """
+    Ranks random scores in a leaderboard of n scores, comparing rank() (which walks down the tree
+    using the subtree sizes) against counting the smaller scores with an in-order iteration,
+    and times kth_smallest and count_range.
+    """
+    random.seed(0)
+    scores = random.sample(range(10 * n), n)
+    probes = [random.randrange(10 * n) for _ in range(queries)]
+    print(f"{'tree':<16}{'keys':>10}{'iterated':>14}{'rank':>12}{'speedup':>10}{'kth':>12}{'range':>12}")
+    for tree_type in (BinarySearchTree, AVLTree, RedBlackTree):
+        tree = tree_type()
+        insert_all(tree, scores)
+        iterated = timed(lambda: [iterated_rank(tree, key) for key in probes]) / queries
+        ranked = timed(lambda: [tree.rank(key) for key in probes]) / queries
+        kth = timed(lambda: [tree.kth_smallest(1 + key % n) for key in probes]) / queries
+        ranges = timed(lambda: [tree.count_range(key, key + n) for key in probes]) / queries
+        print(f"{tree_type.__name__:<16}{n:>10,}{iterated * 1e6:>12.0f}us{ranked * 1e6:>10.2f}us"
+              f"{iterated / ranked:>9.0f}x{kth * 1e6:>10.2f}us{ranges * 1e6:>10.2f}us")
+
+
+def filtered_range(tree, low, high) -> list:
+    """ Collects the pairs with keys in [low, high) by iterating the whole tree in order. """
+    return [(key, item) for key, item in tree if low <= key < high]
+
+
+def benchmark_range(n: int = 1_000_000, width: int = 100, queries: int = 20) -> None:
+    """
+    Collects the width keys following random keys of a red-black tree of n keys, comparing
+    range_iter (which only goes into the subtrees in range) against filtering a full in-order
+    iteration, and times floor and successor.
+    """
+    random.seed(0)
+    tree = RedBlackTree()
+    insert_all(tree, random.sample(range(n), n))
+    starts = [random.randrange(n - width) for _ in range(queries)]
+    filtered = timed(lambda: [filtered_range(tree, low, low + width) for low in starts]) / queries
+    ranged = timed(lambda: [list(tree.range_iter(low, low + width)) for low in starts]) / queries
+    bounds = timed(lambda: [(tree.floor(low + 0.5), tree.successor(low)) for low in starts]) / queries
+    print(f"{'keys':>10}{'width':>8}{'filtered':>14}{'range_iter':>14}{'speedup':>10}{'floor+succ':>14}")
+    print(f"{n:>10,}{width:>8}{filtered * 1e3:>12.1f}ms{ranged * 1e6:>12.1f}us"
+          f"{filtered / ranged:>9.0f}x{bounds * 1e6:>12.2f}us")
+
+
+class LinkedInOrderIterator:
+    """ The in-order iterator BinarySearchTree used to have, allocating a node of a LinkedStack per push. """
+
+    def __init__(self, root) -> None:
+        self._stack = LinkedStack()
+        self._current = root
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while self._current:
+            self._stack.push(self._current)
+            self._current = self._current._left
+        if self._stack.is_empty():
+            raise StopIteration
+        result = self._stack.pop()
+        self._current = result._right
+        return result._key, result._item
+
+
+def consume(iterator) -> None:
+    for _ in iterator:
+        pass
+
+
+def benchmark_iterate(n: int = 1_000_000) -> None:
+    """
+    Compares the throughput of iterating an AVL tree of n random keys in order with the former
+    LinkedStack iterator, the ArrayStack one and the Morris one, along with pre-order and
+    post-order iteration and items().
+    """
+    random.seed(0)
+    tree = AVLTree()
+    insert_all(tree, random.sample(range(10 * n), n))
+    iterators = {
+        "linked in-order": lambda: LinkedInOrderIterator(tree._root),
+        "array in-order": lambda: iter(tree),
+        "morris in-order": tree.morris_iter,
+        "pre-order": tree.pre_iter,
+        "post-order": tree.post_iter,
+    }
+    print(f"{'iterator':<20}{'keys':>10}{'per key':>12}")
+    for name, make in iterators.items():
+        per_key = timed(lambda: consume(make())) / n
+        print(f"{name:<20}{n:>10,}{per_key * 1e9:>10.0f}ns")
+    per_key = timed(tree.items) / n
+    print(f"{'items()':<20}{n:>10,}{per_key * 1e9:>10.0f}ns")
+
+
+def benchmark_bulk(n: int = 1_000_000) -> None:
+    """
+    Compares building each tree from n sorted keys with from_sorted against inserting them one by
+    one (only DEGENERATE_KEYS for BinarySearchTree, see benchmark_sorted), along with the heights
+    of the trees. Then rebalances the degenerate BinarySearchTree with rebuild, and compares the
+    throughput of looking all its keys up before and after.
+    """
+    print(f"{'tree':<20}{'keys':>10}{'insert':>12}{'from_sorted':>14}{'speedup':>9}{'height':>8}{'(sorted)':>10}")
+    for tree_type in (BinarySearchTree, AVLTree, RedBlackTree):
+        keys = range(min(n, DEGENERATE_KEYS)) if tree_type is BinarySearchTree else range(n)
+        inserted = tree_type()
+        insert = timed(insert_all, inserted, keys)
+        start = time.perf_counter()
+        built = tree_type.from_sorted(keys)
+        bulk = time.perf_counter() - start
+        print(f"{tree_type.__name__:<20}{len(keys):>10,}{insert:>11.2f}s{bulk:>13.2f}s{insert / bulk:>8.1f}x"
+              f"{height(inserted):>8}{height(built):>10}")
+
+    tree = BinarySearchTree()
+    keys = range(min(n, DEGENERATE_KEYS))
+    insert_all(tree, keys)
+    before = timed(lookup_all, tree, keys) / len(keys)
+    rebuild = timed(tree.rebuild)
+    after = timed(lookup_all, tree, keys) / len(keys)
+    print(f"rebuild of {len(keys):,} keys: {rebuild * 1e3:.2f}ms, lookups {before * 1e6:.2f}us -> {after * 1e6:.2f}us "
+          f"(height {height(tree)})")
+
+
+def benchmark_b_plus(n: int = 500_000, fanouts: tuple = (8, 32, 128)) -> None:
+    """
+    Compares the memory per key (measured with tracemalloc while inserting) and the lookup,
+    insertion and range scan throughput of BPlusTree with a few fanouts against BinarySearchTree
+    and AVLTree, on n random keys. Also times bulk loading the same keys (from_sorted).
+    """
+    random.seed(0)
+    keys = random.sample(range(10 * n), n)
+    probes = random.sample(keys, min(n, 100_000))
+    trees = [("BinarySearchTree", BinarySearchTree), ("AVLTree", AVLTree)]
+    trees += [(f"BPlusTree({fanout})", lambda fanout=fanout: BPlusTree(fanout)) for fanout in fanouts]
+    print(f"{'tree':<18}{'keys':>10}{'bytes/key':>11}{'insert':>10}{'lookup':>10}{'scan':>10}{'height':>8}")
+    for name, make in trees:
+        tree = make()
+        tracemalloc.start()
+        insert = timed(insert_all, tree, keys) / n
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        # Insert again untraced, as tracing slows insertions down.
+        tree = make()
+        insert = timed(insert_all, tree, keys) / n
+        lookup = timed(lookup_all, tree, probes) / len(probes)
+        scan = timed(lambda: sum(1 for _ in tree.range_iter())) / n
+        tree_height = tree.height() if isinstance(tree, (BPlusTree, AVLTree)) else height(tree)
+        print(f"{name:<18}{n:>10,}{memory / n:>11.0f}{insert * 1e6:>8.2f}us{lookup * 1e6:>8.2f}us"
+              f"{scan * 1e9:>8.0f}ns{tree_height:>8}")
+
+    ordered = sorted(keys)
+    for fanout in fanouts:
+        bulk = timed(BPlusTree.from_sorted, ordered, False, fanout)
+        print(f"BPlusTree({fanout}).from_sorted of {n:,} keys: {bulk:.2f}s")
+
+
+def benchmark_paged(n: int = 500_000, fanout: int = 128, pools: tuple = (4, 64, 1024, 8192)) -> None:
+    """
+    Bulk loads n keys into a PagedBPlusTree in a temporary file, then, for a few buffer pool sizes,
+    reopens it and measures the pages read per random lookup, the pool hit rate and the lookup time.
+    A pool holding the upper levels of the tree brings the reads per lookup well below its height.
+    """
+    random.seed(0)
+    probes = random.sample(range(n), min(n, 20_000))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tree.bpt")
+        start = time.perf_counter()
+        tree = PagedBPlusTree.from_sorted(range(n), False, path, fanout=fanout)
+        tree.close()
+        print(f"PagedBPlusTree({fanout}).from_sorted of {n:,} keys: {time.perf_counter() - start:.2f}s, "
+              f"{tree._pages:,} pages, {os.path.getsize(path) / 2 ** 20:.1f}MiB, height {tree.height()}")
+        print(f"{'pool pages':>10}{'reads/lookup':>14}{'hit rate':>10}{'lookup':>10}")
+        for pages in pools:
+            with PagedBPlusTree(path, buffer_pages=pages) as tree:
+                lookup = timed(lookup_all, tree, probes) / len(probes)
+                stats = tree.pool_stats()
+                print(f"{pages:>10,}{stats['reads'] / len(probes):>14.2f}{stats['hit_rate']:>10.2f}"
+                      f"{lookup * 1e6:>8.2f}us")
+
+
+def shuffled_items(tree) -> list:
+    """
+    Returns the pairs of items() in random order, as inserting them in key order would make
+    BinarySearchTree degenerate.
+    """
+    pairs = list(tree.items())
+    random.shuffle(pairs)
+    return pairs
+
+
+def reinserted_split(tree, key):
+    """ Splits a tree the way split replaces: inserting the pairs of items() one by one. """
+    left, right = type(tree)(), type(tree)()
+    for pair_key, item in shuffled_items(tree):
+        (left if pair_key < key else right)[pair_key] = item
+    return left, right
+
+
+def reinserted_union(tree, other):
+    """ Merges two trees the way union replaces: inserting the pairs of items() one by one. """
+    res = type(tree)()
+    for source in (tree, other):
+        for key, item in shuffled_items(source):
+            res[key] = item
+    return res
+
+
+def benchmark_merge(n: int = 200_000) -> None:
+    """
+    Compares split, join and union, which merge in-order sequences into balanced trees, against
+    inserting the pairs of items() one by one, for trees of n random keys.
+    """
+    random.seed(0)
+    keys = random.sample(range(10 * n), n)
+    other_keys = random.sample(range(10 * n), n)
+    print(f"{'tree':<18}{'split':>10}{'(insert)':>10}{'join':>10}{'union':>10}{'(insert)':>10}")
+    for tree_type in (BinarySearchTree, AVLTree, RedBlackTree):
+        tree, other = tree_type(), tree_type()
+        insert_all(tree, keys)
+        insert_all(other, other_keys)
+        split = timed(tree.split, 5 * n)
+        split_insert = timed(reinserted_split, tree, 5 * n)
+        left, right = tree.split(5 * n)
+        join = timed(tree_type.join, left, right)
+        union = timed(tree.union, other)
+        union_insert = timed(reinserted_union, tree, other)
+        print(f"{tree_type.__name__:<18}{split:>9.2f}s{split_insert:>9.2f}s{join:>9.2f}s{union:>9.2f}s{union_insert:>9.2f}s")
+
+
+BENCHMARKS = {
+    "sorted": benchmark_sorted,
+    "balanced": benchmark_balanced,
+    "lookup": benchmark_lookup,
+    "rank": benchmark_rank,
+    "range": benchmark_range,
+    "iterate": benchmark_iterate,
+    "bulk": benchmark_bulk,
+    "b_plus": benchmark_b_plus,
+    "paged": benchmark_paged,
+    "merge": benchmark_merge,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
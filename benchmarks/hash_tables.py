@@ -0,0 +1,279 @@
+""" Benchmarks for the hash table implementations.
+
+Run all of them with:
+
+```
+python -m benchmarks.hash_tables
+```
+
+or only some of them by passing their names, e.g. `python -m benchmarks.hash_tables swiss`.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from data_structures.hash_table_linear_probing import LinearProbeTable
+from data_structures.hash_table_quadratic_probing import QuadraticProbeTable
+from data_structures.hash_table_double_hashing import DoubleHashingTable
+from data_structures.hash_table_separate_chaining import HashTableSeparateChaining
+from data_structures.hash_table_swiss import SwissTable
+from data_structures.hash_table_incremental_rehashing import IncrementalRehashTable
+from data_structures.hash_table_concurrent import ConcurrentHashTable
+
+
+class CountingKey(str):
+    """ String key which counts how many times it is compared for equality. """
+    comparisons = 0
+
+    def __eq__(self, other: object) -> bool:
+        CountingKey.comparisons += 1
+        return str.__eq__(self, other)
+
+    __hash__ = str.__hash__
+
+
+def timed(function, *args) -> float:
+    """ Returns the time taken (in seconds) to call function(*args). """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def benchmark_swiss(n: int = 100_000) -> None:
+    """
+    Compares linear probing against the Swiss table on n hits and n misses,
+    reporting the number of key comparisons and the time taken.
+    """
+    keys = [CountingKey(f"key-{i}") for i in range(n)]
+    missing = [CountingKey(f"missing-{i}") for i in range(n)]
+
+    def lookup(table, lookup_keys):
+        for key in lookup_keys:
+            _ = key in table
+
+    print(f"{'table':<20}{'hit cmps':>12}{'miss cmps':>12}{'hit time':>12}{'miss time':>12}")
+    for table_type in (LinearProbeTable, SwissTable):
+        table = table_type()
+        for key in keys:
+            table[key] = None
+
+        CountingKey.comparisons = 0
+        hit_time = timed(lookup, table, keys)
+        hit_comparisons = CountingKey.comparisons
+
+        CountingKey.comparisons = 0
+        miss_time = timed(lookup, table, missing)
+        miss_comparisons = CountingKey.comparisons
+
+        print(f"{table_type.__name__:<20}{hit_comparisons:>12}{miss_comparisons:>12}"
+              f"{hit_time:>11.3f}s{miss_time:>11.3f}s")
+
+
+def benchmark_incremental(n: int = 400_000) -> None:
+    """
+    Compares the latency of single inserts with a full rehash (LinearProbeTable)
+    against incremental rehashing, reporting the maximum and total insert times.
+    """
+    keys = [f"key-{i}" for i in range(n)]
+
+    print(f"{'table':<25}{'max insert':>12}{'total':>12}")
+    for table_type in (LinearProbeTable, IncrementalRehashTable):
+        table = table_type()
+        worst = 0.0
+        total_start = time.perf_counter()
+        for key in keys:
+            start = time.perf_counter()
+            table[key] = None
+            worst = max(worst, time.perf_counter() - start)
+        total = time.perf_counter() - total_start
+        print(f"{table_type.__name__:<25}{worst * 1000:>10.2f}ms{total:>11.3f}s")
+
+
+def benchmark_bulk(n: int = 200_000) -> None:
+    """
+    Compares loading n items into each table with a loop of inserts against a single update,
+    as well as n lookups with get_many and deleting half of them with delete_many.
+    """
+    items = [(f"key-{i}", i) for i in range(n)]
+    keys = [key for key, _ in items]
+
+    def insert_loop(table):
+        for key, value in items:
+            table[key] = value
+
+    def get_loop(table):
+        for key in keys:
+            _ = table[key]
+
+    def delete_loop(table):
+        for key in keys[::2]:
+            del table[key]
+
+    print(f"{'table':<28}{'insert loop':>12}{'update':>12}{'get loop':>12}{'get_many':>12}"
+          f"{'del loop':>12}{'delete_many':>12}")
+    for table_type in (LinearProbeTable, QuadraticProbeTable, DoubleHashingTable, SwissTable,
+                       IncrementalRehashTable, HashTableSeparateChaining):
+        looped = table_type()
+        bulk = table_type()
+        times = [
+            timed(insert_loop, looped), timed(bulk.update, items),
+            timed(get_loop, looped), timed(bulk.get_many, keys),
+            # Deleting a single key from a quadratic probing (or double hashing) table rebuilds
+            # the whole table, so deleting in a loop would take hours.
+            float('nan') if isinstance(looped, QuadraticProbeTable) else timed(delete_loop, looped),
+            timed(bulk.delete_many, keys[::2]),
+        ]
+        print(f"{table_type.__name__:<28}" + "".join(f"{t:>11.3f}s" for t in times))
+
+
+def benchmark_iteration(n: int = 200_000) -> None:
+    """
+    Compares walking every key of each table through keys() against iter_keys(),
+    reporting the time taken and the peak memory allocated while walking.
+    """
+    def walk(keys):
+        for _ in keys:
+            pass
+
+    print(f"{'table':<28}{'keys()':>12}{'peak':>12}{'iter_keys()':>12}{'peak':>12}")
+    for table_type in (LinearProbeTable, SwissTable, IncrementalRehashTable, HashTableSeparateChaining):
+        table = table_type()
+        table.update((f"key-{i}", i) for i in range(n))
+        results = []
+        for keys in (table.keys, table.iter_keys):
+            tracemalloc.start()
+            results.append(timed(lambda: walk(keys())))
+            results.append(tracemalloc.get_traced_memory()[1] / 2 ** 20)
+            tracemalloc.stop()
+        print(f"{table_type.__name__:<28}{results[0]:>11.3f}s{results[1]:>10.2f}MB"
+              f"{results[2]:>11.3f}s{results[3]:>10.2f}MB")
+
+
+def benchmark_stats(n: int = 100_000) -> None:
+    """
+    Loads n keys from a few key distributions into each table with statistics enabled, then
+    looks up every key and as many missing ones, reporting the average and longest probes,
+    the largest cluster (or chain), and the time spent rehashing.
+    """
+    distributions = {
+        "strings": [f"key-{i}" for i in range(n)],
+        "sequential ints": list(range(n)),
+        "strided ints": [i * 1024 for i in range(n)],
+    }
+    for name, keys in distributions.items():
+        print(f"-- {name} --")
+        print(f"{'table':<28}{'avg probe':>12}{'max probe':>12}{'max cluster':>12}{'rehash time':>12}")
+        for table_type in (LinearProbeTable, QuadraticProbeTable, DoubleHashingTable, SwissTable,
+                           IncrementalRehashTable, HashTableSeparateChaining):
+            table = table_type()
+            table.enable_stats()
+            for key in keys:
+                table[key] = None
+            for key in keys:
+                _ = table.get(key)
+                _ = table.get(-1 - key if type(key) is int else f"missing-{key}")
+            stats = table.stats()
+            cluster = stats.get('max_cluster', stats.get('max_chain'))
+            print(f"{table_type.__name__:<28}{stats['average_probe_length']:>12.2f}{stats['max_probe_length']:>12}"
+                  f"{cluster:>12}{stats['rehash_time']:>11.3f}s")
+
+
+class LockedTable:
+    """ A LinearProbeTable behind a single lock, as a baseline for ConcurrentHashTable. """
+
+    def __init__(self) -> None:
+        self.table = LinearProbeTable()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.table.get(key, default)
+
+    def __setitem__(self, key, data) -> None:
+        with self.lock:
+            self.table[key] = data
+
+
+def benchmark_concurrent(n: int = 100_000, operations: int = 400_000) -> None:
+    """
+    Splits the given number of operations (90% lookups, 10% updates) over a number of threads
+    sharing one table preloaded with n keys, reporting the throughput by thread count.
+    With the global interpreter lock only one thread runs Python code at a time, so neither
+    table scales with threads there; lock striping pays off on free-threaded builds.
+    """
+    keys = [f"key-{i}" for i in range(n)]
+
+    def work(table, thread, count):
+        for i in range(count):
+            key = keys[(thread * 7919 + i * 31) % n]
+            if i % 10 == 0:
+                table[key] = i
+            else:
+                table.get(key)
+
+    print(f"{'threads':<10}" + "".join(f"{name:>24}" for name in ("LockedTable", "ConcurrentHashTable")))
+    for threads in (1, 2, 4, 8):
+        row = f"{threads:<10}"
+        for table in (LockedTable(), ConcurrentHashTable()):
+            for key in keys:
+                table[key] = 0
+            workers = [threading.Thread(target=work, args=(table, thread, operations // threads))
+                       for thread in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            row += f"{operations / (time.perf_counter() - start):>17,.0f} ops/s"
+        print(row)
+
+
+def benchmark_persistence(n: int = 200_000) -> None:
+    """
+    Compares restoring a table of n string keys by reinserting every item against loading a
+    dump of its layout, and opening the dump mapped, which only reads the slots a lookup probes.
+    Also reports the size of the dump and the time to look up 1000 keys in the mapped table.
+    """
+    print(f"{'table':<28}{'reinsert':>10}{'dump':>10}{'load':>10}{'mapped':>10}{'lookups':>10}{'size':>10}")
+    for table_type in (LinearProbeTable, IncrementalRehashTable, SwissTable):
+        # Swiss tables hash strings with the builtin hash, so int keys keep their layout portable.
+        keys = [f"key-{i}" for i in range(n)] if table_type is not SwissTable else list(range(0, 7 * n, 7))
+        table = table_type()
+        table.update((key, i) for i, key in enumerate(keys))
+        reinsert = timed(lambda: table_type().update(table.items()))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "table.bin")
+            with open(path, "wb") as fileobj:
+                dump = timed(table.dump, fileobj)
+            with open(path, "rb") as fileobj:
+                load = timed(table_type.load, fileobj)
+            with open(path, "rb") as fileobj:
+                start = time.perf_counter()
+                mapped = table_type.load(fileobj, mapped=True)
+                mapped_time = time.perf_counter() - start
+            lookups = timed(lambda: [mapped[key] for key in keys[:1000]])
+            mapped.close()
+            size = os.path.getsize(path) / 2 ** 20
+        print(f"{table_type.__name__:<28}{reinsert:>9.3f}s{dump:>9.3f}s{load:>9.3f}s{mapped_time:>9.4f}s"
+              f"{lookups:>9.4f}s{size:>8.2f}MB")
+
+
+BENCHMARKS = {
+    "swiss": benchmark_swiss,
+    "incremental": benchmark_incremental,
+    "bulk": benchmark_bulk,
+    "iteration": benchmark_iteration,
+    "stats": benchmark_stats,
+    "concurrent": benchmark_concurrent,
+    "persistence": benchmark_persistence,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
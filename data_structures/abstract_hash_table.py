@@ -1,26 +1,378 @@
 from __future__ import annotations
+import hashlib
+import io
+import numbers
+import pickle
+import random
+import struct
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, Tuple
+from typing import TypeVar, Generic, Tuple, Iterable, Iterator, BinaryIO, Mapping
 from data_structures.referential_array import ArrayR
+from data_structures.hash_table_stats import HashTableStats
 
 K = TypeVar('K')
 V = TypeVar('V')
 
+# Mersenne prime used as the modulus of the universal hash function.
+HASH_PRIME = 2 ** 61 - 1
+
+# Default value which tells lookups apart from any value a table can store.
+_MISSING = object()
+
+# Start of every file written by HashTable.dump, followed by its format version.
+DUMP_MAGIC = b"FITHT\x01"
+
+def _length_prefixed(part: bytes) -> bytes:
+    """ Prefixes the bytes with their length, so that concatenated parts cannot be confused. """
+    return len(part).to_bytes(8, 'little') + part
+
+def _int_bytes(value: int) -> bytes:
+    """ Encodes an int of any size as signed little-endian bytes. """
+    return value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+
+def _key_bytes(key) -> bytes:
+    """
+    Encodes the whole key as bytes for the keyed hash of seeded tables (see HashTable._universal_hash),
+    so that equal keys get the same bytes. Numbers are encoded by their exact value as a ratio
+    of integers, so that for example -1, -1.0, Fraction(-1) and Decimal(-1) all give the same
+    bytes. str, bytes, tuple and frozenset keys, and numbers, are encoded in full, without going
+    through the builtin hash. Any other key is encoded by its builtin hash.
+    :complexity: O(K) where K is the size of the key.
+    """
+    if isinstance(key, str):
+        return b'S' + key.encode('utf-8', 'surrogatepass')
+    if isinstance(key, bytes):
+        return b'B' + key
+    if isinstance(key, tuple):
+        return b'T' + b''.join(_length_prefixed(_key_bytes(part)) for part in key)
+    if isinstance(key, frozenset):
+        # The items are sorted by their encoding, since a frozenset has no order.
+        return b'F' + b''.join(sorted(_length_prefixed(_key_bytes(part)) for part in key))
+    if isinstance(key, numbers.Number):
+        if isinstance(key, complex):
+            if key.imag != 0:
+                return b'C' + _length_prefixed(_key_bytes(key.real)) + _key_bytes(key.imag)
+            key = key.real
+        try:
+            if isinstance(key, numbers.Rational):
+                numerator, denominator = key.numerator, key.denominator
+            else:
+                # float and Decimal, which raise for infinities and NaN.
+                numerator, denominator = key.as_integer_ratio()
+        except (AttributeError, OverflowError, ValueError):
+            pass
+        else:
+            if denominator == 1:
+                return b'I' + _int_bytes(numerator)
+            return b'Q' + _length_prefixed(_int_bytes(numerator)) + _int_bytes(denominator)
+    return b'H' + _int_bytes(hash(key))
+
+class _TableUnpickler(pickle.Unpickler):
+    """
+    Unpickler for the files written by HashTable.dump. A pickle can name any global, such as
+    os.system, and have it called while loading, so only the builtin types of keys and data
+    (SAFE_GLOBALS) and the hash table classes (for the header of a ConcurrentHashTable) are
+    allowed. Keys or data of any other class cannot be loaded.
+    """
+    SAFE_GLOBALS = {('builtins', name) for name in ('bool', 'bytearray', 'bytes', 'complex', 'dict', 'float',
+                                                    'frozenset', 'int', 'list', 'range', 'set', 'slice',
+                                                    'str', 'tuple')}
+    SAFE_GLOBALS |= {('fractions', 'Fraction'), ('decimal', 'Decimal')}
+
+    def find_class(self, module: str, name: str) -> type:
+        """
+        :raises pickle.UnpicklingError: when the global is not allowed.
+        """
+        if (module, name) in _TableUnpickler.SAFE_GLOBALS:
+            return super().find_class(module, name)
+        if module.startswith('data_structures.'):
+            cls = super().find_class(module, name)
+            if isinstance(cls, type) and issubclass(cls, HashTable):
+                return cls
+        raise pickle.UnpicklingError(f"{module}.{name} cannot be loaded from a hash table file.")
+
 class HashTable(ABC, Generic[K, V]):
     """
     Hash Table (Map/Dictionary) ADT. 
+
+    Each table draws its own random parameters for the universal hash function used on
+    keys which are not strings (see _universal_hash).
+    The polynomial hash used on strings has fixed parameters, so anyone who knows them can
+    craft keys which all collide, and the same goes for int keys, whose builtin hash is
+    reduced modulo HASH_PRIME. Tables created with seeded=True hash every key, strings
+    included, with a keyed hash of the whole key, so that colliding keys cannot be predicted
+    for a given table.
+
+    Tables count their structural modifications (adding or removing a key, resizing) in
+    _modifications, so that the iteration views (iter_items, iter_keys and iter_values)
+    can detect when the table is modified while they are being iterated.
+    Updating the data of an existing key is not a structural modification.
+
+    Statistics are opt-in (see enable_stats). While they are disabled, _stats is None and
+    the only cost is checking it.
+
+    Tables can be written to a binary file with dump, and read back with load.
+    A file starts with DUMP_MAGIC and a header (a pickled dictionary, prefixed with its
+    length as a little-endian 64 bit integer) describing the table, followed by the
+    (key, data) pairs, each pickled separately. Files are read with _TableUnpickler, which
+    refuses any global besides the builtin types and the table classes; even so, only load
+    files which come from a trusted source.
     """
 
-    def insert(self, key: str, data: V) -> None:
+    def __init__(self, seeded: bool = False) -> None:
+        self._seeded = seeded
+        self._hash_a = random.randrange(1, HASH_PRIME)
+        self._hash_b = random.randrange(HASH_PRIME)
+        self._modifications = 0
+        self._stats: HashTableStats | None = None
+
+    @classmethod
+    def with_capacity(cls, capacity: int, *args, **kwargs) -> HashTable[K, V]:
+        """
+        Creates a table big enough to hold the given number of items without resizing.
+        The remaining arguments are passed to the constructor.
+        """
+        table = cls(*args, **kwargs)
+        table.reserve(capacity)
+        return table
+
+    def enable_stats(self) -> None:
+        """
+        Starts recording probe lengths and rehashes, discarding anything recorded before.
+        """
+        self._stats = HashTableStats()
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording probe lengths and rehashes.
+        """
+        self._stats = None
+
+    def stats(self) -> dict:
+        """
+        Returns statistics about the table as a dictionary.
+        The load factor and the statistics about the layout of the table (computed by each table,
+        see _layout_stats) are always included. The recorded counters (see HashTableStats)
+        are only included while statistics are enabled.
+        """
+        res = {
+            'size': len(self),
+            'table_size': self.table_size,
+            'load_factor': self.load_factor(),
+        }
+        res.update(self._layout_stats())
+        if self._stats is not None:
+            res.update(self._stats.as_dict())
+        return res
+
+    def _layout_stats(self) -> dict:
+        """
+        Returns statistics computed from the current layout of the table, such as cluster or chain lengths.
+        """
+        return {}
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Makes room for the given number of items, so that inserting them does not resize the table.
+        Tables which do not resize have nothing to do.
+        """
+        pass
+
+    def insert(self, key: K, data: V) -> None:
         """
         Utility method to call our setitem method
         """
         self[key] = data
 
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """
+        Returns the data associated to the key, or default when the key doesn't exist.
+        Tables override this with a lookup which does not raise an exception on a miss.
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key: K, default: V | None = None) -> V | None:
+        """
+        Returns the data associated to the key, first setting it to default when the key doesn't exist.
+        """
+        data = self.get(key, _MISSING)
+        if data is _MISSING:
+            self[key] = default
+            return default
+        return data
+
+    def pop(self, key: K, default: V = _MISSING) -> V:
+        """
+        Deletes the key and returns its data, or returns default when the key doesn't exist.
+        :raises KeyError: when the key doesn't exist and no default is given.
+        """
+        data = self.get(key, _MISSING)
+        if data is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        del self[key]
+        return data
+
+    def update(self, items: Iterable[Tuple[K, V]] | Mapping[K, V]) -> None:
+        """
+        Set every (key, data) pair in items, or, as dict.update does, every pair of items.items()
+        when items has an items method (e.g. a dict or another HashTable).
+        The table is resized once up front, assuming all the keys are new.
+        """
+        items = HashTable._sized_pairs(items)
+        self.reserve(len(self) + len(items))
+        for key, data in items:
+            self[key] = data
+
+    @staticmethod
+    def _sized_pairs(items: Iterable[Tuple[K, V]] | Mapping[K, V]) -> Iterable[Tuple[K, V]]:
+        """
+        Returns the (key, data) pairs to set in update, in a collection with a length: the pairs of
+        items.items() when items has an items method, or else items itself (read into a list first
+        when it has no length, e.g. a generator).
+        """
+        if hasattr(items, 'items'):
+            items = items.items()
+        return items if hasattr(items, '__len__') else list(items)
+
+    def get_many(self, keys: Iterable[K]) -> ArrayR[V]:
+        """
+        Returns an array with the data associated to each of the keys, in the same order.
+        :raises KeyError: when one of the keys doesn't exist.
+        """
+        keys = keys if hasattr(keys, '__len__') else list(keys)
+        res = ArrayR(len(keys))
+        for i, key in enumerate(keys):
+            res[i] = self[key]
+        return res
+
+    def delete_many(self, keys: Iterable[K]) -> int:
+        """
+        Deletes every key in keys which is in the table, ignoring the others.
+        :returns: the number of items deleted.
+        """
+        deleted = 0
+        for key in keys:
+            if key in self:
+                del self[key]
+                deleted += 1
+        return deleted
+
+    def dump(self, fileobj: BinaryIO) -> None:
+        """
+        Writes the table to a binary file, from which load can read it back.
+        Every (key, data) pair is written, and is reinserted by load. Tables which can
+        write their layout, so that load does not need to hash anything, override this.
+        Keys and data should be picklable, and of the builtin types which load allows
+        (see _TableUnpickler).
+        :complexity: O(N) to iterate and pickle, where N is the number of items.
+        """
+        header = self._dump_header()
+        header.update(type=type(self).__name__, length=len(self), layout=False)
+        HashTable._write_header(fileobj, header)
+        for item in self.iter_items():
+            pickle.dump(item, fileobj, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, fileobj: BinaryIO, mapped: bool = False) -> HashTable[K, V]:
+        """
+        Reads a table written by dump, with the same parameters (e.g. sizes, load factors).
+        The file should have been written by a table of the same class, and come from a
+        trusted source: it is unpickled, though only builtin types and table classes are allowed.
+        :param mapped: Whether to return a read-only MappedHashTable reading the items straight
+            from the file, which should then be a real file opened in binary mode.
+            Only possible for tables which dump their layout (see LinearProbeTable.dump).
+        :raises ValueError: when the file was not written by dump, by a table of another class,
+            or cannot be mapped.
+        :raises pickle.UnpicklingError: when the file names a global which is not allowed.
+        :complexity: O(N * (N + K)) in the worst case to reinsert every item, see update.
+            Tables which dump their layout override this.
+        """
+        header = HashTable._read_header(fileobj)
+        if header['type'] != cls.__name__:
+            raise ValueError(f"File holds a {header['type']}, not a {cls.__name__}.")
+        if header['layout']:
+            return cls._load_layout(fileobj, header, mapped)
+        if mapped:
+            raise ValueError(f"A {cls.__name__} cannot be mapped.")
+        table = cls._from_header(header)
+        table._load_items(fileobj, header['length'])
+        return table
+
+    def _dump_header(self) -> dict:
+        """
+        Returns the parameters of the table to write in the header, used by _from_header.
+        """
+        return {}
+
+    @classmethod
+    def _from_header(cls, header: dict) -> HashTable[K, V]:
+        """
+        Creates an empty table with the parameters written in the header.
+        """
+        return cls()
+
+    def _load_items(self, fileobj: BinaryIO, length: int) -> None:
+        """
+        Reads and inserts the given number of (key, data) pairs.
+        """
+        self.reserve(length)
+        for _ in range(length):
+            key, data = _TableUnpickler(fileobj).load()
+            self[key] = data
+
+    @staticmethod
+    def _write_header(fileobj: BinaryIO, header: dict) -> None:
+        """
+        Writes DUMP_MAGIC and the header.
+        """
+        data = pickle.dumps(header, pickle.HIGHEST_PROTOCOL)
+        fileobj.write(DUMP_MAGIC + struct.pack('<Q', len(data)) + data)
+
+    @staticmethod
+    def _read_header(fileobj: BinaryIO) -> dict:
+        """
+        Reads DUMP_MAGIC and the header.
+        :raises ValueError: when the file does not start with DUMP_MAGIC.
+        """
+        if fileobj.read(len(DUMP_MAGIC)) != DUMP_MAGIC:
+            raise ValueError("File was not written by HashTable.dump.")
+        length, = struct.unpack('<Q', fileobj.read(8))
+        return _TableUnpickler(io.BytesIO(fileobj.read(length))).load()
+
     @abstractmethod
     def hash(self, key: K) -> int:
         pass
 
+    def _universal_hash(self, key: K) -> int:
+        """
+        Hash any hashable key to a value in [0, HASH_PRIME), using the universal hash function
+        (a * x + b) mod HASH_PRIME, where a and b are random for each table.
+        x is the integer read from the raw bytes for bytes keys, and the builtin hash of the key
+        for anything else, so that equal keys of different types (such as -1, -1.0 and -1 + 0j,
+        or 1 and True) hash to the same value. The builtin hash of an int is the int itself for
+        small enough ints, and that of a str is keyed by a random secret chosen when the
+        interpreter starts (unless PYTHONHASHSEED is set).
+
+        Keys which are equal modulo HASH_PRIME (or tuples of them) get the same x, and so collide
+        whatever a and b are. Seeded tables instead hash the whole key (see _key_bytes) with
+        BLAKE2b keyed by a and b, so that colliding keys cannot be found without knowing them.
+        Callers take the result modulo their table size.
+        :complexity: O(1) for int keys, O(K) for bytes keys where K is the length of the key,
+            and the complexity of the builtin hash otherwise. O(K) for seeded tables where K is
+            the size of the key.
+        """
+        if self._seeded:
+            digest = hashlib.blake2b(_key_bytes(key), digest_size=8,
+                                     key=self._hash_a.to_bytes(8, 'little') + self._hash_b.to_bytes(8, 'little')).digest()
+            return int.from_bytes(digest, 'little') % HASH_PRIME
+        key = int.from_bytes(key, 'little') if type(key) is bytes else hash(key)
+        return (self._hash_a * key + self._hash_b) % HASH_PRIME
+
     @property
     @abstractmethod
     def table_size(self) -> int:
@@ -30,35 +382,67 @@ class HashTable(ABC, Generic[K, V]):
     def items(self) -> ArrayR[Tuple[K, V]]:
         pass
 
+    @abstractmethod
+    def iter_items(self) -> Iterator[Tuple[K, V]]:
+        """
+        Lazily yields every (key, data) pair in the table, straight from the table itself.
+        :raises RuntimeError: when the table is structurally modified during iteration.
+        """
+        pass
+
+    def iter_keys(self) -> Iterator[K]:
+        """
+        Lazily yields every key in the table. See iter_items.
+        """
+        for key, _ in self.iter_items():
+            yield key
+
+    def iter_values(self) -> Iterator[V]:
+        """
+        Lazily yields the data of every key in the table. See iter_items.
+        """
+        for _, data in self.iter_items():
+            yield data
+
+    def _check_modifications(self, modifications: int) -> None:
+        """
+        Used by the iteration views to check that the table has not been structurally
+        modified since they started.
+        :raises RuntimeError: when the table was modified.
+        """
+        if self._modifications != modifications:
+            raise RuntimeError("Hash table changed size during iteration")
+
     def keys(self) -> ArrayR[K]:
-        array = self.items()
-        for i in range(len(array)):
-            array[i] = array[i][0]
+        array = ArrayR(len(self))
+        for i, key in enumerate(self.iter_keys()):
+            array[i] = key
         return array
 
     def values(self) -> ArrayR[V]:
-        array = self.items()
-        for i in range(len(array)):
-            array[i] = array[i][1]
+        array = ArrayR(len(self))
+        for i, data in enumerate(self.iter_values()):
+            array[i] = data
         return array
 
     def is_empty(self) -> bool:
         return len(self) == 0
 
+    def load_factor(self) -> float:
+        """
+        Returns the number of items per position in the table.
+        """
+        return len(self) / self.table_size
+
     @abstractmethod
     def is_full(self) -> bool:
         pass
 
-    def __contains__(self, key: str) -> bool:
+    def __contains__(self, key: K) -> bool:
         """
         Checks to see if the given key is in the Hash Table
         """
-        try:
-            _ = self[key]
-        except KeyError:
-            return False
-        else:
-            return True
+        return self.get(key, _MISSING) is not _MISSING
 
     @abstractmethod
     def __delitem__(self, key: K) -> None:
@@ -7,12 +7,14 @@ class ArrayStack(Stack[T]):
     Attributes:
          length (int): number of elements in the stack (inherited)
          array (ArrayR[T]): array storing the elements of the queue
+         resizable (bool): whether pushing onto a full stack doubles its capacity
     """
 
-    def __init__(self, max_capacity: int = 1) -> None:
+    def __init__(self, max_capacity: int = 1, resizable: bool = False) -> None:
         """
         Constructor for the ArrayStack class.
-        :param max_capacity: maximum capacity of the stack
+        :param max_capacity: maximum capacity of the stack, or initial capacity if it is resizable
+        :param resizable: whether to grow the stack when it is full, instead of raising an exception
         :complexity: O(max_capacity) due to the creation of the array
         """
         if max_capacity <= 0:
@@ -21,15 +23,19 @@ class ArrayStack(Stack[T]):
         Stack.__init__(self)
         self._array = ArrayR(max_capacity)
         self._length = 0
+        self._resizable = resizable
 
     def push(self, item: T) -> None:
         """ Pushes an element to the top of the stack.
-        :raises Exception: if the stack is full
-        :complexity: O(1)
+        :raises Exception: if the stack is full and not resizable
+        :complexity: O(1), amortised when the stack is resizable
+            (a push onto a full resizable stack is O(N) to copy the N elements)
         """
-        if self.is_full():
-            raise Exception("Stack is full")
-        self._array[len(self)] = item
+        if self._length == len(self._array):
+            if not self._resizable:
+                raise Exception("Stack is full")
+            self.__resize()
+        self._array[self._length] = item
         self._length += 1
 
     def pop(self) -> T:
@@ -37,7 +43,7 @@ class ArrayStack(Stack[T]):
         :raises Exception: if the stack is empty
         :complexity: O(1)
         """
-        if self.is_empty():
+        if self._length == 0:
             raise Exception("Stack is empty")
         self._length -= 1
         return self._array[self._length]
@@ -47,10 +53,14 @@ class ArrayStack(Stack[T]):
         :raises Exception: if the stack is empty
         :complexity: O(1)
         """
-        if self.is_empty():
+        if self._length == 0:
             raise Exception("Stack is empty")
         return self._array[self._length - 1]
 
+    def is_empty(self) -> bool:
+        """ True if the stack has no elements. """
+        return self._length == 0
+
     def is_full(self) -> bool:
         """ True if the stack is full and no element can be pushed. """
         return len(self) == len(self._array)
@@ -58,6 +68,16 @@ class ArrayStack(Stack[T]):
     def clear(self):
         self._length = 0
 
+    def __resize(self) -> None:
+        """
+        Doubles the capacity of the stack, copying all existing elements.
+        :complexity: O(N), where N is the number of elements in the stack.
+        """
+        new_array = ArrayR(2 * len(self._array))
+        for i in range(len(self)):
+            new_array[i] = self._array[i]
+        self._array = new_array
+
     def __len__(self) -> int:
         """ Returns the number of items in the stack"""
         return self._length
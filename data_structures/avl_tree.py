@@ -0,0 +1,210 @@
+""" AVL Tree.
+    Defines a self-balancing Binary Search Tree with linked nodes.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from data_structures.abstract_binary_search_tree import K, V
+from data_structures.binary_search_tree import BinarySearchTree
+from data_structures.linked_stack import LinkedStack
+from data_structures.node_avl import AVLNode
+
+
+class AVLTree(BinarySearchTree[K, V]):
+    """ AVL tree.
+        A binary search tree where the heights of the two subtrees of every node differ by at most one,
+        so the height of a tree of N nodes is at most about 1.44 * log2(N), whatever the order in which
+        keys are inserted. Lookups, insertions and deletions are all O(CompK * log N).
+
+        Nodes are AVLNodes, which keep the height of the subtree rooted at them (1 for a leaf) in
+        _height, next to its number of nodes in _size (see BinarySearchTree).
+        After an insertion or deletion, both are updated on the way back up to the root, and any
+        node left unbalanced is fixed with one or two rotations.
+    """
+
+    @staticmethod
+    def from_node(node: AVLNode[K, V] | None, length: int = 0, check_invariant: bool = False) -> AVLTree[K, V]:
+        """
+            Creates an AVL tree object from an AVL node, computing the height and size of every node.
+            Length argument is not checked if passed in.
+            :raises TypeError: when the node is not an AVLNode.
+            :raises ValueError: when check_invariant is set and the tree does not satisfy the
+                search invariant, or is not balanced.
+            :complexity: O(N) where N is the number of nodes in the tree, to compute the heights.
+        """
+        if not isinstance(node, (AVLNode, type(None))):
+            raise TypeError(f"Cannot instantiate AVL tree with node type: {type(node)}")
+
+        tree = BinarySearchTree.from_node(node, length, check_invariant)
+        balanced = AVLTree.__compute_heights(node)
+        if check_invariant and not balanced:
+            raise ValueError("Constructed AVLTree is not balanced.")
+
+        avl = AVLTree()
+        avl._root = tree._root
+        avl._length = tree._length
+        return avl
+
+    @staticmethod
+    def __compute_heights(root: AVLNode[K, V] | None) -> bool:
+        """
+            Sets the height of every node in the subtree, in post-order so that children come first.
+            :returns: whether every node is balanced.
+        """
+        balanced = True
+        stack = LinkedStack[tuple]()
+        if root is not None:
+            stack.push((root, False))
+        while not stack.is_empty():
+            current, expanded = stack.pop()
+            if expanded:
+                left, right = AVLTree._height(current._left), AVLTree._height(current._right)
+                current._height = 1 + max(left, right)
+                balanced = balanced and abs(left - right) <= 1
+            else:
+                stack.push((current, True))
+                if current._right:
+                    stack.push((current._right, False))
+                if current._left:
+                    stack.push((current._left, False))
+        return balanced
+
+    @staticmethod
+    def _new_node(key: K, item: V) -> AVLNode[K, V]:
+        """ Creates an AVL node, for from_sorted_pairs. """
+        return AVLNode(item, key)
+
+    @staticmethod
+    def _place_node(current: AVLNode[K, V], depth: int, full_levels: int) -> None:
+        """ Sets the height of a node linked into a perfectly balanced tree from those of its subtrees. """
+        current._height = 1 + max(AVLTree._height(current._left), AVLTree._height(current._right))
+
+    @staticmethod
+    def _height(current: AVLNode[K, V] | None) -> int:
+        """ Returns the height of a subtree, 0 when it is empty. """
+        return current._height if current is not None else 0
+
+    def height(self) -> int:
+        """
+            Returns the height of the tree, 0 when it is empty.
+            :complexity: O(1)
+        """
+        return AVLTree._height(self._root)
+
+    def _stack_capacity(self) -> int:
+        """ Returns the initial capacity of the stacks of the iterators, enough for the height of the tree. """
+        return self.height() + 1
+
+    def _update(self, current: AVLNode[K, V]) -> None:
+        """ Recomputes the height and size of a node from those of its children. """
+        current._height = 1 + max(AVLTree._height(current._left), AVLTree._height(current._right))
+        current._size = 1 + AVLTree._subtree_size(current._left) + AVLTree._subtree_size(current._right)
+
+    def _rotate_left(self, current: AVLNode[K, V]) -> AVLNode[K, V]:
+        """
+            Rotates the subtree left, so that the right child of current becomes its root.
+            :returns: the new root of the subtree.
+            :complexity: O(1)
+        """
+        root = current._right
+        current._right = root._left
+        root._left = current
+        self._update(current)
+        self._update(root)
+        return root
+
+    def _rotate_right(self, current: AVLNode[K, V]) -> AVLNode[K, V]:
+        """
+            Rotates the subtree right, so that the left child of current becomes its root.
+            :returns: the new root of the subtree.
+            :complexity: O(1)
+        """
+        root = current._left
+        current._left = root._right
+        root._right = current
+        self._update(current)
+        self._update(root)
+        return root
+
+    def _rebalance(self, current: AVLNode[K, V]) -> AVLNode[K, V]:
+        """
+            Restores the balance of a node whose subtrees are balanced, but whose heights may differ
+            by two after an insertion or deletion below it, and updates its height and size.
+            When the taller child leans the other way, it is rotated first (a double rotation).
+            :returns: the new root of the subtree.
+            :complexity: O(1)
+        """
+        left = AVLTree._height(current._left)
+        right = AVLTree._height(current._right)
+        if left > right + 1:
+            if AVLTree._height(current._left._left) < AVLTree._height(current._left._right):
+                current._left = self._rotate_left(current._left)
+            return self._rotate_right(current)
+        if right > left + 1:
+            if AVLTree._height(current._right._right) < AVLTree._height(current._right._left):
+                current._right = self._rotate_right(current._right)
+            return self._rotate_left(current)
+        self._update(current)
+        return current
+
+    def __setitem__(self, key: K, item: V) -> None:
+        """
+            Inserts an item into the tree, or replaces the item of an existing key, then rebalances.
+            :complexity: O(CompK * log N) where N is the number of nodes in the tree.
+        """
+        self._root = self.__insert_aux(self._root, key, item)
+
+    def __insert_aux(self, current: AVLNode[K, V] | None, key: K, item: V) -> AVLNode[K, V]:
+        """
+            Inserts into the subtree rooted at current.
+            :returns: the new root of the subtree.
+        """
+        if current is None:
+            self._length += 1
+            return AVLNode(item, key, 1)
+        elif key < current._key:
+            current._left = self.__insert_aux(current._left, key, item)
+        elif key > current._key:
+            current._right = self.__insert_aux(current._right, key, item)
+        else:
+            current._item = item
+            return current
+        return self._rebalance(current)
+
+    def __delitem__(self, key: K) -> None:
+        """
+            Deletes the item of a key from the tree, then rebalances.
+            :raises KeyError: when the key is not in the tree.
+            :complexity: O(CompK * log N) where N is the number of nodes in the tree.
+        """
+        self._root = self.__delete_aux(self._root, key)
+
+    def __delete_aux(self, current: AVLNode[K, V] | None, key: K) -> AVLNode[K, V] | None:
+        """
+            Deletes from the subtree rooted at current. A node with two children takes the key and
+            item of its successor, which is then deleted from the right subtree instead.
+            :returns: the new root of the subtree.
+        """
+        if current is None:
+            raise KeyError('Deleting non-existent item')
+        elif key < current._key:
+            current._left = self.__delete_aux(current._left, key)
+        elif key > current._key:
+            current._right = self.__delete_aux(current._right, key)
+        else:
+            if current._left is None:
+                self._length -= 1
+                return current._right
+            elif current._right is None:
+                self._length -= 1
+                return current._left
+
+            successor = current._right
+            while successor._left:
+                successor = successor._left
+            current._key = successor._key
+            current._item = successor._item
+            current._right = self.__delete_aux(current._right, successor._key)
+        return self._rebalance(current)
@@ -0,0 +1,551 @@
+""" B+ Tree.
+    Defines an ordered map whose nodes hold blocks of keys, with the items in linked leaves.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from typing import Generic, Iterable, Tuple
+
+from data_structures.abstract_binary_search_tree import AbstractBinarySearchTree, K, V
+from data_structures.node_b_plus import BPlusInternal, BPlusLeaf, BPlusNode
+from data_structures.referential_array import ArrayR
+
+# Default maximum number of keys in a node.
+DEFAULT_FANOUT = 32
+
+
+class BPlusTreeIterator(Generic[K, V]):
+    """ In-order iterator over the (key, item) pairs of a B+ tree.
+        Starts from a position in a leaf and follows the links between leaves, without going back
+        up the tree, until the end of the last leaf or the first key above the upper bound.
+        A bound of None leaves the range unbounded.
+    """
+
+    def __init__(self, tree: BPlusTree[K, V], leaf: BPlusLeaf[K, V] | None, index: int,
+                 high: K | None = None, include_high: bool = False) -> None:
+        """ Iterator initialiser. include_high tells whether high is in the range. """
+        self._tree = tree
+        self._leaf = leaf
+        self._index = index
+        self._high = high
+        self._include_high = include_high
+
+    def __iter__(self) -> BPlusTreeIterator:
+        """ Standard __iter__() method for initialisers. Returns itself. """
+        return self
+
+    def __next__(self) -> Tuple[K, V]:
+        """ The main body of the iterator.
+            Returns keys of the tree within bounds one by one, in order.
+        """
+        while self._leaf is not None and self._index >= self._leaf._count:
+            following = self._leaf._next
+            self._leaf = self._tree._node(following) if following is not None else None
+            self._index = 0
+        if self._leaf is None:
+            raise StopIteration
+        key = self._leaf._keys[self._index]
+        if self._high is not None and not (key < self._high or (self._include_high and key == self._high)):
+            self._leaf = None
+            raise StopIteration
+        item = self._leaf._items[self._index]
+        self._index += 1
+        return key, item
+
+
+class BPlusTree(AbstractBinarySearchTree[K, V]):
+    """ B+ tree.
+        An ordered map where every node holds up to fanout sorted keys in an ArrayR block, and all
+        leaves are at the same depth. Internal nodes only hold keys to guide searches (a child
+        for each range between them), while the leaves hold every key with its item, and link to
+        the next leaf, so that ranges are read leaf by leaf.
+
+        Every node but the root holds at least fanout // 2 keys: a node taking one key too many
+        is split in two, and a node left with one key too few borrows a key from a sibling, or
+        is merged with it. So the height of a tree of N keys is O(log N / log fanout), and
+        lookups, insertions and deletions are O(log N * CompK), with O(fanout) moves in a node.
+
+        A lookup only goes through a few nodes, and a scan reads whole leaves. Note that an ArrayR
+        also keeps a reference to every value it holds in the dictionary of its ctypes array, so
+        blocks do not take less memory per key than BinaryNodes (see benchmark_b_plus).
+
+        Nodes link to their children (and leaves to the next leaf) through references, which are
+        the nodes themselves here. Nodes are only reached through _node, created through
+        _new_leaf and _new_internal, reported with _dirty once modified, and with _discard when
+        removed, so that subclasses can keep them elsewhere (see PagedBPlusTree).
+    """
+
+    def __init__(self, fanout: int = DEFAULT_FANOUT) -> None:
+        """
+            Initialises an empty B+ tree, which is a single empty leaf.
+            :param fanout: the maximum number of keys in a node.
+            :raises ValueError: when fanout is smaller than 3.
+            :complexity: O(fanout)
+        """
+        if fanout < 3:
+            raise ValueError("Fanout should be at least 3.")
+        AbstractBinarySearchTree.__init__(self)
+        self._fanout = fanout
+        self._min_keys = fanout // 2
+        self._root = self._ref(self._new_leaf())
+        self._length = 0
+        self._height = 1
+
+    def _node(self, ref) -> BPlusNode[K, V]:
+        """ Returns the node of a reference held by the tree. """
+        return ref
+
+    def _ref(self, current: BPlusNode[K, V]):
+        """ Returns the reference to hold to a node. """
+        return current
+
+    def _new_leaf(self) -> BPlusLeaf[K, V]:
+        """ Creates an empty leaf. """
+        return BPlusLeaf(self._fanout)
+
+    def _new_internal(self) -> BPlusInternal[K, V]:
+        """ Creates an empty internal node. """
+        return BPlusInternal(self._fanout)
+
+    def _dirty(self, current: BPlusNode[K, V]) -> None:
+        """ Called after a node is modified. """
+        pass
+
+    def _discard(self, current: BPlusNode[K, V]) -> None:
+        """ Called when a node is removed from the tree. """
+        pass
+
+    @classmethod
+    def from_sorted(cls, items: Iterable[V], check_invariant: bool = False, *args, **kwargs) -> BPlusTree[K, V]:
+        """
+            Creates a tree of items which are their own keys, see from_sorted_pairs.
+            :complexity: O(N) where N is the number of items.
+        """
+        return cls.from_sorted_pairs([(item, item) for item in items], check_invariant, *args, **kwargs)
+
+    @classmethod
+    def from_sorted_pairs(cls, pairs: Iterable[Tuple[K, V]], check_invariant: bool = False,
+                          *args, **kwargs) -> BPlusTree[K, V]:
+        """
+            Creates a tree from (key, item) pairs whose keys are strictly increasing, bottom up:
+            the pairs are spread evenly over as few leaves as possible, then the nodes of each
+            level are spread evenly over as few parents as possible, until there is only one.
+            The remaining arguments (e.g. fanout) are passed to the constructor.
+            :raises ValueError: when check_invariant is set and the keys are not strictly increasing,
+                or when the constructor does not make an empty tree.
+            :complexity: O(N) where N is the number of pairs (O(N * CompK) with check_invariant).
+        """
+        pairs = pairs if hasattr(pairs, '__len__') else list(pairs)
+        tree = cls(*args, **kwargs)
+        if not tree.is_empty():
+            raise ValueError("Cannot bulk load into a tree which is not empty.")
+        if len(pairs) == 0:
+            return tree
+        fanout = tree._fanout
+
+        # References to the nodes of the current level, and the smallest key of each one.
+        nodes = ArrayR(-(-len(pairs) // fanout))
+        firsts = ArrayR(len(nodes))
+        iterator = iter(pairs)
+        previous = previous_key = None
+        for i in range(len(nodes)):
+            leaf = tree._new_leaf()
+            leaf._count = BPlusTree.__share(len(pairs), len(nodes), i)
+            for j in range(leaf._count):
+                key, item = next(iterator)
+                if check_invariant and previous_key is not None and not previous_key < key:
+                    raise ValueError("Constructed BPlusTree does not satisfy search invariant.")
+                leaf._keys[j], leaf._items[j] = key, item
+                previous_key = key
+            tree._dirty(leaf)
+            if previous is not None:
+                previous._next = tree._ref(leaf)
+                tree._dirty(previous)
+            nodes[i], firsts[i] = tree._ref(leaf), leaf._keys[0]
+            previous = leaf
+
+        while len(nodes) > 1:
+            parents = ArrayR(-(-len(nodes) // (fanout + 1)))
+            parent_firsts = ArrayR(len(parents))
+            start = 0
+            for i in range(len(parents)):
+                parent = tree._new_internal()
+                children = BPlusTree.__share(len(nodes), len(parents), i)
+                for j in range(children):
+                    parent._children[j] = nodes[start + j]
+                    if j > 0:
+                        parent._keys[j - 1] = firsts[start + j]
+                parent._count = children - 1
+                tree._dirty(parent)
+                parents[i], parent_firsts[i] = tree._ref(parent), firsts[start]
+                start += children
+            nodes, firsts = parents, parent_firsts
+            tree._height += 1
+
+        tree._discard(tree._node(tree._root))
+        tree._root = nodes[0]
+        tree._length = len(pairs)
+        return tree
+
+    @staticmethod
+    def __share(total: int, parts: int, index: int) -> int:
+        """ Returns the size of part index when total is split into parts as evenly as possible. """
+        return total // parts + (1 if index < total % parts else 0)
+
+    @staticmethod
+    def _bisect_left(current: BPlusNode[K, V], key: K) -> int:
+        """
+            Returns the index of the first key of the node which is not smaller than the key.
+            :complexity: O(CompK * log F) where F is the number of keys in the node.
+        """
+        low, high = 0, current._count
+        while low < high:
+            mid = (low + high) // 2
+            if current._keys[mid] < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    @staticmethod
+    def _bisect_right(current: BPlusNode[K, V], key: K) -> int:
+        """
+            Returns the index of the first key of the node which is larger than the key, which is
+            also the index of the child of an internal node where the key belongs.
+            :complexity: O(CompK * log F) where F is the number of keys in the node.
+        """
+        low, high = 0, current._count
+        while low < high:
+            mid = (low + high) // 2
+            if key < current._keys[mid]:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    @staticmethod
+    def __insert_at(array: ArrayR, length: int, index: int, value) -> None:
+        """ Moves the values of the array from index up to length one position right, and puts value at index. """
+        for i in range(length, index, -1):
+            array[i] = array[i - 1]
+        array[index] = value
+
+    @staticmethod
+    def __delete_at(array: ArrayR, length: int, index: int) -> None:
+        """ Moves the values of the array after index up to length one position left, clearing the last one. """
+        for i in range(index, length - 1):
+            array[i] = array[i + 1]
+        array[length - 1] = None
+
+    @staticmethod
+    def __move(source: ArrayR, start: int, end: int, target: ArrayR, target_start: int) -> None:
+        """ Moves the values of source from start up to end to target from target_start, clearing them in source. """
+        for i in range(start, end):
+            target[target_start + i - start] = source[i]
+            source[i] = None
+
+    def is_leaf(self, current: BPlusNode[K, V]) -> bool:
+        """ Simple check whether or not the node is a leaf. """
+        return isinstance(current, BPlusLeaf)
+
+    def height(self) -> int:
+        """
+            Returns the number of levels of the tree, 1 when the root is a leaf.
+            :complexity: O(1)
+        """
+        return self._height
+
+    def __find_leaf(self, key: K) -> BPlusLeaf[K, V]:
+        """
+            Returns the leaf where the key belongs.
+            :complexity: O(CompK * log N) where N is the number of keys in the tree.
+        """
+        current = self._node(self._root)
+        while not self.is_leaf(current):
+            current = self._node(current._children[BPlusTree._bisect_right(current, key)])
+        return current
+
+    def __first_leaf(self) -> BPlusLeaf[K, V]:
+        """
+            Returns the leaf with the smallest keys.
+            :complexity: O(H) where H is the height of the tree.
+        """
+        current = self._node(self._root)
+        while not self.is_leaf(current):
+            current = self._node(current._children[0])
+        return current
+
+    def __getitem__(self, key: K) -> V:
+        """
+            Gets the item of a key, from its leaf.
+            :raises KeyError: when the key is not in the tree.
+            :complexity: O(CompK * log N) where N is the number of keys in the tree.
+        """
+        leaf = self.__find_leaf(key)
+        index = BPlusTree._bisect_left(leaf, key)
+        if index < leaf._count and leaf._keys[index] == key:
+            return leaf._items[index]
+        raise KeyError(f'Key not found: {key}')
+
+    def __contains__(self, key: K) -> bool:
+        """
+            Checks to see if the key is in the tree
+            :complexity: see __getitem__(self, key: K) -> V
+        """
+        leaf = self.__find_leaf(key)
+        index = BPlusTree._bisect_left(leaf, key)
+        return index < leaf._count and leaf._keys[index] == key
+
+    def __setitem__(self, key: K, item: V) -> None:
+        """
+            Inserts an item into its leaf, or replaces the item of an existing key.
+            Nodes left with too many keys are split on the way back up, and when the root is
+            split, a new root is made above the two halves.
+            :complexity: O(CompK * log N + fanout * log N / log fanout) where N is the number of
+                keys in the tree.
+        """
+        split = self.__insert_aux(self._node(self._root), key, item)
+        if split is not None:
+            separator, right = split
+            root = self._new_internal()
+            root._keys[0] = separator
+            root._children[0], root._children[1] = self._root, self._ref(right)
+            root._count = 1
+            self._dirty(root)
+            self._root = self._ref(root)
+            self._height += 1
+
+    def __insert_aux(self, current: BPlusNode[K, V], key: K, item: V) -> Tuple[K, BPlusNode[K, V]] | None:
+        """
+            Inserts into the subtree rooted at current.
+            :returns: None, or when current had to be split, the smallest key of the right half
+                and the new node holding it.
+        """
+        if self.is_leaf(current):
+            index = BPlusTree._bisect_left(current, key)
+            if index < current._count and current._keys[index] == key:
+                current._items[index] = item
+                self._dirty(current)
+                return None
+            BPlusTree.__insert_at(current._keys, current._count, index, key)
+            BPlusTree.__insert_at(current._items, current._count, index, item)
+            current._count += 1
+            self._length += 1
+            self._dirty(current)
+            return self.__split_leaf(current) if current._count > self._fanout else None
+
+        index = BPlusTree._bisect_right(current, key)
+        split = self.__insert_aux(self._node(current._children[index]), key, item)
+        if split is None:
+            return None
+        separator, right = split
+        BPlusTree.__insert_at(current._keys, current._count, index, separator)
+        BPlusTree.__insert_at(current._children, current._count + 1, index + 1, self._ref(right))
+        current._count += 1
+        self._dirty(current)
+        return self.__split_internal(current) if current._count > self._fanout else None
+
+    def __split_leaf(self, current: BPlusLeaf[K, V]) -> Tuple[K, BPlusLeaf[K, V]]:
+        """
+            Moves the larger half of the keys of a leaf to a new leaf, linked after it.
+            :returns: the smallest key of the new leaf, and the new leaf.
+        """
+        mid = current._count // 2
+        right = self._new_leaf()
+        BPlusTree.__move(current._keys, mid, current._count, right._keys, 0)
+        BPlusTree.__move(current._items, mid, current._count, right._items, 0)
+        right._count, current._count = current._count - mid, mid
+        right._next, current._next = current._next, self._ref(right)
+        self._dirty(current)
+        self._dirty(right)
+        return right._keys[0], right
+
+    def __split_internal(self, current: BPlusInternal[K, V]) -> Tuple[K, BPlusInternal[K, V]]:
+        """
+            Moves the larger half of the keys and children of an internal node to a new node.
+            The middle key goes up to the parent, as the separator of the two nodes.
+            :returns: the middle key, and the new node.
+        """
+        mid = current._count // 2
+        separator = current._keys[mid]
+        right = self._new_internal()
+        BPlusTree.__move(current._keys, mid + 1, current._count, right._keys, 0)
+        BPlusTree.__move(current._children, mid + 1, current._count + 1, right._children, 0)
+        current._keys[mid] = None
+        right._count, current._count = current._count - mid - 1, mid
+        self._dirty(current)
+        self._dirty(right)
+        return separator, right
+
+    def __delitem__(self, key: K) -> None:
+        """
+            Deletes the item of a key from its leaf.
+            Nodes left with too few keys borrow one from a sibling, or are merged with it, on the
+            way back up, and a root left with a single child is replaced by it.
+            Keys of internal nodes are not updated when the key is deleted from a leaf, as they
+            still separate the keys of their children.
+            :raises KeyError: when the key is not in the tree.
+            :complexity: O(CompK * log N + fanout * log N / log fanout) where N is the number of
+                keys in the tree.
+        """
+        self.__delete_aux(self._node(self._root), key)
+        root = self._node(self._root)
+        if not self.is_leaf(root) and root._count == 0:
+            self._root = root._children[0]
+            self._discard(root)
+            self._height -= 1
+
+    def __delete_aux(self, current: BPlusNode[K, V], key: K) -> None:
+        """ Deletes from the subtree rooted at current. """
+        if self.is_leaf(current):
+            index = BPlusTree._bisect_left(current, key)
+            if index == current._count or current._keys[index] != key:
+                raise KeyError('Deleting non-existent item')
+            BPlusTree.__delete_at(current._keys, current._count, index)
+            BPlusTree.__delete_at(current._items, current._count, index)
+            current._count -= 1
+            self._length -= 1
+            self._dirty(current)
+            return
+
+        index = BPlusTree._bisect_right(current, key)
+        child = self._node(current._children[index])
+        self.__delete_aux(child, key)
+        if child._count < self._min_keys:
+            self.__fix_underflow(current, index, child)
+
+    def __fix_underflow(self, parent: BPlusInternal[K, V], index: int, child: BPlusNode[K, V]) -> None:
+        """
+            Gives back a key to child index of parent, which has one key too few: from its left or
+            right sibling if one has keys to spare, otherwise by merging it with one of them.
+        """
+        left = self._node(parent._children[index - 1]) if index > 0 else None
+        right = self._node(parent._children[index + 1]) if index < parent._count else None
+        if left is not None and left._count > self._min_keys:
+            self.__borrow_left(parent, index, child, left)
+        elif right is not None and right._count > self._min_keys:
+            self.__borrow_right(parent, index, child, right)
+        elif left is not None:
+            self.__merge(parent, index - 1, left, child)
+        else:
+            self.__merge(parent, index, child, right)
+
+    def __borrow_left(self, parent: BPlusInternal[K, V], index: int, child: BPlusNode[K, V],
+                      left: BPlusNode[K, V]) -> None:
+        """ Moves the largest key of left, the left sibling of child index of parent, to the child. """
+        last = left._count - 1
+        if self.is_leaf(child):
+            BPlusTree.__insert_at(child._keys, child._count, 0, left._keys[last])
+            BPlusTree.__insert_at(child._items, child._count, 0, left._items[last])
+            left._items[last] = None
+            parent._keys[index - 1] = child._keys[0]
+        else:
+            # The separator comes down in front of the child, and the key of the sibling goes up.
+            BPlusTree.__insert_at(child._keys, child._count, 0, parent._keys[index - 1])
+            BPlusTree.__insert_at(child._children, child._count + 1, 0, left._children[last + 1])
+            left._children[last + 1] = None
+            parent._keys[index - 1] = left._keys[last]
+        left._keys[last] = None
+        left._count -= 1
+        child._count += 1
+        self._dirty(left)
+        self._dirty(child)
+        self._dirty(parent)
+
+    def __borrow_right(self, parent: BPlusInternal[K, V], index: int, child: BPlusNode[K, V],
+                       right: BPlusNode[K, V]) -> None:
+        """ Moves the smallest key of right, the right sibling of child index of parent, to the child. """
+        if self.is_leaf(child):
+            child._keys[child._count] = right._keys[0]
+            child._items[child._count] = right._items[0]
+            BPlusTree.__delete_at(right._keys, right._count, 0)
+            BPlusTree.__delete_at(right._items, right._count, 0)
+            parent._keys[index] = right._keys[0]
+        else:
+            # The separator comes down at the end of the child, and the key of the sibling goes up.
+            child._keys[child._count] = parent._keys[index]
+            child._children[child._count + 1] = right._children[0]
+            parent._keys[index] = right._keys[0]
+            BPlusTree.__delete_at(right._keys, right._count, 0)
+            BPlusTree.__delete_at(right._children, right._count + 1, 0)
+        right._count -= 1
+        child._count += 1
+        self._dirty(right)
+        self._dirty(child)
+        self._dirty(parent)
+
+    def __merge(self, parent: BPlusInternal[K, V], index: int, left: BPlusNode[K, V],
+                right: BPlusNode[K, V]) -> None:
+        """
+            Merges right, child index + 1 of parent, into left, child index, removing their
+            separator from parent.
+        """
+        if self.is_leaf(left):
+            BPlusTree.__move(right._keys, 0, right._count, left._keys, left._count)
+            BPlusTree.__move(right._items, 0, right._count, left._items, left._count)
+            left._count += right._count
+            left._next = right._next
+        else:
+            # The separator comes down between the keys of the two nodes.
+            left._keys[left._count] = parent._keys[index]
+            BPlusTree.__move(right._keys, 0, right._count, left._keys, left._count + 1)
+            BPlusTree.__move(right._children, 0, right._count + 1, left._children, left._count + 1)
+            left._count += right._count + 1
+        BPlusTree.__delete_at(parent._keys, parent._count, index)
+        BPlusTree.__delete_at(parent._children, parent._count + 1, index + 1)
+        parent._count -= 1
+        self._dirty(left)
+        self._dirty(parent)
+        self._discard(right)
+
+    def range_iter(self, low: K | None = None, high: K | None = None,
+                   inclusive: Tuple[bool, bool] = (True, False)) -> BPlusTreeIterator:
+        """
+            Creates an in-order iterator over the (key, item) pairs with keys between low and high,
+            by default from low (included) to high (excluded), as BinarySearchTree.range_iter.
+            :complexity: O(CompK * log N) to find the first leaf, then O(CompK) per pair.
+        """
+        if low is None:
+            return BPlusTreeIterator(self, self.__first_leaf(), 0, high, inclusive[1])
+        leaf = self.__find_leaf(low)
+        index = BPlusTree._bisect_left(leaf, low) if inclusive[0] else BPlusTree._bisect_right(leaf, low)
+        return BPlusTreeIterator(self, leaf, index, high, inclusive[1])
+
+    def __iter__(self) -> BPlusTreeIterator:
+        """ Create an in-order iterator. """
+        return self.range_iter()
+
+    def items(self) -> ArrayR[Tuple[K, V]]:
+        """
+            Returns an array of the (key, item) pairs in key order, read leaf by leaf.
+            :complexity: O(N) where N is the number of keys in the tree.
+        """
+        array = ArrayR(len(self))
+        for i, pair in enumerate(self):
+            array[i] = pair
+        return array
+
+    def is_empty(self) -> bool:
+        """
+            Checks to see if the tree is empty
+            :complexity: O(1)
+        """
+        return self._length == 0
+
+    def __len__(self) -> int:
+        """ Returns the number of keys in the tree. """
+        return self._length
+
+    def __str__(self) -> str:
+        def str_aux(current: BPlusNode[K, V]) -> str:
+            if self.is_leaf(current):
+                return "(" + ", ".join(f"{current._keys[i]}: {current._items[i]}" for i in range(current._count)) + ")"
+            parts = [str_aux(self._node(current._children[0]))]
+            for i in range(current._count):
+                parts.append(str(current._keys[i]))
+                parts.append(str_aux(self._node(current._children[i + 1])))
+            return "[" + " ".join(parts) + "]"
+
+        return f"<{type(self).__name__}{str_aux(self._node(self._root))}>"
@@ -0,0 +1,248 @@
+from __future__ import annotations
+import os
+import pickle
+import struct
+from data_structures.abstract_binary_search_tree import K, V
+from data_structures.b_plus_tree import BPlusTree, DEFAULT_FANOUT
+from data_structures.lru_cache import LRUCache
+from data_structures.node_b_plus import BPlusNode, PagedBPlusInternal, PagedBPlusLeaf
+from data_structures.node_double import DoubleNode
+
+# Start of every file written by PagedBPlusTree, followed by its format version.
+PAGED_MAGIC = b"FITBPT\x01"
+
+# Header after PAGED_MAGIC: page size, fanout, root page, number of keys, height, number of pages
+# and first free page (-1 when there is none).
+HEADER_FORMAT = '<IIqqIqq'
+DEFAULT_PAGE_SIZE = 4096
+MIN_PAGE_SIZE = 64
+DEFAULT_BUFFER_PAGES = 256
+
+
+class BufferPool(LRUCache[int, BPlusNode]):
+    """
+    Buffer pool of a PagedBPlusTree: an LRU cache of its nodes by page, holding at most a given
+    number of pages. A node which was modified (is dirty) is written back to its page when it is
+    evicted.
+    """
+
+    def __init__(self, tree: PagedBPlusTree, max_pages: int) -> None:
+        """
+        :param tree: the tree whose nodes are cached, which writes them back.
+        :param max_pages: maximum number of nodes in memory.
+        """
+        LRUCache.__init__(self, max_entries=max_pages)
+        self._tree = tree
+
+    def _remove(self, node: DoubleNode[int, BPlusNode]) -> None:
+        """ Writes the node of an entry back to its page if it is dirty, then removes the entry. """
+        if node._item._dirty:
+            self._tree._write_node(node._item)
+        LRUCache._remove(self, node)
+
+
+class PagedBPlusTree(BPlusTree[K, V]):
+    """
+    On-disk B+ tree.
+    Every node is kept in a fixed-size page of a file, and links to its children (and a leaf to
+    the next leaf) by page number. Only the nodes in the buffer pool (see BufferPool) are in
+    memory: any other node is read from its page when it is reached, which evicts the least
+    recently used node from the pool, writing it back if it was modified. So a lookup reads at
+    most the O(log N / log fanout) pages on its path, and none of those which are in the pool.
+    reads and writes count the pages read and written.
+
+    Page 0 holds PAGED_MAGIC and a header (see HEADER_FORMAT) with the page size, fanout, root
+    page, number of keys, height, number of pages and first free page. Every other page holds a
+    node, pickled and prefixed with its length as a little-endian 32 bit integer, or, once the
+    node was removed, the next free page.
+    The pages of removed nodes are reused for new nodes.
+
+    Modified nodes and the header are only written when they are evicted, by flush and by close,
+    so the file is only consistent after flush or close (the tree can be used as a context
+    manager, closing it at the end).
+    Keys and items should be picklable, and small enough for a node of fanout keys and items
+    to fit in a page: writing a node which does not fit raises a ValueError.
+    """
+
+    def __init__(self, path: str, fanout: int = DEFAULT_FANOUT, page_size: int = DEFAULT_PAGE_SIZE,
+                 buffer_pages: int = DEFAULT_BUFFER_PAGES) -> None:
+        """
+        Opens the tree stored in a file, or creates an empty tree in it when the file does not
+        exist or is empty. An existing tree keeps the fanout and page size it was created with.
+        :param path: path of the file.
+        :param fanout: the maximum number of keys in a node, for a new tree.
+        :param page_size: the size of the pages in bytes, for a new tree.
+        :param buffer_pages: the maximum number of nodes in memory.
+        :raises ValueError: when fanout is smaller than 3, page_size is smaller than MIN_PAGE_SIZE,
+            buffer_pages is smaller than 4, or the file was not written by a PagedBPlusTree.
+        """
+        if buffer_pages < 4:
+            raise ValueError("The buffer pool should hold at least 4 pages.")
+        if page_size < MIN_PAGE_SIZE:
+            raise ValueError(f"Pages should have at least {MIN_PAGE_SIZE} bytes.")
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, 'r+b' if exists else 'w+b')
+        self._pool = BufferPool(self, buffer_pages)
+        self.reads = 0
+        self.writes = 0
+        if not exists:
+            self._page_size = page_size
+            self._pages = 1
+            self._free = None
+            BPlusTree.__init__(self, fanout)
+            self.flush()
+            return
+
+        try:
+            header = self.__read_header()
+        except ValueError:
+            self._file.close()
+            raise
+        self._page_size, self._fanout, self._root, self._length, self._height, self._pages, free = header
+        self._free = free if free >= 0 else None
+        self._min_keys = self._fanout // 2
+
+    def __read_header(self) -> tuple:
+        """
+        Reads PAGED_MAGIC and the header from page 0.
+        :raises ValueError: when the file does not start with PAGED_MAGIC.
+        """
+        self._file.seek(0)
+        if self._file.read(len(PAGED_MAGIC)) != PAGED_MAGIC:
+            raise ValueError("File was not written by PagedBPlusTree.")
+        return struct.unpack(HEADER_FORMAT, self._file.read(struct.calcsize(HEADER_FORMAT)))
+
+    def __write_header(self) -> None:
+        """ Writes PAGED_MAGIC and the header to page 0. """
+        free = self._free if self._free is not None else -1
+        self._file.seek(0)
+        self._file.write(PAGED_MAGIC + struct.pack(HEADER_FORMAT, self._page_size, self._fanout, self._root,
+                                                   self._length, self._height, self._pages, free))
+
+    def __read_page(self, page: int):
+        """ Reads the value pickled in a page. """
+        self._file.seek(page * self._page_size)
+        data = self._file.read(self._page_size)
+        length, = struct.unpack('<I', data[:4])
+        self.reads += 1
+        return pickle.loads(data[4:4 + length])
+
+    def __write_page(self, page: int, value) -> None:
+        """
+        Pickles a value into a page.
+        :raises ValueError: when the pickled value does not fit in a page.
+        """
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) + 4 > self._page_size:
+            raise ValueError(f"Page {page} needs {len(data) + 4} bytes, more than the page size of {self._page_size}.")
+        self._file.seek(page * self._page_size)
+        self._file.write(struct.pack('<I', len(data)) + data)
+        self.writes += 1
+
+    def __read_node(self, page: int) -> BPlusNode[K, V]:
+        """ Reads the node in a page. """
+        leaf, keys, values, following = self.__read_page(page)
+        current = PagedBPlusLeaf(self._fanout, page) if leaf else PagedBPlusInternal(self._fanout, page)
+        for i, key in enumerate(keys):
+            current._keys[i] = key
+        target = current._items if leaf else current._children
+        for i, value in enumerate(values):
+            target[i] = value
+        current._count = len(keys)
+        if leaf:
+            current._next = following
+        return current
+
+    def _write_node(self, current: BPlusNode[K, V]) -> None:
+        """
+        Writes a node to its page, as its kind, its keys, its items (or the pages of its children)
+        and the page of the next leaf.
+        """
+        leaf = self.is_leaf(current)
+        values = current._items if leaf else current._children
+        record = (leaf,
+                  [current._keys[i] for i in range(current._count)],
+                  [values[i] for i in range(current._count + (0 if leaf else 1))],
+                  current._next if leaf else None)
+        self.__write_page(current._page, record)
+        current._dirty = False
+
+    def __allocate(self) -> int:
+        """ Returns a page for a new node: the first free page if there is one, or a new page at the end. """
+        if self._free is not None:
+            page = self._free
+            self._free = self.__read_page(page)
+            return page
+        self._pages += 1
+        return self._pages - 1
+
+    def _node(self, ref: int) -> BPlusNode[K, V]:
+        """ Returns the node in a page, from the buffer pool or else read from the file. """
+        current = self._pool.get(ref)
+        if current is None:
+            current = self.__read_node(ref)
+            self._pool[ref] = current
+        return current
+
+    def _ref(self, current: BPlusNode[K, V]) -> int:
+        """ Returns the page of a node. """
+        return current._page
+
+    def _new_leaf(self) -> PagedBPlusLeaf[K, V]:
+        """ Creates an empty leaf in a new page. """
+        current = PagedBPlusLeaf(self._fanout, self.__allocate())
+        self._dirty(current)
+        return current
+
+    def _new_internal(self) -> PagedBPlusInternal[K, V]:
+        """ Creates an empty internal node in a new page. """
+        current = PagedBPlusInternal(self._fanout, self.__allocate())
+        self._dirty(current)
+        return current
+
+    def _dirty(self, current: BPlusNode[K, V]) -> None:
+        """
+        Marks a modified node as dirty, and puts it back in the buffer pool as the most recently
+        used node (in case it was evicted while it was being modified).
+        """
+        current._dirty = True
+        self._pool[current._page] = current
+
+    def _discard(self, current: BPlusNode[K, V]) -> None:
+        """ Removes a node from the buffer pool, without writing it, and frees its page. """
+        current._dirty = False
+        if current._page in self._pool:
+            del self._pool[current._page]
+        self.__write_page(current._page, self._free)
+        self._free = current._page
+
+    def pool_stats(self) -> dict:
+        """ Returns the number of pages read and written, and the hit rate of the buffer pool. """
+        return {
+            'reads': self.reads,
+            'writes': self.writes,
+            'pool_pages': len(self._pool),
+            'hit_rate': self._pool.hit_rate(),
+        }
+
+    def flush(self) -> None:
+        """
+        Writes every dirty node in the buffer pool, and the header, to the file.
+        :complexity: O(P) where P is the number of pages in the buffer pool.
+        """
+        for _, current in self._pool.items():
+            if current._dirty:
+                self._write_node(current)
+        self.__write_header()
+        self._file.flush()
+
+    def close(self) -> None:
+        """ Flushes the tree and closes its file. The tree cannot be used afterwards. """
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> PagedBPlusTree[K, V]:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
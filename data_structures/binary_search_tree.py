@@ -8,21 +8,24 @@ from __future__ import annotations
 __author__ = 'Brendon Taylor, modified by Alexey Ignatiev, further modified by Jackson Goerner'
 __docformat__ = 'reStructuredText'
 
-from typing import Tuple
+from typing import Iterable, Tuple
 
 from data_structures.abstract_binary_search_tree import AbstractBinarySearchTree, K, V
+from data_structures.array_stack import ArrayStack
 from data_structures.linked_stack import LinkedStack
 from data_structures.node_binary import BinaryNode, Generic
 from data_structures.referential_array import ArrayR
 
 class BSTPreOrderIterator(Generic[K,V]):
     """ Pre-order iterator for the binary search tree.
-        Performs stack-based BST traversal.
+        Performs stack-based BST traversal, with a resizable ArrayStack which holds at most one
+        node per level of the tree (plus one), so a capacity of the height of the tree plus one
+        never has to grow.
     """
 
-    def __init__(self, root: BinaryNode[K, V] | None) -> None:
-        """ Iterator initialiser. """
-        self._stack = LinkedStack[BinaryNode[K,V]]()
+    def __init__(self, root: BinaryNode[K, V] | None, capacity: int = 1) -> None:
+        """ Iterator initialiser. capacity is the initial capacity of the stack. """
+        self._stack = ArrayStack[BinaryNode[K,V]](capacity, resizable=True)
         if root is not None:
             self._stack.push(root)
 
@@ -46,13 +49,14 @@ class BSTPreOrderIterator(Generic[K,V]):
 
 class BSTInOrderIterator(Generic[K,V]):
     """ In-order iterator for the binary search tree.
-        Performs stack-based BST traversal.
+        Performs stack-based BST traversal, with a resizable ArrayStack holding the path to the
+        current node, so a capacity of the height of the tree never has to grow.
     """
 
-    def __init__(self, root: BinaryNode[K, V] | None) -> None:
-        """ Iterator initialiser. """
+    def __init__(self, root: BinaryNode[K, V] | None, capacity: int = 1) -> None:
+        """ Iterator initialiser. capacity is the initial capacity of the stack. """
 
-        self._stack = LinkedStack[BinaryNode[K,V]]()
+        self._stack = ArrayStack[BinaryNode[K,V]](capacity, resizable=True)
         self._current = root
 
     def __iter__(self) -> BSTInOrderIterator:
@@ -76,16 +80,139 @@ class BSTInOrderIterator(Generic[K,V]):
         return result._key, result._item
 
 
-class BSTPostOrderIterator(Generic[K,V]):
-    """ Post-order iterator for the binary search tree.
-        Performs stack-based BST traversal.
+class BSTMorrisIterator(Generic[K,V]):
+    """ In-order iterator for the binary search tree, using O(1) extra memory.
+        Performs Morris traversal: before going down to the left subtree of a node, the missing
+        right child of its predecessor (the largest node of the left subtree) is pointed back to
+        the node, so that the traversal can climb back up without a stack. The link is removed
+        when it is followed, which finds each predecessor a second time, so iterating the whole
+        tree takes O(N) time but about twice as many steps as BSTInOrderIterator.
+
+        While it is being iterated, the tree holds these extra links: it must not be used or
+        modified until the iteration is over. An iteration stopped early should be closed,
+        which finishes it to remove the links.
     """
 
     def __init__(self, root: BinaryNode[K, V] | None) -> None:
         """ Iterator initialiser. """
-        self._stack = LinkedStack[Tuple[BinaryNode[K, V], bool]]()
-        if root is not None:
-            self._stack.push((root, False))
+        self._current = root
+
+    def __iter__(self) -> BSTMorrisIterator:
+        """ Standard __iter__() method for initialisers. Returns itself. """
+        return self
+
+    def __next__(self) -> Tuple[K, V]:
+        """ The main body of the iterator.
+            Returns keys of the BST one by one respecting the in-order.
+        """
+        current = self._current
+        while current is not None:
+            if current._left is None:
+                self._current = current._right
+                return current._key, current._item
+            predecessor = current._left
+            while predecessor._right is not None and predecessor._right is not current:
+                predecessor = predecessor._right
+            if predecessor._right is None:
+                # First visit: link back, then go through the left subtree.
+                predecessor._right = current
+                current = current._left
+            else:
+                # Back from the left subtree: unlink, then visit current.
+                predecessor._right = None
+                self._current = current._right
+                return current._key, current._item
+        self._current = None
+        raise StopIteration
+
+    def close(self) -> None:
+        """
+            Finishes the iteration, restoring the tree.
+            :complexity: O(N) where N is the number of nodes in the tree.
+        """
+        for _ in self:
+            pass
+
+
+class BSTRangeIterator(Generic[K,V]):
+    """ In-order iterator over the keys of the binary search tree within bounds.
+        Performs stack-based BST traversal like BSTInOrderIterator, but never goes into a left
+        subtree whose keys are all below the lower bound, and stops at the first key above the
+        upper bound. So only the keys in range and O(D) others are visited, where D is the depth
+        of the tree.
+        A bound of None leaves the range unbounded on that side.
+    """
+
+    def __init__(self, root: BinaryNode[K, V] | None, low: K | None, high: K | None,
+                 inclusive: Tuple[bool, bool] = (True, False), capacity: int = 1) -> None:
+        """
+            Iterator initialiser. inclusive tells whether each of low and high is in the range,
+            and capacity is the initial capacity of the stack.
+        """
+        self._stack = ArrayStack[BinaryNode[K,V]](capacity, resizable=True)
+        self._low, self._high = low, high
+        self._include_low, self._include_high = inclusive
+        self.__push_left(root)
+
+    def __above_low(self, key: K) -> bool:
+        """ Whether the key is not below the lower bound. """
+        if self._low is None:
+            return True
+        return self._low < key or (self._include_low and key == self._low)
+
+    def __below_high(self, key: K) -> bool:
+        """ Whether the key is not above the upper bound. """
+        if self._high is None:
+            return True
+        return key < self._high or (self._include_high and key == self._high)
+
+    def __push_left(self, current: BinaryNode[K, V] | None) -> None:
+        """ Pushes the path to the smallest key in range of the subtree, skipping nodes below it. """
+        while current is not None:
+            if self.__above_low(current._key):
+                self._stack.push(current)
+                current = current._left
+            else:
+                current = current._right
+
+    def __iter__(self) -> BSTRangeIterator:
+        """ Standard __iter__() method for initialisers. Returns itself. """
+        return self
+
+    def __next__(self) -> Tuple[K, V]:
+        """ The main body of the iterator.
+            Returns keys of the BST within bounds one by one respecting the in-order.
+        """
+        if self._stack.is_empty():
+            raise StopIteration
+        result = self._stack.pop()
+        if not self.__below_high(result._key):
+            self._stack.clear()
+            raise StopIteration
+        self.__push_left(result._right)
+
+        return result._key, result._item
+
+
+class BSTPostOrderIterator(Generic[K,V]):
+    """ Post-order iterator for the binary search tree.
+        Performs stack-based BST traversal, with a resizable ArrayStack holding the path to the
+        current node, so a capacity of the height of the tree never has to grow.
+        A node is returned once its right subtree is done, which is when the last node returned
+        is its right child (or it has none).
+    """
+
+    def __init__(self, root: BinaryNode[K, V] | None, capacity: int = 1) -> None:
+        """ Iterator initialiser. capacity is the initial capacity of the stack. """
+        self._stack = ArrayStack[BinaryNode[K,V]](capacity, resizable=True)
+        self._last = None
+        self.__push_left(root)
+
+    def __push_left(self, current: BinaryNode[K, V] | None) -> None:
+        """ Pushes the path down the left children of the subtree. """
+        while current is not None:
+            self._stack.push(current)
+            current = current._left
 
     def __iter__(self) -> BSTPostOrderIterator:
         """ Standard __iter__() method for initialisers. Returns itself. """
@@ -95,21 +222,26 @@ class BSTPostOrderIterator(Generic[K,V]):
         """ The main body of the iterator.
             Returns keys of the BST one by one respecting the post-order.
         """
-        while True:
-            if self._stack.is_empty():
-                raise StopIteration
-            current, expanded = self._stack.pop()
-            if expanded:
-                return current._key, current._item
+        while not self._stack.is_empty():
+            current = self._stack.peek()
+            if current._right is not None and current._right is not self._last:
+                self.__push_left(current._right)
             else:
-                self._stack.push((current, True))
-                if current._right:
-                    self._stack.push((current._right, False))
-                if current._left:
-                    self._stack.push((current._left, False))
+                self._last = self._stack.pop()
+                return current._key, current._item
+        raise StopIteration
 
 class BinarySearchTree(AbstractBinarySearchTree[K,V]):
-    """ Basic binary search tree. """
+    """ Basic binary search tree.
+        The _size of every node is the number of nodes in its subtree (itself included), which is
+        kept up to date by every insertion and deletion. This makes the tree an order-statistic tree:
+        finding the key of a given rank (kth_smallest), the rank of a key (rank) and the number of
+        keys in a range (count_range) only walk down one path, instead of going through the keys.
+        Likewise, min, max, floor, ceiling, predecessor and successor walk down one path, and
+        range_iter only goes into the subtrees which hold keys in range.
+        split, join and union make new perfectly balanced trees (as from_sorted_pairs does) from
+        the in-order sequences of their trees, without inserting the keys one by one.
+    """
 
     def __init__(self) -> None:
         """
@@ -127,39 +259,374 @@ class BinarySearchTree(AbstractBinarySearchTree[K,V]):
             Creates a binary search tree object from binary node.
             Useful if a bottom up construction of the tree can be done efficiently.
             Length argument is not checked if passed in.
-            :complexity:
-                :best: O(1) when length and search invariant are not checked.
-                :worst: O(N) where N is the number of nodes in the tree
+            The _size of every node is set to the number of nodes in its subtree.
+            :complexity: O(N) where N is the number of nodes in the tree, to set the sizes.
         """
 
-        def len_aux(current: BinaryNode | None) -> int:
-            if current is None:
-                return 0
-            return 1 + len_aux(current._left) + len_aux(current._right)
-
-        def check_bst_invariant(node: BinaryNode | None, l=None, r=None) -> bool:
-            if node is None:
-                return True
-            if not l is None:
-                if node._key < l: return False
-            if not r is None:
-                if node._key > r: return False
-            return (check_bst_invariant(node._left, l, node._key) and
-                    check_bst_invariant(node._right, node._key, r))
-
         if not isinstance(node, (BinaryNode, type(None))):
             raise TypeError(f"Cannot instantiate binary tree with node type: {type(node)}")
 
         if check_invariant:
-            if not check_bst_invariant(node):
+            if not BinarySearchTree.__check_bst_invariant(node):
                 raise ValueError("Constructed BinarySearchTree does not satisfy search invariant.")
 
         tree = BinarySearchTree()
         tree._root = node
-        tree._length = length if length else len_aux(node)
+        size = BinarySearchTree.__compute_sizes(node)
+        tree._length = length if length else size
+
+        return tree
+
+    @staticmethod
+    def __compute_sizes(root: BinaryNode[K, V] | None) -> int:
+        """
+            Sets the size of every node in the subtree, in post-order so that children come first.
+            :returns: the number of nodes in the subtree.
+            :complexity: O(N) where N is the number of nodes in the subtree.
+        """
+        stack = LinkedStack[Tuple[BinaryNode[K, V], bool]]()
+        if root is not None:
+            stack.push((root, False))
+        while not stack.is_empty():
+            current, expanded = stack.pop()
+            if expanded:
+                current._size = 1 + BinarySearchTree._subtree_size(current._left) + BinarySearchTree._subtree_size(current._right)
+            else:
+                stack.push((current, True))
+                if current._right:
+                    stack.push((current._right, False))
+                if current._left:
+                    stack.push((current._left, False))
+        return BinarySearchTree._subtree_size(root)
+
+    @classmethod
+    def from_sorted(cls, items: Iterable[V], check_invariant: bool = False) -> BinarySearchTree[K, V]:
+        """
+            Creates a perfectly balanced tree of items which are their own keys, see from_sorted_pairs.
+            :complexity: O(N) where N is the number of items.
+        """
+        return cls.from_sorted_pairs([(item, item) for item in items], check_invariant)
+
+    @classmethod
+    def from_sorted_pairs(cls, pairs: Iterable[Tuple[K, V]], check_invariant: bool = False) -> BinarySearchTree[K, V]:
+        """
+            Creates a perfectly balanced tree (every level full but the last) from (key, item) pairs
+            whose keys are strictly increasing, without comparing them: the middle pair is the root,
+            and each half makes one of its subtrees in the same way.
+            :raises ValueError: when check_invariant is set and the keys are not sorted, checked by
+                the from_node of the class.
+            :complexity: O(N) where N is the number of pairs.
+        """
+        pairs = pairs if hasattr(pairs, '__len__') else list(pairs)
+        nodes = ArrayR(len(pairs))
+        for i, (key, item) in enumerate(pairs):
+            nodes[i] = cls._new_node(key, item)
+        if check_invariant:
+            root = cls.__link_balanced(nodes, 0, len(nodes), 1, (len(nodes) + 1).bit_length() - 1)
+            return cls.from_node(root, len(nodes), check_invariant)
+        return cls.__from_nodes(nodes, len(nodes))
 
+    @classmethod
+    def __from_nodes(cls, nodes: ArrayR[BinaryNode[K, V]], length: int) -> BinarySearchTree[K, V]:
+        """
+            Creates a perfectly balanced tree from the first length nodes of an array, whose keys
+            are strictly increasing.
+            :complexity: O(N) where N is length.
+        """
+        tree = cls()
+        tree._root = cls.__link_balanced(nodes, 0, length, 1, (length + 1).bit_length() - 1)
+        tree._length = length
         return tree
 
+    def split(self, key: K) -> Tuple[BinarySearchTree[K, V], BinarySearchTree[K, V]]:
+        """
+            Splits the tree at a key, which does not need to be in the tree: returns a tree of the
+            pairs with keys smaller than key, and a tree of the others, both perfectly balanced and
+            of the same class as this tree, which is not changed.
+            rank tells how many pairs go left, so only the keys on one path are compared.
+            :complexity: O(CompK * D + N) where D is the depth of the tree and N its number of nodes.
+        """
+        cls = type(self)
+        count = self.rank(key)
+        left, right = ArrayR(count), ArrayR(len(self) - count)
+        for i, (node_key, item) in enumerate(self):
+            if i < count:
+                left[i] = cls._new_node(node_key, item)
+            else:
+                right[i - count] = cls._new_node(node_key, item)
+        return cls.__from_nodes(left, len(left)), cls.__from_nodes(right, len(right))
+
+    @classmethod
+    def join(cls, left: BinarySearchTree[K, V], right: BinarySearchTree[K, V]) -> BinarySearchTree[K, V]:
+        """
+            Joins two trees, every key of the left tree being smaller than every key of the right
+            tree, into a new perfectly balanced tree of this class. Neither tree is changed.
+            :raises ValueError: when a key of the left tree is not smaller than a key of the right tree.
+            :complexity: O(CompK * (DL + DR) + NL + NR) where DL and DR are the depths of the trees
+                and NL and NR their numbers of nodes.
+        """
+        if not left.is_empty() and not right.is_empty() and not left.max()[0] < right.min()[0]:
+            raise ValueError("Cannot join trees whose keys overlap.")
+        nodes = ArrayR(len(left) + len(right))
+        i = 0
+        for tree in (left, right):
+            for key, item in tree:
+                nodes[i] = cls._new_node(key, item)
+                i += 1
+        return cls.__from_nodes(nodes, len(nodes))
+
+    def union(self, other: BinarySearchTree[K, V]) -> BinarySearchTree[K, V]:
+        """
+            Returns a new perfectly balanced tree, of the same class as this tree, with the pairs of
+            both trees. When both have a key, the item of the other tree is kept (as dict.update does).
+            The in-order sequences of the trees are merged, and neither tree is changed.
+            :complexity: O(CompK * (N + M)) where N and M are the numbers of nodes of the trees.
+        """
+        cls = type(self)
+        nodes = ArrayR(len(self) + len(other))
+        mine, theirs = iter(self), iter(other)
+        pair, other_pair = next(mine, None), next(theirs, None)
+        length = 0
+        while pair is not None or other_pair is not None:
+            if other_pair is None or (pair is not None and pair[0] < other_pair[0]):
+                nodes[length] = cls._new_node(*pair)
+                pair = next(mine, None)
+            else:
+                if pair is not None and not other_pair[0] < pair[0]:
+                    pair = next(mine, None)
+                nodes[length] = cls._new_node(*other_pair)
+                other_pair = next(theirs, None)
+            length += 1
+        return cls.__from_nodes(nodes, length)
+
+    def rebuild(self) -> None:
+        """
+            Rebalances the tree in place, as a scapegoat tree does: its nodes are laid out in order
+            in an array, then relinked into a perfectly balanced tree (see from_sorted_pairs).
+            No node is created and no key is compared.
+            :complexity: O(N) where N is the number of nodes in the tree.
+        """
+        nodes = ArrayR(len(self))
+        stack = ArrayStack[BinaryNode[K, V]](self._stack_capacity(), resizable=True)
+        current = self._root
+        i = 0
+        while current is not None or not stack.is_empty():
+            while current is not None:
+                stack.push(current)
+                current = current._left
+            current = stack.pop()
+            nodes[i] = current
+            i += 1
+            current = current._right
+        self._root = type(self).__link_balanced(nodes, 0, len(nodes), 1, (len(nodes) + 1).bit_length() - 1)
+
+    @classmethod
+    def __link_balanced(cls, nodes: ArrayR[BinaryNode[K, V]], start: int, end: int, depth: int,
+                        full_levels: int) -> BinaryNode[K, V] | None:
+        """
+            Links the nodes between start (included) and end (excluded) into a perfectly balanced
+            subtree at the given depth (1 for the root), in which the first full_levels levels are full,
+            and sets their sizes.
+            :returns: the root of the subtree.
+        """
+        if start == end:
+            return None
+        mid = (start + end) // 2
+        current = nodes[mid]
+        current._left = cls.__link_balanced(nodes, start, mid, depth + 1, full_levels)
+        current._right = cls.__link_balanced(nodes, mid + 1, end, depth + 1, full_levels)
+        current._size = end - start
+        cls._place_node(current, depth, full_levels)
+        return current
+
+    @staticmethod
+    def _new_node(key: K, item: V) -> BinaryNode[K, V]:
+        """ Creates a node of the type used by the tree, for from_sorted_pairs. """
+        return BinaryNode(item, key)
+
+    @staticmethod
+    def _place_node(current: BinaryNode[K, V], depth: int, full_levels: int) -> None:
+        """
+            Called on every node linked into a perfectly balanced tree (after its subtrees), with
+            its depth (1 for the root) and the number of full levels, for trees which keep more than
+            sizes in their nodes.
+        """
+        pass
+
+    @staticmethod
+    def _subtree_size(current: BinaryNode[K, V] | None) -> int:
+        """ Returns the number of nodes in a subtree, 0 when it is empty. """
+        return current._size if current is not None else 0
+
+    def kth_smallest(self, k: int) -> Tuple[K, V]:
+        """
+            Returns the (key, item) pair with the k-th smallest key, counting from 1.
+            At each node, the size of the left subtree tells whether the pair is in it, at the
+            node itself, or in the right subtree (skipping the left subtree and the node).
+            :raises IndexError: when k is not between 1 and the number of nodes.
+            :complexity: O(D) where D is the depth of the tree.
+        """
+        if not 1 <= k <= len(self):
+            raise IndexError(f"No {k}-th smallest key in a tree of {len(self)} keys")
+        current = self._root
+        while True:
+            left = BinarySearchTree._subtree_size(current._left)
+            if k <= left:
+                current = current._left
+            elif k == left + 1:
+                return current._key, current._item
+            else:
+                k -= left + 1
+                current = current._right
+
+    def rank(self, key: K) -> int:
+        """
+            Returns the number of keys in the tree smaller than the given key, which does not need
+            to be in the tree. For a key in the tree, this is its position in sorted order (from 0).
+            Every time the search goes right, the left subtree and the node are smaller than the key.
+            :complexity: O(CompK * D) where D is the depth of the tree.
+        """
+        res = 0
+        current = self._root
+        while current is not None:
+            if key <= current._key:
+                current = current._left
+            else:
+                res += BinarySearchTree._subtree_size(current._left) + 1
+                current = current._right
+        return res
+
+    def count_range(self, low: K, high: K) -> int:
+        """
+            Returns the number of keys in the tree between low (included) and high (excluded).
+            :complexity: O(CompK * D) where D is the depth of the tree, see rank.
+        """
+        if not low < high:
+            return 0
+        return self.rank(high) - self.rank(low)
+
+    def range_iter(self, low: K | None = None, high: K | None = None,
+                   inclusive: Tuple[bool, bool] = (True, False)) -> BSTRangeIterator:
+        """
+            Creates an in-order iterator over the (key, item) pairs with keys between low and high,
+            by default from low (included) to high (excluded) as in count_range.
+            :param low: the lower bound, or None for no lower bound.
+            :param high: the upper bound, or None for no upper bound.
+            :param inclusive: whether low and whether high are included in the range.
+            :complexity: O(CompK * (D + M)) to iterate, where D is the depth of the tree and M the
+                number of keys in range, see BSTRangeIterator.
+        """
+        return BSTRangeIterator(self._root, low, high, inclusive, self._stack_capacity())
+
+    def min(self) -> Tuple[K, V]:
+        """
+            Returns the (key, item) pair with the smallest key.
+            :raises KeyError: when the tree is empty.
+            :complexity: O(D) where D is the depth of the tree.
+        """
+        return BinarySearchTree.__pair(self.__get_min_node(self._root), 'Minimum of an empty tree')
+
+    def max(self) -> Tuple[K, V]:
+        """
+            Returns the (key, item) pair with the largest key.
+            :raises KeyError: when the tree is empty.
+            :complexity: O(D) where D is the depth of the tree.
+        """
+        return BinarySearchTree.__pair(self.__get_max_node(self._root), 'Maximum of an empty tree')
+
+    def floor(self, key: K) -> Tuple[K, V]:
+        """
+            Returns the (key, item) pair with the largest key smaller than or equal to the given key,
+            which does not need to be in the tree.
+            :raises KeyError: when every key in the tree is larger.
+            :complexity: O(CompK * D) where D is the depth of the tree.
+        """
+        return BinarySearchTree.__pair(self.__floor_node(key, False), f'No key at most {key}')
+
+    def ceiling(self, key: K) -> Tuple[K, V]:
+        """
+            Returns the (key, item) pair with the smallest key larger than or equal to the given key,
+            which does not need to be in the tree.
+            :raises KeyError: when every key in the tree is smaller.
+            :complexity: O(CompK * D) where D is the depth of the tree.
+        """
+        return BinarySearchTree.__pair(self.__ceiling_node(key, False), f'No key at least {key}')
+
+    def predecessor(self, key: K) -> Tuple[K, V]:
+        """
+            Returns the (key, item) pair with the largest key strictly smaller than the given key,
+            which does not need to be in the tree.
+            :raises KeyError: when no key in the tree is smaller.
+            :complexity: O(CompK * D) where D is the depth of the tree.
+        """
+        return BinarySearchTree.__pair(self.__floor_node(key, True), f'No key before {key}')
+
+    def successor(self, key: K) -> Tuple[K, V]:
+        """
+            Returns the (key, item) pair with the smallest key strictly larger than the given key,
+            which does not need to be in the tree.
+            :raises KeyError: when no key in the tree is larger.
+            :complexity: O(CompK * D) where D is the depth of the tree.
+        """
+        return BinarySearchTree.__pair(self.__ceiling_node(key, True), f'No key after {key}')
+
+    @staticmethod
+    def __pair(current: BinaryNode[K, V] | None, message: str) -> Tuple[K, V]:
+        """ Returns the (key, item) pair of a node found by a query, raising KeyError with the message if there is none. """
+        if current is None:
+            raise KeyError(message)
+        return current._key, current._item
+
+    def __floor_node(self, key: K, strict: bool) -> BinaryNode[K, V] | None:
+        """
+            Returns the node with the largest key smaller than the given key (or equal to it, unless strict).
+            Every time the search goes right, the node is the best candidate so far.
+        """
+        res = None
+        current = self._root
+        while current is not None:
+            if current._key < key or (not strict and current._key == key):
+                res = current
+                current = current._right
+            else:
+                current = current._left
+        return res
+
+    def __ceiling_node(self, key: K, strict: bool) -> BinaryNode[K, V] | None:
+        """
+            Returns the node with the smallest key larger than the given key (or equal to it, unless strict).
+            Every time the search goes left, the node is the best candidate so far.
+        """
+        res = None
+        current = self._root
+        while current is not None:
+            if key < current._key or (not strict and current._key == key):
+                res = current
+                current = current._left
+            else:
+                current = current._right
+        return res
+
+    @staticmethod
+    def __check_bst_invariant(root: BinaryNode[K, V] | None) -> bool:
+        """
+            Checks that every key in the subtree is between the bounds set by its ancestors,
+            going through it with a stack of (node, lower bound, upper bound).
+            :complexity: O(N * CompK) where N is the number of nodes in the subtree.
+        """
+        stack = LinkedStack[Tuple[BinaryNode[K, V], K | None, K | None]]()
+        if root is not None:
+            stack.push((root, None, None))
+        while not stack.is_empty():
+            current, lower, upper = stack.pop()
+            if (lower is not None and current._key < lower) or (upper is not None and current._key > upper):
+                return False
+            if current._left is not None:
+                stack.push((current._left, lower, current._key))
+            if current._right is not None:
+                stack.push((current._right, current._key, upper))
+        return True
+
     def __get_successor(self, current: BinaryNode[K, V]) -> BinaryNode[K, V] | None:
         """
             Get successor of the current node.
@@ -207,10 +674,13 @@ class BinarySearchTree(AbstractBinarySearchTree[K,V]):
         return current._left is None and current._right is None
 
     def items(self) -> ArrayR[Tuple[K, V]]:
+        """
+            Returns an array of the (key, item) pairs in key order, as returned by the in-order iterator.
+            :complexity: O(N) where N is the number of nodes in the tree.
+        """
         array = ArrayR(len(self))
-        for i, node in enumerate(self):
-            tup = (node[0], node[1])
-            array[i] = tup
+        for i, pair in enumerate(self):
+            array[i] = pair
         return array
 
     def is_empty(self) -> bool:
@@ -232,92 +702,136 @@ class BinarySearchTree(AbstractBinarySearchTree[K,V]):
         else:
             return True
 
+    def _stack_capacity(self) -> int:
+        """
+            Returns the initial capacity of the stacks of the iterators: the height of the tree
+            (plus one) when it is known, so that they never grow. The height of a BinarySearchTree
+            is not known, so this is that of a perfectly balanced tree, and the stacks grow as needed.
+        """
+        return len(self).bit_length() + 1
+
     def __iter__(self) -> BSTInOrderIterator:
         """ Create an in-order iterator. """
-        return BSTInOrderIterator(self._root)
+        return BSTInOrderIterator(self._root, self._stack_capacity())
+
+    def morris_iter(self) -> BSTMorrisIterator:
+        """
+            Create an in-order iterator using O(1) extra memory, see BSTMorrisIterator.
+            The tree must not be used until the iteration is over (or the iterator is closed).
+        """
+        return BSTMorrisIterator(self._root)
 
     def post_iter(self) -> BSTPostOrderIterator:
-        return BSTPostOrderIterator(self._root)
+        return BSTPostOrderIterator(self._root, self._stack_capacity())
 
     def pre_iter(self) -> BSTPreOrderIterator:
-        return BSTPreOrderIterator(self._root)
+        return BSTPreOrderIterator(self._root, self._stack_capacity())
 
     def __delitem__(self, key: K) -> None:
-        def delete_aux(current: BinaryNode[K, V], key: K) -> BinaryNode[K, V]:
-            """
-                Attempts to delete an item from the tree, it uses the Key to
-                determine the node to delete.
-            """
-
-            if current is None:  # key not found
-                raise KeyError('Deleting non-existent item')
-            elif key < current._key:
-                current._left = delete_aux(current._left, key)
-            elif key > current._key:
-                current._right = delete_aux(current._right, key)
-            else:  # we found our key => do actual deletion
-                if self.is_leaf(current):
-                    self._length -= 1
-                    return None
-                elif current._left is None:
-                    self._length -= 1
-                    return current._right
-                elif current._right is None:
-                    self._length -= 1
-                    return current._left
-
-                # general case => find a successor
-                successor = self.__get_successor(current)
-                current._key = successor._key
-                current._item = successor._item
-                current._right = delete_aux(current._right, successor._key)
-
-            return current
-
-        self._root = delete_aux(self._root, key)
+        """
+            Deletes the item of a key from the tree, it uses the Key to find its node.
+            A node with two children takes the key and item of its successor, whose node
+            (which has no left child) is removed instead.
+            The sizes on the path are decremented on the way down, so the path is only walked
+            once, and restored by walking it again when the key turns out not to be in the tree.
+            :raises KeyError: when the key is not in the tree.
+            :complexity best: O(CompK) deletes the root, which has at most one child
+            :complexity worst: O(CompK * D) where D is the depth of the tree
+            CompK is the complexity of comparing the keys
+        """
+        # Every node on the path to the removed node loses one node from its subtree.
+        parent = None
+        current = self._root
+        while current is not None and key != current._key:
+            current._size -= 1
+            parent = current
+            current = current._left if key < current._key else current._right
+        if current is None:
+            self.__add_to_path_sizes(key, None, 1)
+            raise KeyError('Deleting non-existent item')
+        current._size -= 1
+
+        if current._left is not None and current._right is not None:
+            parent = current
+            successor = current._right
+            while successor._left is not None:
+                successor._size -= 1
+                parent = successor
+                successor = successor._left
+            current._key = successor._key
+            current._item = successor._item
+            current = successor
+
+        # current now has at most one child, which takes its place.
+        child = current._left if current._left is not None else current._right
+        if parent is None:
+            self._root = child
+        elif current is parent._left:
+            parent._left = child
+        else:
+            parent._right = child
+        self._length -= 1
 
     def __getitem__(self, key: K) -> V:
         """
             Attempts to get an item in the tree, it uses the Key to attempt to find it
+            :raises KeyError: when the key is not in the tree.
             :complexity best: O(CompK) finds the item in the root of the tree
             :complexity worst: O(CompK * D) item is not found, where D is the depth of the tree
             CompK is the complexity of comparing the keys
         """
-
-        def get_tree_node_by_key(current: BinaryNode[K, V], key: K) -> BinaryNode[K, V]:
-            if current is None:  # base case: empty
-                raise KeyError(f'Key not found: {key}')
-            elif key == current._key:  # base case: found
-                return current
-            elif key < current._key:
-                return get_tree_node_by_key(current._left, key)
-            else:  # key > current.key
-                return get_tree_node_by_key(current._right, key)
-
-        return get_tree_node_by_key(self._root, key)._item
+        current = self._root
+        while current is not None:
+            if key == current._key:
+                return current._item
+            current = current._left if key < current._key else current._right
+        raise KeyError(f'Key not found: {key}')
 
     def __setitem__(self, key: K, item: V) -> None:
-        def insert_aux(current: BinaryNode[K, V], key: K, item: V, current_depth: int) -> BinaryNode[K, V] | None:
-            """
-                Attempts to insert an item into the tree, it uses the Key to insert it
-                :complexity:
-                    :best: O(CompK) inserts the item at the root.
-                    :worst: O(CompK * D) inserting at the bottom of the tree
-                where D is the depth of the tree
-                CompK is the complexity of comparing the keys
-            """
-            if current is None:  # base case: at the leaf
-                current = BinaryNode(item, key, current_depth)
-                self._length += 1
-            elif key < current._key:
-                current._left = insert_aux(current._left, key, item, current_depth + 1)
+        """
+            Attempts to insert an item into the tree, it uses the Key to insert it.
+            The sizes on the path are incremented on the way down, so the path is only walked once
+            for a new key, and restored by walking it again when the key turns out to be in the tree.
+            :complexity:
+                :best: O(CompK) inserts the item at the root.
+                :worst: O(CompK * D) inserting at the bottom of the tree
+            where D is the depth of the tree
+            CompK is the complexity of comparing the keys
+        """
+        parent = None
+        current = self._root
+        while current is not None:
+            if key < current._key:
+                current._size += 1
+                parent, current = current, current._left
             elif key > current._key:
-                current._right = insert_aux(current._right, key, item, current_depth + 1)
-            else:  # key == current.key
+                current._size += 1
+                parent, current = current, current._right
+            else:
                 current._item = item
-            return current
+                self.__add_to_path_sizes(key, current, -1)
+                return
+
+        node = BinaryNode(item, key, 1)
+        if parent is None:
+            self._root = node
+        elif key < parent._key:
+            parent._left = node
+        else:
+            parent._right = node
+        self._length += 1
 
-        self._root = insert_aux(self._root, key, item, 0)
+    def __add_to_path_sizes(self, key: K, end: BinaryNode[K, V] | None, change: int) -> None:
+        """
+            Adds change to the size of every node on the search path of key, before end (the
+            node of key, or None when it is not in the tree), undoing the changes of an insertion
+            which found its key or a deletion which did not.
+            :complexity: O(CompK * D) where D is the depth of the tree.
+        """
+        current = self._root
+        while current is not end:
+            current._size += change
+            current = current._left if key < current._key else current._right
 
     def __len__(self) -> int:
         """ Returns the number of nodes in the tree. """
@@ -331,9 +845,9 @@ class BinarySearchTree(AbstractBinarySearchTree[K,V]):
             return f"{prefix[:-indent]}({prefix}{current._key}, {prefix}{current._item}, {str_aux(current._left, indent, depth + 1)}, {str_aux(current._right, indent, depth + 1)}{prefix[:-indent]})"
 
         if self._root is None:
-            return f"<BinarySearchTree({self._root})>"
+            return f"<{type(self).__name__}({self._root})>"
         tree_str = str_aux(self._root, indent = indent, depth = 1)
-        return f"<BinarySearchTree{tree_str}>"
+        return f"<{type(self).__name__}{tree_str}>"
 
     def __str__(self) -> str:
         return self.str(0)
@@ -0,0 +1,313 @@
+from __future__ import annotations
+import threading
+from typing import Tuple, Iterator, Iterable
+from data_structures.abstract_hash_table import HashTable, K, V, _MISSING
+from data_structures.hash_table_linear_probing import LinearProbeTable
+from data_structures.referential_array import ArrayR
+
+class ConcurrentHashTable(HashTable[K, V]):
+    """
+    Concurrent Hash Table.
+    Defines a Hash Table which can be shared between threads, built out of a fixed number of
+    segments, each of them an independent hash table (LinearProbeTable by default) guarded
+    by its own lock (lock striping). A key always goes to the same segment, so threads working
+    on different segments never wait for each other, and each segment resizes on its own.
+
+    Writes take the lock of their segment. Reads do not: every segment has a version which
+    writers increment before and after modifying it, so it is odd while a write is in progress.
+    A reader takes a snapshot of the version, looks the key up, and only trusts the result
+    if the version is still the same even number afterwards. Otherwise (or if the lookup
+    failed because the segment was resized under its feet) it looks the key up again
+    holding the lock.
+    For this to be safe, lookups must not modify the segment table, which rules out
+    IncrementalRehashTable segments.
+
+    Operations over the whole table (len, items, iteration) visit the segments one at a time,
+    so they are only consistent within each segment, and never raise because of concurrent
+    modifications.
+
+    Type Arguments:
+        - K:    Key Type.
+        - V:    Value Type.
+
+    Unless stated otherwise, all methods have the complexity of the same method in the segment table.
+    """
+
+    DEFAULT_SEGMENTS = 16
+
+    def __init__(self, segments: int = DEFAULT_SEGMENTS, table_type: type = LinearProbeTable, **table_args) -> None:
+        """
+        :param segments: number of segments (and locks).
+        :param table_type: hash table class used for each segment.
+        :param table_args: arguments passed to the constructor of each segment.
+        :raises ValueError: when the number of segments is not positive.
+        :complexity: O(S) where S is the number of segments, plus the cost of creating each segment.
+        """
+        if segments <= 0:
+            raise ValueError("Number of segments should be larger than 0.")
+        HashTable.__init__(self)
+        self._table_type = table_type
+        self._segments: ArrayR[HashTable[K, V]] = ArrayR(segments)
+        self._locks: ArrayR[threading.Lock] = ArrayR(segments)
+        self._versions: ArrayR[int] = ArrayR(segments)
+        for i in range(segments):
+            self._segments[i] = table_type(**table_args)
+            self._locks[i] = threading.Lock()
+            self._versions[i] = 0
+
+    def hash(self, key: K) -> int:
+        """
+        Returns the segment of a key.
+        Uses HashTable._universal_hash, so that it does not depend on the hash used within the segments.
+        :complexity: See HashTable._universal_hash.
+        """
+        return self._universal_hash(key) % len(self._segments)
+
+    @property
+    def table_size(self) -> int:
+        """
+        Returns the combined size of all segments.
+        :complexity: O(S) where S is the number of segments.
+        """
+        return sum(segment.table_size for segment in self._segments)
+
+    def _dump_header(self) -> dict:
+        """
+        Returns the number of segments and their class, see HashTable.dump.
+        The arguments passed to the constructor of each segment are not kept.
+        """
+        return {'segments': len(self._segments), 'table_type': self._table_type}
+
+    @classmethod
+    def _from_header(cls, header: dict) -> ConcurrentHashTable[K, V]:
+        """
+        Creates an empty table with the number of segments and segment class in the header.
+        """
+        return cls(header['segments'], header['table_type'])
+
+    def segment_count(self) -> int:
+        """
+        Returns the number of segments.
+        :complexity: O(1)
+        """
+        return len(self._segments)
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the value at a certain key, or default when the key doesn't exist, without taking
+        a lock unless a write to the same segment runs at the same time.
+        """
+        index = self.hash(key)
+        segment = self._segments[index]
+        version = self._versions[index]
+        if version % 2 == 0:
+            try:
+                data = segment.get(key, _MISSING)
+            except Exception:
+                # The segment changed during the lookup, so it is retried holding the lock.
+                pass
+            else:
+                if self._versions[index] == version:
+                    return default if data is _MISSING else data
+
+        with self._locks[index]:
+            data = segment.get(key, _MISSING)
+        return default if data is _MISSING else data
+
+    def __getitem__(self, key: K) -> V:
+        """
+        Get the value at a certain key. See get.
+        :raises KeyError: when the key doesn't exist.
+        """
+        data = self.get(key, _MISSING)
+        if data is _MISSING:
+            raise KeyError(key)
+        return data
+
+    def __setitem__(self, key: K, data: V) -> None:
+        """
+        Set an (key, value) pair in our hash table, holding the lock of its segment.
+        """
+        index = self.hash(key)
+        with self._locks[index]:
+            self._versions[index] += 1
+            try:
+                self._segments[index][key] = data
+            finally:
+                self._versions[index] += 1
+
+    def __delitem__(self, key: K) -> None:
+        """
+        Deletes a (key, value) pair in our hash table, holding the lock of its segment.
+        :raises KeyError: when the key doesn't exist.
+        """
+        index = self.hash(key)
+        with self._locks[index]:
+            self._versions[index] += 1
+            try:
+                del self._segments[index][key]
+            finally:
+                self._versions[index] += 1
+
+    def setdefault(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the value at a certain key, inserting default for it first when the key doesn't exist.
+        Both happen holding the lock of its segment, so only one of many threads calling
+        setdefault for the same key inserts it.
+        """
+        index = self.hash(key)
+        with self._locks[index]:
+            self._versions[index] += 1
+            try:
+                return self._segments[index].setdefault(key, default)
+            finally:
+                self._versions[index] += 1
+
+    def pop(self, key: K, default: V = _MISSING) -> V:
+        """
+        Deletes the key and returns its data, or returns default when the key doesn't exist.
+        Both happen holding the lock of its segment, so only one of many threads popping
+        the same key gets its data.
+        :raises KeyError: when the key doesn't exist and no default is given.
+        """
+        data = self.__remove(key)
+        if data is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return data
+
+    def delete_many(self, keys: Iterable[K]) -> int:
+        """
+        Deletes every key in keys which is in the table, ignoring the others.
+        Each key is checked and deleted atomically (see pop), even if other threads delete it too.
+        :returns: the number of items deleted.
+        """
+        deleted = 0
+        for key in keys:
+            if self.__remove(key) is not _MISSING:
+                deleted += 1
+        return deleted
+
+    def __remove(self, key: K) -> V:
+        """
+        Deletes the key holding the lock of its segment.
+        :returns: the data of the key, or _MISSING when the key doesn't exist.
+        """
+        index = self.hash(key)
+        with self._locks[index]:
+            self._versions[index] += 1
+            try:
+                # Not pop(key, _MISSING): segment tables take _MISSING as no default given.
+                segment = self._segments[index]
+                data = segment.get(key, _MISSING)
+                if data is not _MISSING:
+                    del segment[key]
+                return data
+            finally:
+                self._versions[index] += 1
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Makes room for the given number of items, assuming they are spread evenly over the segments.
+        :complexity: O(S) plus the cost of reserve in each segment, where S is the number of segments.
+        """
+        per_segment = -(-capacity // len(self._segments))
+        for index in range(len(self._segments)):
+            with self._locks[index]:
+                self._versions[index] += 1
+                try:
+                    self._segments[index].reserve(per_segment)
+                finally:
+                    self._versions[index] += 1
+
+    def items(self) -> ArrayR[Tuple[K, V]]:
+        """
+        Returns all (key, value) pairs in the hash table.
+        Items added or removed while the segments are visited may or may not be included.
+        :complexity: O(N) where N is the combined size of all segments.
+        """
+        snapshots = ArrayR(len(self._segments))
+        length = 0
+        for index in range(len(self._segments)):
+            with self._locks[index]:
+                snapshots[index] = self._segments[index].items()
+            length += len(snapshots[index])
+
+        res = ArrayR(length)
+        i = 0
+        for snapshot in snapshots:
+            for item in snapshot:
+                res[i] = item
+                i += 1
+        return res
+
+    def iter_items(self) -> Iterator[Tuple[K, V]]:
+        """
+        Lazily yields every (key, value) pair in the hash table, taking a snapshot of one segment
+        at a time, so the table can be modified (even by the same thread) during iteration.
+        Items added or removed during iteration may or may not be yielded.
+        :complexity: O(N) for the whole iteration where N is the combined size of all segments.
+        """
+        for index in range(len(self._segments)):
+            with self._locks[index]:
+                snapshot = self._segments[index].items()
+            yield from snapshot
+
+    def is_full(self) -> bool:
+        """
+        Returns whether every segment is full.
+        :complexity: O(S) where S is the number of segments.
+        """
+        return all(segment.is_full() for segment in self._segments)
+
+    def enable_stats(self) -> None:
+        """
+        Starts recording statistics in every segment. See HashTable.enable_stats.
+        :complexity: O(S) where S is the number of segments.
+        """
+        for index in range(len(self._segments)):
+            with self._locks[index]:
+                self._segments[index].enable_stats()
+
+    def disable_stats(self) -> None:
+        """
+        Stops recording statistics in every segment.
+        :complexity: O(S) where S is the number of segments.
+        """
+        for index in range(len(self._segments)):
+            with self._locks[index]:
+                self._segments[index].disable_stats()
+
+    def _layout_stats(self) -> dict:
+        """
+        Returns the number of segments, the number of items in the fullest one,
+        and an array with the statistics of each segment (see HashTable.stats).
+        :complexity: O(S) plus the cost of stats in each segment, where S is the number of segments.
+        """
+        segment_stats = ArrayR(len(self._segments))
+        for index in range(len(self._segments)):
+            with self._locks[index]:
+                segment_stats[index] = self._segments[index].stats()
+        return {
+            'segments': len(self._segments),
+            'max_segment_size': max(stats['size'] for stats in segment_stats),
+            'segment_stats': segment_stats,
+        }
+
+    def __len__(self) -> int:
+        """
+        Returns the number of elements in the hash table.
+        The segments are counted one at a time, so this may be off while other threads modify the table.
+        :complexity: O(S) where S is the number of segments.
+        """
+        return sum(len(segment) for segment in self._segments)
+
+    def __str__(self) -> str:
+        """
+        Returns all they key/value pairs in our hash table (no particular
+        order).
+        """
+        items = self.items()
+        items = '\n'.join(map(lambda x: f"({x[0]}, {x[1]})", items))
+        return f"<ConcurrentHashTable\n{items}\n>"
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from data_structures.referential_array import ArrayR
+from data_structures.abstract_hash_table import K
 from data_structures.hash_table_quadratic_probing import QuadraticProbeTable
 
 class DoubleHashingTable(QuadraticProbeTable):
@@ -9,10 +9,18 @@ class DoubleHashingTable(QuadraticProbeTable):
     If you want to use this with a different key type, you should override the hash function.
     """
 
-    def hash2(self, key: str) -> int:
+    def hash2(self, key: K) -> int:
+        """
+        Hash a key to the step of its probe sequence, in [1, table_size).
+        Seeded tables take the step from the bits of HashTable._universal_hash which
+        are not used by the position, instead of the builtin hash.
+        :complexity: O(K) where K is the length of the key.
+        """
+        if self._seeded:
+            return 1 + (self._universal_hash(key) // self.table_size) % (self.table_size - 1)
         return 1 + (hash(key) % (self.table_size - 1))
 
-    def __handle_probing(self, key: str, is_insert: bool) -> int:
+    def _handle_probing(self, key: K, is_insert: bool) -> int:
         """
         Find the correct position for this key in the hash table using double hashing probing.
         :complexity:
@@ -21,31 +29,49 @@ class DoubleHashingTable(QuadraticProbeTable):
                 search the entire table.
             N is the number of items in the table.
             K is the length of the key.
-        :raises KeyError: When the key is not in the table, but is_insert is False.
+        :returns: the position of the key, or when it is not in the table, the empty position
+            where it should go if is_insert, -1 otherwise (so misses do not raise exceptions).
         :raises FullError: When a table is full and cannot be inserted.
         """
         # Initial position
         position = self.hash(key)
         step = self.hash2(key)
 
-        for _ in range(self.table_size):
-            if self._array[position] is None:
+        for probes in range(self.table_size):
+            slot = self._array[position]
+            if slot is None:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
                 # Empty spot. Am I upserting or retrieving?
                 if is_insert:
                     return position
                 else:
-                    raise KeyError(key)
-            elif self._array[position][0] == key:
+                    return -1
+            elif slot[0] == key:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
                 return position
             else:
                 # Taken by something else. Time to linear probe.
                 position = (position + step) % self.table_size
 
 
+        if self._stats is not None:
+            self._stats.record_probe(self.table_size)
         if is_insert:
             raise RuntimeError("Table is full!")
         else:
-            raise KeyError(key)
+            return -1
+
+    def _portable_key(self, key: K) -> bool:
+        """
+        Returns whether the key hashes to the same position and step in any process, given the
+        same hash parameters. Unless the table is seeded, the step is taken from the builtin hash,
+        which only gives the same value in every process for int keys.
+        """
+        if self._seeded:
+            return type(key) is int or type(key) is bytes or type(key) is str
+        return type(key) is int
 
     def __str__(self) -> str:
         """
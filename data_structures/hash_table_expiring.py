@@ -0,0 +1,235 @@
+from __future__ import annotations
+import math
+import sys
+import time
+from typing import Tuple, Iterator, Callable
+from data_structures.abstract_hash_table import HashTable, K, V
+from data_structures.hash_table_separate_chaining import HashTableSeparateChaining
+from data_structures.node_double import DoubleNode
+from data_structures.referential_array import ArrayR
+from data_structures.timing_wheel import TimingWheel
+
+class ExpiringHashTable(HashTable[K, V]):
+    """
+    Expiring Hash Table.
+    Defines a Hash Table where each key can be given a time to live (TTL), after which it expires
+    and is removed, built on another hash table (HashTableSeparateChaining by default).
+
+    Each entry is a DoubleNode holding its key, its data and the time at which it expires,
+    measured in ticks of the given resolution (infinity for keys which never expire).
+    Keys with a TTL are scheduled in a TimingWheel at that same time.
+    Times are in seconds as given by the clock.
+
+    Expired keys are removed in two ways:
+        - lazily, when they are accessed, and
+        - by advancing the wheel at the start of every operation, which removes the keys whose tick
+          has passed without looking at any other key. As a key is scheduled for the first tick
+          after it expires, expired keys may be kept for up to one tick until they are accessed.
+
+    attributes:
+        expirations: number of keys removed because they expired
+        bytes_reclaimed: total size of the keys and data removed because they expired, as given by
+            sys.getsizeof (so it does not include the size of the objects they refer to)
+
+    Type Arguments:
+        - K:    Key Type.
+        - V:    Value Type.
+
+    Unless stated otherwise, all methods have the complexity of the same method in the underlying
+    table, plus the cost of advancing the wheel (see TimingWheel.advance), which is O(1) amortised.
+    """
+
+    def __init__(self, default_ttl: float | None = None, clock: Callable[[], float] = time.monotonic,
+                 resolution: float = 1.0, table_type: type = HashTableSeparateChaining) -> None:
+        """
+        :param default_ttl: TTL (in seconds) of the keys set without giving one, or None for keys which never expire.
+        :param clock: function returning the current time in seconds, which should never go backwards.
+        :param resolution: length (in seconds) of a tick of the timing wheel.
+        :param table_type: hash table class used to store the entries.
+        :raises ValueError: when the resolution or the default TTL is not positive.
+        """
+        if resolution <= 0:
+            raise ValueError("Resolution should be larger than 0.")
+        if default_ttl is not None and default_ttl <= 0:
+            raise ValueError("TTL should be larger than 0.")
+        HashTable.__init__(self)
+        self._default_ttl = default_ttl
+        self._clock = clock
+        self._resolution = resolution
+        self._table: HashTable[K, DoubleNode[K, V]] = table_type()
+        self._wheel = TimingWheel(math.floor(self.__now()))
+        self.expirations = 0
+        self.bytes_reclaimed = 0
+
+    def __now(self) -> float:
+        """ Returns the current time, measured in ticks. """
+        return self._clock() / self._resolution
+
+    def expire(self) -> None:
+        """
+        Removes every key whose tick has passed, by advancing the wheel to the current time.
+        This is done at the start of every other operation, so calling it is only needed to
+        reclaim memory while the table is not used.
+        :complexity: See TimingWheel.advance.
+        """
+        for node in self._wheel.advance(math.floor(self.__now())):
+            self.__remove_expired(node)
+
+    def __remove_expired(self, node: DoubleNode[K, V]) -> None:
+        """ Removes the entry of a key which expired, and counts it. """
+        del self._table[node._key]
+        self.expirations += 1
+        self.bytes_reclaimed += sys.getsizeof(node._key) + sys.getsizeof(node._item)
+
+    def __find(self, key: K) -> DoubleNode[K, V] | None:
+        """
+        Returns the entry of a key, or None when the key doesn't exist or has expired (in which case it is removed).
+        """
+        self.expire()
+        node = self._table.get(key)
+        if node is not None and node._size <= self.__now():
+            self._wheel.cancel(node)
+            self.__remove_expired(node)
+            return None
+        return node
+
+    def hash(self, key: K) -> int:
+        """
+        Hash a key as the underlying table does.
+        """
+        return self._table.hash(key)
+
+    @property
+    def table_size(self) -> int:
+        return self._table.table_size
+
+    def set(self, key: K, data: V, ttl: float | None = None) -> None:
+        """
+        Set a (key, value) pair which expires after the given TTL (in seconds).
+        If no TTL is given, the default TTL is used. A TTL of math.inf never expires.
+        Setting a key again replaces its TTL.
+        :raises ValueError: when the TTL is not positive.
+        """
+        ttl = ttl if ttl is not None else self._default_ttl
+        if ttl is not None and ttl <= 0:
+            raise ValueError("TTL should be larger than 0.")
+        self.expire()
+        node = self._table.get(key)
+        if node is None:
+            node = DoubleNode(data, key)
+            # DoubleNode takes its item as key when the key is None, which is a valid key here.
+            node._key = key
+            self._table[key] = node
+        else:
+            self._wheel.cancel(node)
+            node._item = data
+
+        if ttl is None or ttl == math.inf:
+            node._size = math.inf
+        else:
+            self._wheel.schedule(node, self.__now() + ttl / self._resolution)
+
+    def ttl(self, key: K) -> float | None:
+        """
+        Returns the time (in seconds) left until the key expires, or None if it never expires.
+        :raises KeyError: when the key doesn't exist.
+        """
+        node = self.__find(key)
+        if node is None:
+            raise KeyError(key)
+        return None if node._size == math.inf else (node._size - self.__now()) * self._resolution
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the value at a certain key, or default when the key doesn't exist or has expired.
+        """
+        node = self.__find(key)
+        return default if node is None else node._item
+
+    def __getitem__(self, key: K) -> V:
+        """
+        Get the value at a certain key.
+        :raises KeyError: when the key doesn't exist or has expired.
+        """
+        node = self.__find(key)
+        if node is None:
+            raise KeyError(key)
+        return node._item
+
+    def __setitem__(self, key: K, data: V) -> None:
+        """
+        Set a (key, value) pair with the default TTL. See set.
+        """
+        self.set(key, data)
+
+    def __delitem__(self, key: K) -> None:
+        """
+        Deletes a (key, value) pair in our hash table.
+        :raises KeyError: when the key doesn't exist or has expired.
+        """
+        node = self.__find(key)
+        if node is None:
+            raise KeyError(key)
+        self._wheel.cancel(node)
+        del self._table[key]
+
+    def items(self) -> ArrayR[Tuple[K, V]]:
+        """
+        Returns all (key, value) pairs in the hash table.
+        :complexity: O(N) plus the complexity of items in the underlying table.
+        """
+        self.expire()
+        res = self._table.items()
+        for i in range(len(res)):
+            res[i] = (res[i][0], res[i][1]._item)
+        return res
+
+    def iter_items(self) -> Iterator[Tuple[K, V]]:
+        """
+        Lazily yields every (key, value) pair in the hash table. See HashTable.iter_items.
+        Keys which expire during iteration are only removed by the next operation.
+        :raises RuntimeError: when the table is structurally modified during iteration.
+        """
+        self.expire()
+        for key, node in self._table.iter_items():
+            yield key, node._item
+
+    def is_full(self) -> bool:
+        return self._table.is_full()
+
+    def _layout_stats(self) -> dict:
+        """
+        Returns the statistics of the underlying table (see HashTable.stats), the number of
+        keys scheduled to expire, and the expiration counters.
+        """
+        res = self._table.stats()
+        for key in ('size', 'table_size', 'load_factor'):
+            del res[key]
+        res['scheduled'] = len(self._wheel)
+        res['expirations'] = self.expirations
+        res['bytes_reclaimed'] = self.bytes_reclaimed
+        return res
+
+    def enable_stats(self) -> None:
+        """ Starts recording statistics in the underlying table. See HashTable.enable_stats. """
+        self._table.enable_stats()
+
+    def disable_stats(self) -> None:
+        """ Stops recording statistics in the underlying table. """
+        self._table.disable_stats()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of elements in the hash table, after removing the keys whose tick has passed.
+        """
+        self.expire()
+        return len(self._table)
+
+    def __str__(self) -> str:
+        """
+        Returns all they key/value pairs in our hash table (no particular
+        order).
+        """
+        items = self.items()
+        items = '\n'.join(map(lambda x: f"({x[0]}, {x[1]})", items))
+        return f"<ExpiringHashTable\n{items}\n>"
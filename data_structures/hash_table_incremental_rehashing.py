@@ -0,0 +1,352 @@
+from __future__ import annotations
+import time
+from typing import Tuple, List, Iterable, Iterator, BinaryIO, Mapping
+from data_structures.abstract_hash_table import HashTable, K, V
+from data_structures.hash_table_linear_probing import LinearProbeTable
+from data_structures.referential_array import ArrayR
+
+class IncrementalRehashTable(LinearProbeTable[K, V]):
+    """
+    Incremental Rehash Table.
+    Defines a Hash Table using Linear Probing for collision resolution, which resizes
+    incrementally instead of moving every item at once.
+
+    When the load factor goes over MAX_LOAD_FACTOR (or under MIN_LOAD_FACTOR), a new array
+    is created but the old one is kept.
+    From then on, every operation migrates MIGRATION_STEP slots of the old array to the new one,
+    and lookups consult both arrays until the migration is complete.
+    Every key is stored in exactly one of the two arrays. New keys always go to the new array,
+    and slots of the old array which are migrated or deleted are replaced by a tombstone, so that
+    the probe sequences of the remaining old items are not broken.
+
+    Type Arguments:
+        - K:    Key Type.
+        - V:    Value Type.
+
+    Unless stated otherwise, all methods have O(1) complexity.
+    """
+
+    MIGRATION_STEP = 4
+    DELETED = object()
+
+    def __init__(self, sizes: None | List[int] = None, hash_base: int | None = 31,
+                 max_load_factor: float | None = None, min_load_factor: float | None = None,
+                 seeded: bool = False) -> None:
+        """
+        :param sizes: Optional list of sizes to use for the hash table.
+                      If not provided, a default list of sizes will be used.
+        :param max_load_factor: See LinearProbeTable.__init__.
+        :param min_load_factor: See LinearProbeTable.__init__.
+        :param seeded: See LinearProbeTable.__init__.
+        :complexity: O(1) - See LinearProbeTable.__init__.
+        """
+        LinearProbeTable.__init__(self, sizes, hash_base, max_load_factor, min_load_factor, seeded)
+        self._old_array: ArrayR[tuple[K, V]] | None = None
+        self._migrate_index = 0
+
+    def is_migrating(self) -> bool:
+        """
+        Returns whether items are still being migrated from the old array.
+        :complexity: O(1)
+        """
+        return self._old_array is not None
+
+    def __probe_new(self, key: K, is_insert: bool) -> int:
+        """
+        Find the position of this key in the new array using linear probing.
+        :complexity: See LinearProbeTable._handle_probing.
+        :returns: the position of the key, or the empty slot where it should go if is_insert,
+            or -1 if the key is not present and not is_insert.
+        :raises RuntimeError: When the table is full and cannot be inserted.
+        """
+        array = self._array
+        table_size = len(array)
+        position = self._hash(key, table_size)
+
+        for probes in range(table_size):
+            if array[position] is None:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
+                return position if is_insert else -1
+            elif array[position][0] == key:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
+                return position
+            position = (position + 1) % table_size
+
+        if self._stats is not None:
+            self._stats.record_probe(table_size)
+        if is_insert:
+            raise RuntimeError("Table is full!")
+        return -1
+
+    def __probe_old(self, key: K) -> int:
+        """
+        Find the position of this key in the old array using linear probing,
+        skipping over tombstones.
+        :complexity: See LinearProbeTable._handle_probing.
+        :returns: the position of the key, or -1 if it is not in the old array.
+        """
+        array = self._old_array
+        table_size = len(array)
+        position = self._hash(key, table_size)
+
+        for probes in range(table_size):
+            item = array[position]
+            if item is None:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
+                return -1
+            elif item is not IncrementalRehashTable.DELETED and item[0] == key:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
+                return position
+            position = (position + 1) % table_size
+        if self._stats is not None:
+            self._stats.record_probe(table_size)
+        return -1
+
+    def __migrate(self, slots: int) -> None:
+        """
+        Moves the items in the next given number of slots of the old array to the new one.
+        When the end of the old array is reached, the migration is complete and the old
+        array is discarded.
+        :complexity: O(S * (N + K)) in the worst case where S is the number of slots.
+            See __probe_new for N and K.
+        """
+        old_array = self._old_array
+        end = min(self._migrate_index + slots, len(old_array))
+        # Moving an item is not a user insert, so its probes are not recorded.
+        stats, self._stats = self._stats, None
+        try:
+            for position in range(self._migrate_index, end):
+                item = old_array[position]
+                if item is not None and item is not IncrementalRehashTable.DELETED:
+                    self._array[self.__probe_new(item[0], True)] = item
+                    old_array[position] = IncrementalRehashTable.DELETED
+        finally:
+            self._stats = stats
+        self._migrate_index = end
+        if end == len(old_array):
+            self._old_array = None
+            self._migrate_index = 0
+
+    def __step(self) -> None:
+        """
+        Performs the bounded amount of migration work done by every operation.
+        :complexity: See __migrate.
+        """
+        if self._old_array is not None:
+            self.__migrate(IncrementalRehashTable.MIGRATION_STEP)
+
+    def items(self) -> ArrayR[Tuple[K, V]]:
+        """
+        Returns all keys in the hash table.
+        :complexity: O(N) where N is the combined size of both arrays.
+        """
+        res = ArrayR(self._length)
+        i = 0
+        arrays = [self._array] if self._old_array is None else [self._old_array, self._array]
+        for array in arrays:
+            for x in range(len(array)):
+                if array[x] is not None and array[x] is not IncrementalRehashTable.DELETED:
+                    res[i] = array[x]
+                    i += 1
+        return res
+
+    def iter_items(self) -> Iterator[Tuple[K, V]]:
+        """
+        Lazily yields every (key, value) pair in the hash table, straight from the array.
+        Lookups move items between the arrays while a migration is in progress, so any pending
+        migration is completed first. No new migration can start without an insertion, which
+        already invalidates the iteration.
+        :complexity: O(N) for the whole iteration where N is the table size, plus the cost of
+            completing the migration when one is in progress (see __migrate).
+        :raises RuntimeError: when the table is structurally modified during iteration.
+        """
+        if self._old_array is not None:
+            self.__migrate(len(self._old_array))
+        return LinearProbeTable.iter_items(self)
+
+    def dump(self, fileobj: BinaryIO) -> None:
+        """
+        Writes the table with its layout, see LinearProbeTable.dump.
+        Any pending migration is completed first, so that every item is in the new array.
+        :complexity: See LinearProbeTable.dump, plus the cost of completing the migration
+            when one is in progress (see __migrate).
+        """
+        if self._old_array is not None:
+            self.__migrate(len(self._old_array))
+        LinearProbeTable.dump(self, fileobj)
+
+    def __delitem__(self, key: K) -> None:
+        """
+        Deletes a (key, value) pair in our hash table.
+        In the new array, the rest of the cluster is reinserted as in LinearProbeTable.
+        In the old array, the slot is replaced by a tombstone.
+
+        :complexity: See LinearProbeTable.__delitem__, plus the cost of __step.
+        :raises KeyError: when the key doesn't exist.
+        """
+        self.__step()
+        position = self.__probe_new(key, False)
+        if position == -1:
+            position = self.__probe_old(key) if self._old_array is not None else -1
+            if position == -1:
+                raise KeyError(key)
+            self._old_array[position] = IncrementalRehashTable.DELETED
+            self._length -= 1
+        else:
+            self._array[position] = None
+            self._length -= 1
+            # Start moving over the cluster
+            position = (position + 1) % self.table_size
+            while self._array[position] is not None:
+                item = self._array[position]
+                self._array[position] = None
+                self._array[self.__probe_new(item[0], True)] = item
+                position = (position + 1) % self.table_size
+
+        self._modifications += 1
+        self._shrink()
+
+    def __getitem__(self, key: K) -> V:
+        """
+        Get the value at a certain key
+
+        :complexity: See __probe_new and __probe_old, plus the cost of __step.
+        :raises KeyError: when the key doesn't exist.
+        """
+        self.__step()
+        position = self.__probe_new(key, False)
+        if position != -1:
+            return self._array[position][1]
+        if self._old_array is not None:
+            position = self.__probe_old(key)
+            if position != -1:
+                return self._old_array[position][1]
+        raise KeyError(key)
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the value at a certain key, or default when the key doesn't exist.
+
+        :complexity: See __getitem__.
+        """
+        self.__step()
+        position = self.__probe_new(key, False)
+        if position != -1:
+            return self._array[position][1]
+        if self._old_array is not None:
+            position = self.__probe_old(key)
+            if position != -1:
+                return self._old_array[position][1]
+        return default
+
+    def setdefault(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the value at a certain key, inserting default for it first when the key doesn't exist.
+        :complexity: See HashTable.setdefault.
+        """
+        return HashTable.setdefault(self, key, default)
+
+    def __setitem__(self, key: K, data: V) -> None:
+        """
+        Set an (key, value) pair in our hash table.
+        If the key is still in the old array, it is moved to the new one.
+
+        :complexity:
+            Best: Same as __probe_new, plus the cost of __step.
+            Worst: Same as _resize, when a previous migration has to be completed first.
+        """
+        self.__step()
+        if self._old_array is not None:
+            position = self.__probe_old(key)
+            if position != -1:
+                self._old_array[position] = IncrementalRehashTable.DELETED
+                self._length -= 1
+                self._modifications += 1
+
+        position = self.__probe_new(key, True)
+        if self._array[position] is None:
+            self._length += 1
+            self._modifications += 1
+        self._array[position] = (key, data)
+
+        if len(self) > self.table_size * self.MAX_LOAD_FACTOR:
+            self._resize(self._size_index + 1)
+
+    def _resize(self, size_index: int) -> None:
+        """
+        Replaces the array by one with the size at the given index of TABLE_SIZES, and keeps
+        the current one as the old array to be migrated by the following operations.
+        This is used both to grow and to shrink the table, as well as by reserve.
+
+        :complexity:
+            Best: O(1) happens when there is no migration in progress. Assuming the default table sizes
+                are used, creating the new array is O(1), as in LinearProbeTable._resize.
+            Worst: O(S * (N + K)) when a migration is still in progress and has to be completed first,
+                where S is the size of the old array. See __probe_new for N and K.
+                When growing, this can only happen with a custom list of sizes which do not grow by a factor of about 2.
+        """
+        start = time.perf_counter()
+        if self._old_array is not None:
+            self.__migrate(len(self._old_array))
+
+        self._old_array = self._array
+        self._migrate_index = 0
+        self._array = ArrayR(self._table_size_at(size_index))
+        self._size_index = size_index
+        self._modifications += 1
+        if self._stats is not None:
+            self._stats.record_rehash(time.perf_counter() - start)
+
+    def _layout_stats(self) -> dict:
+        """
+        Returns the size of the largest cluster in the new array (see LinearProbeTable._layout_stats),
+        the number of tombstones left in the old array, and whether a migration is in progress.
+        :complexity: O(N) where N is the combined size of both arrays.
+        """
+        res = LinearProbeTable._layout_stats(self)
+        tombstones = 0
+        if self._old_array is not None:
+            for item in self._old_array:
+                if item is IncrementalRehashTable.DELETED:
+                    tombstones += 1
+        res['tombstones'] = tombstones
+        res['migrating'] = self.is_migrating()
+        return res
+
+    def update(self, items: Iterable[Tuple[K, V]] | Mapping[K, V]) -> None:
+        """
+        Set every (key, data) pair in items, or in items.items() (see HashTable.update).
+        The table is resized once up front as in LinearProbeTable.update, but the items
+        then go through __setitem__ so that the migration keeps going.
+        :complexity: See HashTable.update.
+        """
+        HashTable.update(self, items)
+
+    def get_many(self, keys: Iterable[K]) -> ArrayR[V]:
+        """
+        Returns an array with the data associated to each of the keys, in the same order.
+        :complexity: See HashTable.get_many.
+        :raises KeyError: when one of the keys doesn't exist.
+        """
+        return HashTable.get_many(self, keys)
+
+    def delete_many(self, keys: Iterable[K]) -> int:
+        """
+        Deletes every key in keys which is in the table, ignoring the others.
+        :complexity: See HashTable.delete_many.
+        :returns: the number of items deleted.
+        """
+        return HashTable.delete_many(self, keys)
+
+    def __str__(self) -> str:
+        """
+        Returns all they key/value pairs in our hash table (no particular
+        order).
+        """
+        items = self.items()
+        items = '\n'.join(map(lambda x: f"({x[0]}, {x[1]})", items))
+        return f"<IncrementalRehashTable\n{items}\n>"
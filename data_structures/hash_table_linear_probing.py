@@ -1,57 +1,124 @@
 from __future__ import annotations
-from typing import TypeVar, Tuple, List
-from data_structures.abstract_hash_table import HashTable
+import io
+import mmap
+import pickle
+import sys
+import time
+from array import array
+from typing import Tuple, List, Iterable, Iterator, BinaryIO, Mapping
+from algorithms.primes import next_prime
+from data_structures.abstract_hash_table import HashTable, K, V, _TableUnpickler
+from data_structures.hash_table_mapped import MappedHashTable, MappedSlots
 from data_structures.referential_array import ArrayR
 
-V = TypeVar('V')
-
-class LinearProbeTable(HashTable[str, V]):
+class LinearProbeTable(HashTable[K, V]):
     """
     Linear Probe Table.
     Defines a Hash Table using Linear Probing for collision resolution.
-    If you want to use this with a different key type, you should override the hash function.
+    Keys can be of any hashable type. Strings are hashed with a polynomial universal hash
+    (see _hash), and any other key with HashTable._universal_hash, which has fast paths
+    for int and bytes keys. Seeded tables use HashTable._universal_hash for strings too.
     
     Type Arguments:
+        - K:    Key Type.
         - V:    Value Type.
 
+    The table grows to the next size in TABLE_SIZES when its load factor goes over
+    MAX_LOAD_FACTOR, and shrinks back to the previous size when it goes under MIN_LOAD_FACTOR.
+    Once the sizes in TABLE_SIZES are exhausted, the table keeps growing to the first prime
+    after double the last size.
+
     Unless stated otherwise, all methods have O(1) complexity.
     """
 
     TABLE_SIZES = [5, 13, 29, 53, 97, 193, 389, 769, 1543, 3079, 6151, 12289, 24593, 49157, 98317, 196613, 393241, 786433, 1572869]
+    MAX_LOAD_FACTOR = 1 / 2
+    MIN_LOAD_FACTOR = 0
 
-    def __init__(self, sizes: None | List[int] = None, hash_base: int | None = 31) -> None:
+    def __init__(self, sizes: None | List[int] = None, hash_base: int | None = 31,
+                 max_load_factor: float | None = None, min_load_factor: float | None = None,
+                 seeded: bool = False) -> None:
         """
         :param sizes: Optional list of sizes to use for the hash table.
                       If not provided, a default list of sizes will be used.
+        :param max_load_factor: Optional load factor over which the table grows.
+                      If not provided, MAX_LOAD_FACTOR is used.
+        :param min_load_factor: Optional load factor under which the table shrinks.
+                      If not provided, MIN_LOAD_FACTOR is used (by default tables never shrink).
+        :param seeded: Whether every key, str keys included, is hashed with the keyed hash of
+                      HashTable._universal_hash instead of the polynomial hash (see _hash) or the
+                      builtin hash, so that colliding keys cannot be crafted.
+        :raises ValueError: when the load factors are not 0 <= min_load_factor < max_load_factor < 1.
         :complexity: O(1) - Assuming the default sizes are used, we can assume the array is created in O(1) time.
             If you use this function in any way that passes some variable input for the sizes, then the complexity
             needs to change accordingly.
         """
-        if sizes is not None:
-            self.TABLE_SIZES = sizes
+        # Copied, since sizes are appended to it once it is exhausted.
+        self.TABLE_SIZES = list(sizes if sizes is not None else self.TABLE_SIZES)
+        if max_load_factor is not None:
+            self.MAX_LOAD_FACTOR = max_load_factor
+        if min_load_factor is not None:
+            self.MIN_LOAD_FACTOR = min_load_factor
+        if not 0 <= self.MIN_LOAD_FACTOR < self.MAX_LOAD_FACTOR < 1:
+            raise ValueError("Load factors should satisfy 0 <= min_load_factor < max_load_factor < 1.")
 
+        HashTable.__init__(self, seeded)
         self._size_index = 0
-        self._array: ArrayR[tuple[str, V]] = ArrayR(max(self.TABLE_SIZES[self._size_index], 2))
+        self._array: ArrayR[tuple[K, V]] = ArrayR(max(self.TABLE_SIZES[self._size_index], 2))
         self._length = 0
         self._hash_base = hash_base
 
-    def hash(self, key: str) -> int:
+    def reserve(self, capacity: int) -> None:
+        """
+        Resizes the table straight to the first size which can hold the given number of items
+        without going over the load factor, so a bulk load does not go through every size in between.
+        Does nothing if the table is already big enough.
+        :complexity: O(S + N * K) where S is the new table size, see _resize for the cost of reinserting.
+        """
+        size_index = self._size_index
+        while capacity > self._table_size_at(size_index) * self.MAX_LOAD_FACTOR:
+            size_index += 1
+        if size_index != self._size_index:
+            self._resize(size_index)
+
+    def _table_size_at(self, size_index: int) -> int:
+        """
+        Returns the table size at the given index of TABLE_SIZES.
+        If the index is past the end of the list, sizes are generated by taking the first prime
+        after double the previous size, and appended to the list.
+        :complexity: O(1) when the size is in the list, otherwise see next_prime.
+        """
+        while size_index >= len(self.TABLE_SIZES):
+            self.TABLE_SIZES.append(next_prime(2 * self.TABLE_SIZES[-1] + 1))
+        return self.TABLE_SIZES[size_index]
+
+    def hash(self, key: K) -> int:
         """
         Hash a key for insert/retrieve/update into the hashtable.
         :complexity: O(K) where K is the length of the key.
         """
+        return self._hash(key, self.table_size)
+
+    def _hash(self, key: K, table_size: int) -> int:
+        """
+        Hash a key to a position in a table of the given size.
+        :complexity: O(K) where K is the length of the key, for str and bytes keys.
+            See HashTable._universal_hash for other keys.
+        """
+        if self._seeded or not isinstance(key, str):
+            return self._universal_hash(key) % table_size
         value = 0
         a = 31415
         for char in key:
-            value = (ord(char) + a * value) % self.table_size
-            a = (a * self._hash_base % (self.table_size - 1)) + 1
+            value = (ord(char) + a * value) % table_size
+            a = (a * self._hash_base % (table_size - 1)) + 1
         return value
 
     @property
     def table_size(self) -> int:
         return len(self._array)
 
-    def __handle_probing(self, key: str, is_insert: bool) -> int:
+    def _handle_probing(self, key: K, is_insert: bool) -> int:
         """
         Find the correct position for this key in the hash table using linear probing.
         :complexity: 
@@ -60,31 +127,40 @@ class LinearProbeTable(HashTable[str, V]):
                 search the entire table.
             N is the number of items in the table.
             K is the length of the key.
-        :raises KeyError: When the key is not in the table, but is_insert is False.
+        :returns: the position of the key, or when it is not in the table, the empty position
+            where it should go if is_insert, -1 otherwise (so misses do not raise exceptions).
         :raises FullError: When a table is full and cannot be inserted.
         """
         # Initial position
         position = self.hash(key)
 
-        for _ in range(self.table_size):
-            if self._array[position] is None:
+        for probes in range(self.table_size):
+            # Read the slot once, as reading a mapped slot unpickles it.
+            slot = self._array[position]
+            if slot is None:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
                 # Empty spot. Am I upserting or retrieving?
                 if is_insert:
                     return position
                 else:
-                    raise KeyError(key)
-            elif self._array[position][0] == key:
+                    return -1
+            elif slot[0] == key:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
                 return position
             else:
                 # Taken by something else. Time to linear probe.
                 position = (position + 1) % self.table_size
 
+        if self._stats is not None:
+            self._stats.record_probe(self.table_size)
         if is_insert:
             raise RuntimeError("Table is full!")
         else:
-            raise KeyError(key)
+            return -1
 
-    def items(self) -> ArrayR[Tuple[str, V]]:
+    def items(self) -> ArrayR[Tuple[K, V]]:
         """
         Returns all keys in the hash table.
         :complexity: O(N) where N is the table size.
@@ -97,6 +173,42 @@ class LinearProbeTable(HashTable[str, V]):
                 i += 1
         return res
 
+    def iter_items(self) -> Iterator[Tuple[K, V]]:
+        """
+        Lazily yields every (key, value) pair in the hash table, straight from the array.
+        :complexity: O(1) for each step when the next slot is taken, O(N) for the whole
+            iteration where N is the table size.
+        :raises RuntimeError: when the table is structurally modified during iteration.
+        """
+        modifications = self._modifications
+        for item in self._array:
+            if item is not None:
+                yield item
+                self._check_modifications(modifications)
+        self._check_modifications(modifications)
+
+    def _layout_stats(self) -> dict:
+        """
+        Returns the size of the largest cluster (run of taken positions, wrapping around at the
+        end of the table), and the number of tombstones, which this table does not use.
+        :complexity: O(N) where N is the table size.
+        """
+        array = self._array
+        table_size = len(array)
+        # Start right after an empty position, so no cluster is split by wrapping around.
+        start = 0
+        while start < table_size and array[start] is not None:
+            start += 1
+        max_cluster = table_size if start == table_size else 0
+        cluster = 0
+        for i in range(start + 1, start + table_size):
+            if array[i % table_size] is None:
+                cluster = 0
+            else:
+                cluster += 1
+                max_cluster = max(max_cluster, cluster)
+        return {'max_cluster': max_cluster, 'tombstones': 0}
+
     def is_empty(self) -> bool:
         """
         Returns whether the hash table is empty
@@ -111,7 +223,7 @@ class LinearProbeTable(HashTable[str, V]):
         """
         return len(self) == len(self._array)
 
-    def __delitem__(self, key: str) -> None:
+    def __delitem__(self, key: K) -> None:
         """
         Deletes a (key, value) pair in our hash table.
 
@@ -125,53 +237,110 @@ class LinearProbeTable(HashTable[str, V]):
 
         :raises KeyError: when the key doesn't exist.
         """
-        position = self.__handle_probing(key, False)
+        position = self._handle_probing(key, False)
+        if position == -1:
+            raise KeyError(key)
         # Remove the element
         self._array[position] = None
         self._length -= 1
+        self._modifications += 1
         # Start moving over the cluster
         position = (position + 1) % self.table_size
         while self._array[position] is not None:
             key2, value = self._array[position]
             self._array[position] = None
             # Reinsert.
-            newpos = self.__handle_probing(key2, True)
+            newpos = self._handle_probing(key2, True)
             self._array[newpos] = (key2, value)
             position = (position + 1) % self.table_size
 
-    def __getitem__(self, key: str) -> V:
+        self._shrink()
+
+    def __getitem__(self, key: K) -> V:
         """
         Get the value at a certain key
 
         :complexity: See linear probe.
         :raises KeyError: when the key doesn't exist.
         """
-        position = self.__handle_probing(key, False)
+        position = self._handle_probing(key, False)
+        if position == -1:
+            raise KeyError(key)
         return self._array[position][1]
 
-    def __setitem__(self, key: str, data: V) -> None:
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the value at a certain key, or default when the key doesn't exist.
+
+        :complexity: See linear probe.
+        """
+        position = self._handle_probing(key, False)
+        if position == -1:
+            return default
+        return self._array[position][1]
+
+    def setdefault(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the value at a certain key, inserting default for it first when the key doesn't exist.
+        The key is only probed for once.
+
+        :complexity: See __setitem__.
+        """
+        position = self._handle_probing(key, True)
+        if self._array[position] is not None:
+            return self._array[position][1]
+
+        self._array[position] = (key, default)
+        self._length += 1
+        self._modifications += 1
+        if len(self) > self.table_size * self.MAX_LOAD_FACTOR:
+            self.__rehash()
+        return default
+
+    def __setitem__(self, key: K, data: V) -> None:
         """
         Set an (key, value) pair in our hash table.
 
         :complexity:
             Best: Same as linear probe, when no rehashing is needed.
             Worst: Same as __rehash.
-        :raises FullError: when the table cannot be resized further.
         """
 
-        position = self.__handle_probing(key, True)
+        position = self._handle_probing(key, True)
 
         if self._array[position] is None:
             self._length += 1
+            self._modifications += 1
 
         self._array[position] = (key, data)
 
-        if len(self) > self.table_size / 2:
+        if len(self) > self.table_size * self.MAX_LOAD_FACTOR:
             self.__rehash()
 
+    def _shrink(self) -> None:
+        """
+        Shrink the table when its load factor has gone under MIN_LOAD_FACTOR.
+        It goes back through TABLE_SIZES, but never to a size where the load factor
+        would be over MAX_LOAD_FACTOR.
+        :complexity: O(1) when the table does not shrink, otherwise see _resize.
+        """
+        size_index = self._size_index
+        while (size_index > 0 and len(self) < self._table_size_at(size_index) * self.MIN_LOAD_FACTOR
+                and len(self) <= self._table_size_at(size_index - 1) * self.MAX_LOAD_FACTOR):
+            size_index -= 1
+        if size_index != self._size_index:
+            self._resize(size_index)
+
     def __rehash(self) -> None:
         """
-        Need to resize table and reinsert all values
+        Need to resize table and reinsert all values.
+        :complexity: See _resize.
+        """
+        self._resize(self._size_index + 1)
+
+    def _resize(self, size_index: int) -> None:
+        """
+        Resize the table to the size at the given index of TABLE_SIZES and reinsert all values
 
         :complexity:
             Best: O(N * K) happens when all items can be inserted immediately after being hashed
@@ -185,20 +354,217 @@ class LinearProbeTable(HashTable[str, V]):
                 cost of creating a new table is constant. This assumption can be extended to any table size
                 as long as the sizes are growing by a constant factor (e.g. each table size is almost double the previous one).
         """
+        start = time.perf_counter()
         old_array = self._array
-        if self._size_index + 1 == len(self.TABLE_SIZES):
-            if self.is_full():
-                raise RuntimeError("Table is full!")
-
-            # Cannot be resized further.
-            return
-        self._size_index += 1
-        self._array = ArrayR(self.TABLE_SIZES[self._size_index])
+        self._array = ArrayR(self._table_size_at(size_index))
+        self._size_index = size_index
         self._length = 0
-        for item in old_array:
+        self._modifications += 1
+        # Reinserting is not a user insert, so its probes are not recorded.
+        stats, self._stats = self._stats, None
+        try:
+            for item in old_array:
+                if item is not None:
+                    key, value = item
+                    self[key] = value
+        finally:
+            self._stats = stats
+        if stats is not None:
+            stats.record_rehash(time.perf_counter() - start)
+
+    def update(self, items: Iterable[Tuple[K, V]] | Mapping[K, V]) -> None:
+        """
+        Set every (key, data) pair in items, or in items.items() (see HashTable.update).
+        The table is resized once up front assuming all the keys are new, so the
+        loop only has to probe and store.
+
+        :complexity: O(S + M * (N + K)) in the worst case, where S is the new table size and
+            M is the number of items. See reserve and _handle_probing.
+        """
+        items = HashTable._sized_pairs(items)
+        self.reserve(len(self) + len(items))
+        array = self._array
+        probe = self._handle_probing
+        for key, data in items:
+            position = probe(key, True)
+            if array[position] is None:
+                self._length += 1
+                self._modifications += 1
+            array[position] = (key, data)
+
+    def get_many(self, keys: Iterable[K]) -> ArrayR[V]:
+        """
+        Returns an array with the data associated to each of the keys, in the same order.
+
+        :complexity: O(M * (N + K)) in the worst case, where M is the number of keys. See _handle_probing.
+        :raises KeyError: when one of the keys doesn't exist.
+        """
+        keys = keys if hasattr(keys, '__len__') else list(keys)
+        res = ArrayR(len(keys))
+        array = self._array
+        probe = self._handle_probing
+        for i, key in enumerate(keys):
+            position = probe(key, False)
+            if position == -1:
+                raise KeyError(key)
+            res[i] = array[position][1]
+        return res
+
+    def delete_many(self, keys: Iterable[K]) -> int:
+        """
+        Deletes every key in keys which is in the table, ignoring the others.
+        When there are few keys compared to the size of the table, they are deleted one by one.
+        Otherwise, every key is removed first and the table is rebuilt once, instead of
+        reinserting the rest of a cluster after each deletion.
+
+        :complexity: O(M * (N + K) + S) in the worst case, where M is the number of keys
+            and S is the table size. See _handle_probing and _resize.
+        :returns: the number of items deleted.
+        """
+        keys = keys if hasattr(keys, '__len__') else list(keys)
+        if len(keys) * 8 < len(self):
+            return HashTable.delete_many(self, keys)
+        return self._delete_and_rebuild(keys)
+
+    def _delete_and_rebuild(self, keys: Iterable[K]) -> int:
+        """
+        Removes every key in keys which is in the table, then rebuilds the table once.
+        All the positions are found before anything is removed, as removing an item breaks
+        the probe sequences going over its position.
+
+        :complexity: See delete_many.
+        :returns: the number of items deleted.
+        """
+        keys = keys if hasattr(keys, '__len__') else list(keys)
+        positions = ArrayR(len(keys))
+        found = 0
+        for key in keys:
+            position = self._handle_probing(key, False)
+            if position != -1:
+                positions[found] = position
+                found += 1
+
+        deleted = 0
+        for i in range(found):
+            # A key given twice has the same position twice.
+            if self._array[positions[i]] is not None:
+                self._array[positions[i]] = None
+                deleted += 1
+
+        if deleted > 0:
+            self._length -= deleted
+            self._modifications += 1
+            self._resize(self._size_index)
+            self._shrink()
+        return deleted
+
+    def _portable_key(self, key: K) -> bool:
+        """
+        Returns whether the key hashes to the same position in any process, given the same
+        hash parameters. This is the case for int, bytes and str keys (see HashTable._universal_hash
+        and _hash), but not for keys hashed with the builtin hash.
+        """
+        return type(key) is int or type(key) is bytes or type(key) is str
+
+    def dump(self, fileobj: BinaryIO) -> None:
+        """
+        Writes the table to a binary file with its layout, so that load can put every item
+        straight back in its position without hashing or probing.
+        After the header (see HashTable), which holds the parameters of the table and of its hash
+        functions, comes the offset of the record of each position, as little-endian 64 bit
+        integers (-1 for empty positions), then the records: the (key, data) pair of each taken
+        position, pickled separately, in the order of their positions.
+
+        When one of the keys is not portable (see _portable_key), the header says so, and load
+        reinserts every item instead.
+        :complexity: O(S + N) where S is the table size and N the number of items.
+        """
+        records = io.BytesIO()
+        offsets = array('q', [-1]) * self.table_size
+        portable = True
+        for position, item in enumerate(self._array):
             if item is not None:
-                key, value = item
-                self[key] = value
+                offsets[position] = records.tell()
+                pickle.dump(item, records, pickle.HIGHEST_PROTOCOL)
+                portable = portable and self._portable_key(item[0])
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+
+        header = self._dump_header()
+        header.update(type=type(self).__name__, length=len(self), layout=True, portable=portable,
+                      table_size=self.table_size)
+        HashTable._write_header(fileobj, header)
+        fileobj.write(offsets.tobytes())
+        fileobj.write(records.getbuffer())
+
+    def _dump_header(self) -> dict:
+        """
+        Returns the parameters of the table and of its hash functions.
+        """
+        return {
+            'sizes': self.TABLE_SIZES,
+            'size_index': self._size_index,
+            'hash_base': self._hash_base,
+            'max_load_factor': self.MAX_LOAD_FACTOR,
+            'min_load_factor': self.MIN_LOAD_FACTOR,
+            'seeded': self._seeded,
+            'hash_a': self._hash_a,
+            'hash_b': self._hash_b,
+        }
+
+    @classmethod
+    def _from_header(cls, header: dict) -> LinearProbeTable[K, V]:
+        """
+        Creates an empty table with the parameters of the table and of the hash functions in the header.
+        """
+        table = cls(header['sizes'], header['hash_base'], header['max_load_factor'],
+                    header['min_load_factor'], header['seeded'])
+        table._hash_a = header['hash_a']
+        table._hash_b = header['hash_b']
+        return table
+
+    @classmethod
+    def _load_layout(cls, fileobj: BinaryIO, header: dict, mapped: bool) -> HashTable[K, V]:
+        """
+        Reads a table written with its layout by dump. Each record is unpickled straight into
+        its position. If mapped, the offsets and records are not even read, see MappedSlots.
+        When the keys are not portable, the items are reinserted instead.
+        :raises ValueError: when mapping a table whose keys are not portable.
+        :complexity: O(S + N), or O(1) if mapped, where S is the table size and N the number
+            of items. When the keys are not portable, see HashTable.load.
+        """
+        table = cls._from_header(header)
+        table_size = header['table_size']
+        if not header['portable']:
+            if mapped:
+                raise ValueError("Tables whose keys are hashed with the builtin hash cannot be mapped.")
+            fileobj.read(8 * table_size)
+            table._load_items(fileobj, header['length'])
+            return table
+
+        table._size_index = header['size_index']
+        table._length = header['length']
+        if mapped:
+            buffer = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+            table._array = MappedSlots(buffer, fileobj.tell(), table_size)
+            table._load_extra(header)
+            return MappedHashTable(table, buffer)
+
+        offsets = array('q')
+        offsets.frombytes(fileobj.read(8 * table_size))
+        table._array = ArrayR(table_size)
+        for position, offset in enumerate(offsets):
+            # Only compared to -1, which reads the same in either byte order.
+            if offset != -1:
+                table._array[position] = _TableUnpickler(fileobj).load()
+        table._load_extra(header)
+        return table
+
+    def _load_extra(self, header: dict) -> None:
+        """
+        Restores any state besides the array from the header, once the array is loaded.
+        """
+        pass
 
     def __len__(self) -> int:
         """
@@ -0,0 +1,153 @@
+from __future__ import annotations
+import mmap
+import sys
+from array import array
+from typing import Tuple, Iterator
+from data_structures.abstract_hash_table import HashTable, K, V, _TableUnpickler
+from data_structures.referential_array import ArrayR
+
+class _RecordReader:
+    """
+    File-like reader over a memoryview, from which _TableUnpickler reads a record without
+    the rest of the mapped file being copied.
+    """
+
+    def __init__(self, buffer: memoryview) -> None:
+        self._buffer = buffer
+        self._position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """ Reads up to size bytes, or to the end of the buffer. """
+        end = len(self._buffer) if size < 0 else min(self._position + size, len(self._buffer))
+        data = bytes(self._buffer[self._position:end])
+        self._position = end
+        return data
+
+    def readline(self) -> bytes:
+        """ Reads up to and including the next newline, or to the end of the buffer. """
+        end = self._position
+        while end < len(self._buffer) and self._buffer[end] != ord('\n'):
+            end += 1
+        return self.read(end + 1 - self._position)
+
+class MappedSlots:
+    """
+    Read-only array of the slots of a hash table dumped with its layout (see LinearProbeTable.dump),
+    read straight from a memory mapped file.
+    Nothing is read until a slot is accessed: the offset of its record is read from the offsets
+    section, and the record (a (key, data) pair) is unpickled from the records section.
+    """
+
+    def __init__(self, buffer: mmap.mmap, start: int, length: int) -> None:
+        """
+        :param buffer: the memory mapped file.
+        :param start: position of the offsets section in the file, followed by the records section.
+        :param length: the number of slots.
+        :complexity: O(1), as the offsets are not copied (except on big-endian machines).
+        """
+        self._buffer = memoryview(buffer)
+        self._offsets = self._buffer[start:start + 8 * length].cast('q')
+        if sys.byteorder == 'big':
+            # Offsets are stored little-endian.
+            offsets = array('q', self._offsets)
+            offsets.byteswap()
+            self._offsets.release()
+            self._offsets = memoryview(offsets)
+        self._records = start + 8 * length
+
+    def __len__(self) -> int:
+        """ Returns the number of slots. """
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> Tuple[K, V] | None:
+        """
+        Returns the (key, data) pair in a slot, or None when it is empty.
+        :complexity: O(R) where R is the size of the record.
+        """
+        offset = self._offsets[index]
+        if offset == -1:
+            return None
+        # Anything after the end of the record is not read.
+        return _TableUnpickler(_RecordReader(self._buffer[self._records + offset:])).load()
+
+    def __setitem__(self, index: int, value: Tuple[K, V] | None) -> None:
+        raise TypeError("Mapped tables are read-only.")
+
+    def __iter__(self) -> Iterator[Tuple[K, V] | None]:
+        """ Returns an iterator over the slots. """
+        for index in range(len(self._offsets)):
+            yield self[index]
+
+    def release(self) -> None:
+        """ Releases the views on the mapped file, so that it can be closed. """
+        self._offsets.release()
+        self._buffer.release()
+
+
+class MappedHashTable(HashTable[K, V]):
+    """
+    Read-only Mapped Hash Table.
+    Returned by HashTable.load with mapped=True. Wraps a table whose slots are a MappedSlots,
+    so that it can be used straight away, reading (and unpickling) only the slots which are
+    probed by each lookup. Every lookup (and iteration) is forwarded to the wrapped table.
+    Any modification raises a TypeError.
+
+    The file should not be modified while it is mapped. close releases the mapped file.
+    """
+
+    def __init__(self, table: HashTable[K, V], buffer: mmap.mmap) -> None:
+        """
+        :param table: the table, with MappedSlots as its array.
+        :param buffer: the memory mapped file.
+        """
+        HashTable.__init__(self)
+        self._table = table
+        self._buffer = buffer
+
+    def close(self) -> None:
+        """ Releases the mapped file. The table cannot be used afterwards. """
+        self._table._array.release()
+        self._buffer.close()
+
+    def hash(self, key: K) -> int:
+        return self._table.hash(key)
+
+    @property
+    def table_size(self) -> int:
+        return self._table.table_size
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        return self._table.get(key, default)
+
+    def __getitem__(self, key: K) -> V:
+        return self._table[key]
+
+    def __setitem__(self, key: K, data: V) -> None:
+        raise TypeError("Mapped tables are read-only.")
+
+    def __delitem__(self, key: K) -> None:
+        raise TypeError("Mapped tables are read-only.")
+
+    def items(self) -> ArrayR[Tuple[K, V]]:
+        return self._table.items()
+
+    def iter_items(self) -> Iterator[Tuple[K, V]]:
+        return self._table.iter_items()
+
+    def is_full(self) -> bool:
+        return self._table.is_full()
+
+    def _layout_stats(self) -> dict:
+        return self._table._layout_stats()
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __str__(self) -> str:
+        """
+        Returns all they key/value pairs in our hash table (no particular
+        order).
+        """
+        items = self.items()
+        items = '\n'.join(map(lambda x: f"({x[0]}, {x[1]})", items))
+        return f"<MappedHashTable\n{items}\n>"
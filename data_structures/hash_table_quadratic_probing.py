@@ -1,5 +1,6 @@
 from __future__ import annotations
-from data_structures.referential_array import ArrayR
+from typing import Iterable
+from data_structures.abstract_hash_table import K
 from data_structures.hash_table_linear_probing import LinearProbeTable
 
 class QuadraticProbeTable(LinearProbeTable):
@@ -9,7 +10,7 @@ class QuadraticProbeTable(LinearProbeTable):
     If you want to use this with a different key type, you should override the hash function.
     """
 
-    def __handle_probing(self, key: str, is_insert: bool) -> int:
+    def _handle_probing(self, key: K, is_insert: bool) -> int:
         """
         Find the correct position for this key in the hash table using quadratic probing.
         :complexity:
@@ -18,7 +19,8 @@ class QuadraticProbeTable(LinearProbeTable):
                 search the entire table.
             N is the number of items in the table.
             K is the length of the key.
-        :raises KeyError: When the key is not in the table, but is_insert is False.
+        :returns: the position of the key, or when it is not in the table, the empty position
+            where it should go if is_insert, -1 otherwise (so misses do not raise exceptions).
         :raises FullError: When a table is full and cannot be inserted.
         """
         # Initial position
@@ -26,14 +28,19 @@ class QuadraticProbeTable(LinearProbeTable):
         orig_position = position
         step = 1
 
-        for _ in range(self.table_size):
-            if self._array[position] is None:
+        for probes in range(self.table_size):
+            slot = self._array[position]
+            if slot is None:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
                 # Empty spot. Am I upserting or retrieving?
                 if is_insert:
                     return position
                 else:
-                    raise KeyError(key)
-            elif self._array[position][0] == key:
+                    return -1
+            elif slot[0] == key:
+                if self._stats is not None:
+                    self._stats.record_probe(probes)
                 return position
             else:
                 # Taken by something else. Time to linear probe.
@@ -41,12 +48,14 @@ class QuadraticProbeTable(LinearProbeTable):
                 step += 1
 
 
+        if self._stats is not None:
+            self._stats.record_probe(self.table_size)
         if is_insert:
             raise RuntimeError("Table is full!")
         else:
-            raise KeyError(key)
+            return -1
 
-    def __delitem__(self, key: str) -> None:
+    def __delitem__(self, key: K) -> None:
         """
         Deletes a (key, value) pair in our hash table.
 
@@ -58,18 +67,26 @@ class QuadraticProbeTable(LinearProbeTable):
 
         :raises KeyError: when the key doesn't exist.
         """
-        position = self.__handle_probing(key, False)
+        position = self._handle_probing(key, False)
+        if position == -1:
+            raise KeyError(key)
         self._array[position] = None
         self._length -= 1
 
-        old_array = self._array
-        self._array = ArrayR(self.table_size)
-        self._length = 0
-        for item in old_array:
-            if item is not None:
-                key, value = item
-                self[key] = value
+        self._resize(self._size_index)
+        self._shrink()
     
+    def delete_many(self, keys: Iterable[K]) -> int:
+        """
+        Deletes every key in keys which is in the table, ignoring the others.
+        Since deleting a single key already rebuilds the table, all the keys are removed
+        before rebuilding it once.
+
+        :complexity: See LinearProbeTable._delete_and_rebuild.
+        :returns: the number of items deleted.
+        """
+        return self._delete_and_rebuild(keys)
+
     def __str__(self) -> str:
         """
         Returns all they key/value pairs in our hash table (no particular
@@ -1,42 +1,86 @@
-from data_structures.abstract_hash_table import HashTable, V
+from __future__ import annotations
+import time
+from algorithms.primes import next_prime
+from data_structures.abstract_hash_table import HashTable, K, V
 from data_structures.referential_array import ArrayR
-from data_structures.linked_list import LinkedList
-from typing import Tuple
+from typing import Tuple, Iterator
 
-class HashTableSeparateChaining(HashTable[str, V]):
+class HashTableSeparateChaining(HashTable[K, V]):
     """
-    Separate Chaining Hash Table Implementation using a Linked List.
-    It currently rehashes the primary cluster to handle deletion.
+    Separate Chaining Hash Table Implementation using compact arrays for the chains.
+    Keys can be of any hashable type, see hash.
+
+    Since chains are kept short by resizing, each position of the table stores its chain as:
+        - None, when the chain is empty,
+        - the (key, data) tuple itself, when the chain has a single item (the most common case),
+        - an ArrayR of exactly the length of the chain, when it has two or more items.
+    Adding or removing an item from a chain of two or more items replaces its array, which
+    is O(1) on average as chains have a constant average length.
+
+    The load factor of a separate chaining table is the average length of its chains.
+    The table grows to the first prime after double its size when the load factor goes over
+    MAX_LOAD_FACTOR, and shrinks to the first prime after half its size (but never below the
+    initial size) when it goes under MIN_LOAD_FACTOR.
 
     constants:
         DEFAULT_TABLE_SIZE: default table size used in the __init__
         DEFAULT_HASH_TABLE: default hash base used for the hash function
+        MAX_LOAD_FACTOR: default maximum average chain length
+        MIN_LOAD_FACTOR: default minimum average chain length
 
     attributes:
         _table: used to represent our internal array
         _length: number of elements in the hash table
+        _min_table_size: the initial table size, under which the table never shrinks
     """
 
     DEFAULT_TABLE_SIZE = 17
     DEFAULT_HASH_BASE = 31
+    MAX_LOAD_FACTOR = 1
+    MIN_LOAD_FACTOR = 0
 
-    def __init__(self, table_size: int = DEFAULT_TABLE_SIZE) -> None:
+    def __init__(self, table_size: int = DEFAULT_TABLE_SIZE,
+                 max_load_factor: float | None = None, min_load_factor: float | None = None,
+                 seeded: bool = False) -> None:
         """
+        :param table_size: initial (and minimum) table size.
+        :param max_load_factor: Optional average chain length over which the table grows.
+                      If not provided, MAX_LOAD_FACTOR is used.
+        :param min_load_factor: Optional average chain length under which the table shrinks.
+                      If not provided, MIN_LOAD_FACTOR is used (by default tables never shrink).
+        :param seeded: Whether every key, str keys included, is hashed with the keyed hash of
+                      HashTable._universal_hash instead of the polynomial hash (see hash) or the
+                      builtin hash, so that colliding keys cannot be crafted.
+        :raises ValueError: when the table size is not positive or the load factors are not
+            0 <= min_load_factor < max_load_factor.
         :complexity: O(N) where N is the table size.
         """
         if table_size <= 0:
             raise ValueError("Table size should be larger than 0.")
+        if max_load_factor is not None:
+            self.MAX_LOAD_FACTOR = max_load_factor
+        if min_load_factor is not None:
+            self.MIN_LOAD_FACTOR = min_load_factor
+        if not 0 <= self.MIN_LOAD_FACTOR < self.MAX_LOAD_FACTOR:
+            raise ValueError("Load factors should satisfy 0 <= min_load_factor < max_load_factor.")
 
-        HashTable.__init__(self)
-        self._table: ArrayR[LinkedList[Tuple[str, V]] | None] = ArrayR(table_size)
+        HashTable.__init__(self, seeded)
+        self._table: ArrayR[Tuple[K, V] | ArrayR[Tuple[K, V]] | None] = ArrayR(table_size)
         self._length = 0
+        self._min_table_size = table_size
 
-    def hash(self, key: str) -> int:
+    def hash(self, key: K) -> int:
         """
-        Universal Hash function
+        Universal Hash function.
+        Strings are hashed with a polynomial universal hash, and any other key with
+        HashTable._universal_hash, which has fast paths for int and bytes keys.
+        Seeded tables use HashTable._universal_hash for strings too.
         :returns: a valid position (0 <= value < table_size) in the hash table
-        :complexity: O(K) where K is the length of the key
+        :complexity: O(K) where K is the length of the key, for str and bytes keys.
+            See HashTable._universal_hash for other keys.
         """
+        if self._seeded or not isinstance(key, str):
+            return self._universal_hash(key) % len(self._table)
         value = 0
         a = 31415
         for char in key:
@@ -46,9 +90,9 @@ class HashTableSeparateChaining(HashTable[str, V]):
 
     @property
     def table_size(self) -> int:
-        return len(self.__array)
+        return len(self._table)
 
-    def items(self) -> ArrayR[Tuple[str, V]]:
+    def items(self) -> ArrayR[Tuple[K, V]]:
         """
         Returns all keys in the hash table
         :complexity: O(N + S) where N is the number of items in our hash table
@@ -58,13 +102,38 @@ class HashTableSeparateChaining(HashTable[str, V]):
         """
         res = ArrayR(self._length)
         i = 0
-        for list in self._table:
-            if list is not None:
-                for item in list:
+        for chain in self._table:
+            if chain is None:
+                continue
+            elif type(chain) is tuple:
+                res[i] = chain
+                i += 1
+            else:
+                for item in chain:
                     res[i] = item
                     i += 1
         return res
-    
+
+    def iter_items(self) -> Iterator[Tuple[K, V]]:
+        """
+        Lazily yields every (key, data) pair in the hash table, straight from the chains.
+        :complexity: O(N + S) for the whole iteration, where N is the number of items in
+            our hash table and S is the table size.
+        :raises RuntimeError: when the table is structurally modified during iteration.
+        """
+        modifications = self._modifications
+        for chain in self._table:
+            if chain is None:
+                continue
+            elif type(chain) is tuple:
+                yield chain
+                self._check_modifications(modifications)
+            else:
+                for item in chain:
+                    yield item
+                    self._check_modifications(modifications)
+        self._check_modifications(modifications)
+
     def is_empty(self) -> bool:
         """
         Returns whether the hash table is empty
@@ -74,38 +143,55 @@ class HashTableSeparateChaining(HashTable[str, V]):
 
     def is_full(self) -> bool:
         """
-        Returns whether the hash table is full
+        Returns whether the hash table is full.
+        A separate chaining table grows as needed, so it is never full.
         :complexity: O(1)
         """
-        return len(self) == len(self.__array)
+        return False
 
-    def __delitem__(self, key: str) -> None:
+    def __delitem__(self, key: K) -> None:
         """
         Deletes an item from our hash table
         :raises KeyError: when the key doesn't exist
         :complexity:
-            Best: O(K) where K is the length of the key (for hashing). Happens when the chain (linked list) does
+            Best: O(K) where K is the length of the key (for hashing). Happens when the chain does
                 not have many elements.
             Worst: O(N + K) where N is the number of items in the hash table and K is the length of the key.
-                Happens when the position has many elements and we have to traverse the linked list.
+                Happens when the position has many elements and we have to traverse the chain, and copy
+                the rest of it to a smaller array.
         """
         position = self.hash(key)
-        if self._table[position] is None:
+        chain = self._table[position]
+        if chain is None:
             raise KeyError(key)
 
-        for index, item in enumerate(self._table[position]):
-            if item[0] == key:
-                if len(self._table[position]) <= 1:
-                    self._table[position] = None
-                else:
-                    self._table[position].delete_at_index(index)
+        if type(chain) is tuple:
+            if chain[0] != key:
+                raise KeyError(key)
+            self._table[position] = None
+        else:
+            for index in range(len(chain)):
+                if chain[index][0] == key:
+                    break
+            else:
+                raise KeyError(key)
 
-                self._length -= 1
-                return
+            if len(chain) == 2:
+                # The remaining item goes back inline.
+                self._table[position] = chain[1 - index]
+            else:
+                new_chain = ArrayR(len(chain) - 1)
+                for i in range(index):
+                    new_chain[i] = chain[i]
+                for i in range(index + 1, len(chain)):
+                    new_chain[i - 1] = chain[i]
+                self._table[position] = new_chain
 
-        raise KeyError(key)
+        self._length -= 1
+        self._modifications += 1
+        self.__shrink()
 
-    def __getitem__(self, key: str) -> V:
+    def __getitem__(self, key: K) -> V:
         """
         Get the data associated with a key
         :raises KeyError: when the key doesn't exist
@@ -115,51 +201,191 @@ class HashTableSeparateChaining(HashTable[str, V]):
             Worst: O(N + K) where N is the number of items in the hash table and K is the length of the key.
                 Happens when we have to traverse a long chain to find the key.
         """
-        position = self.hash(key)
-        if self._table[position] is None:
+        item = self.__find(key)
+        if item is None:
             raise KeyError(key)
-        for item in self._table[position]:
-            if item[0] == key:
-                return item[1]
+        return item[1]
 
-        raise KeyError(key)
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the data associated with a key, or default when the key doesn't exist.
+        :complexity: See __getitem__.
+        """
+        item = self.__find(key)
+        if item is None:
+            return default
+        return item[1]
 
-    def __setitem__(self, key: str, data: V) -> None:
+    def __find(self, key: K) -> Tuple[K, V] | None:
         """
-        Set a (key, data) pair in our hash table
+        Find the (key, data) pair of a key in its chain.
+        :returns: the pair, or None when the key doesn't exist.
+        :complexity: See __getitem__.
+        """
+        chain = self._table[self.hash(key)]
+        if chain is None:
+            if self._stats is not None:
+                self._stats.record_probe(0)
+            return None
+        elif type(chain) is tuple:
+            if self._stats is not None:
+                self._stats.record_probe(0 if chain[0] == key else 1)
+            if chain[0] == key:
+                return chain
+        else:
+            for index in range(len(chain)):
+                if chain[index][0] == key:
+                    if self._stats is not None:
+                        self._stats.record_probe(index)
+                    return chain[index]
+            if self._stats is not None:
+                self._stats.record_probe(len(chain))
+        return None
+
+    def __setitem__(self, key: K, data: V) -> None:
+        """
+        Set a (key, data) pair in our hash table.
+        The chain is scanned once: an existing key is updated in place, otherwise the item is added
+        at the end of the chain.
         :complexity:
             Best: O(K) where K is the length of the key (for hashing). Happens when the position is empty.
             Worst: O(N + K) where N is the number of items in the hash table and K is the length of the key.
-                Happens when the position is not empty and we have to traverse the linked list.
+                Happens when the position is not empty and we have to traverse the chain.
         """
         position = self.hash(key)
-        if self._table[position] is None:
-            self._table[position] = LinkedList()
+        chain = self._table[position]
+        if self._stats is not None:
+            self._stats.record_probe(self.__chain_length(chain))
 
-        # Attempt to find the key in our linked list
-        if len(self._table[position]) > 0:
-            for index, item in enumerate(self._table[position]):
-                if item[0] == key:
+        if chain is None:
+            self._table[position] = (key, data)
+        elif type(chain) is tuple:
+            if chain[0] == key:
+                self._table[position] = (key, data)
+                return
+            new_chain = ArrayR(2)
+            new_chain[0] = chain
+            new_chain[1] = (key, data)
+            self._table[position] = new_chain
+        else:
+            for index in range(len(chain)):
+                if chain[index][0] == key:
                     # If found update the data
-                    self._table[position][index] = (key, data)
+                    chain[index] = (key, data)
                     return
+            new_chain = ArrayR(len(chain) + 1)
+            for index in range(len(chain)):
+                new_chain[index] = chain[index]
+            new_chain[len(chain)] = (key, data)
+            self._table[position] = new_chain
 
-        # Insert at the beginning for better time complexity
-        self._table[position].insert(0, (key, data))
         self._length += 1
+        self._modifications += 1
+        if len(self) > self.table_size * self.MAX_LOAD_FACTOR:
+            self._resize(next_prime(2 * self.table_size + 1))
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Resizes the table straight to a size which can hold the given number of items without
+        going over the load factor. Does nothing if the table is already big enough.
+        :complexity: See _resize.
+        """
+        if capacity > self.table_size * self.MAX_LOAD_FACTOR:
+            self._resize(next_prime(int(capacity / self.MAX_LOAD_FACTOR) + 1))
+
+    def __shrink(self) -> None:
+        """
+        Shrink the table when its load factor has gone under MIN_LOAD_FACTOR,
+        unless that would put it over MAX_LOAD_FACTOR.
+        :complexity: O(1) when the table does not shrink, otherwise see _resize.
+        """
+        if len(self) < self.table_size * self.MIN_LOAD_FACTOR and self.table_size > self._min_table_size:
+            table_size = max(next_prime(self.table_size // 2), self._min_table_size)
+            if len(self) <= table_size * self.MAX_LOAD_FACTOR:
+                self._resize(table_size)
+
+    def _resize(self, table_size: int) -> None:
+        """
+        Resize the table to the given size and reinsert all values.
+        :complexity: O(S + N * K) where S is the new table size, N is the number of items in the
+            hash table and K is the length of the key. Since the table is sized so that chains have
+            a constant average length, reinserting each item does not depend on N.
+        """
+        start = time.perf_counter()
+        old_items = self.items()
+        self._table = ArrayR(table_size)
+        self._length = 0
+        self._modifications += 1
+        # Reinserting is not a user insert, so its probes are not recorded.
+        stats, self._stats = self._stats, None
+        try:
+            for key, data in old_items:
+                self[key] = data
+        finally:
+            self._stats = stats
+        if stats is not None:
+            stats.record_rehash(time.perf_counter() - start)
+
+    @staticmethod
+    def __chain_length(chain: Tuple[K, V] | ArrayR[Tuple[K, V]] | None) -> int:
+        """
+        Returns the number of items in a chain, whatever its representation.
+        :complexity: O(1)
+        """
+        if chain is None:
+            return 0
+        elif type(chain) is tuple:
+            return 1
+        return len(chain)
+
+    def _layout_stats(self) -> dict:
+        """
+        Returns the length of the longest chain, and a histogram of chain lengths: an array
+        where position i is the number of positions in the table holding a chain of length i.
+        :complexity: O(S) where S is the table size.
+        """
+        max_chain = 0
+        for chain in self._table:
+            max_chain = max(max_chain, self.__chain_length(chain))
+        histogram = ArrayR(max_chain + 1)
+        for i in range(len(histogram)):
+            histogram[i] = 0
+        for chain in self._table:
+            histogram[self.__chain_length(chain)] += 1
+        return {'max_chain': max_chain, 'chain_length_histogram': histogram}
+
+    def _dump_header(self) -> dict:
+        """
+        Returns the parameters of the table and of its hash function, see HashTable.dump.
+        """
+        return {
+            'min_table_size': self._min_table_size,
+            'max_load_factor': self.MAX_LOAD_FACTOR,
+            'min_load_factor': self.MIN_LOAD_FACTOR,
+            'seeded': self._seeded,
+            'hash_a': self._hash_a,
+            'hash_b': self._hash_b,
+        }
+
+    @classmethod
+    def _from_header(cls, header: dict) -> HashTableSeparateChaining[K, V]:
+        """
+        Creates an empty table with the parameters of the table and of the hash function in the header.
+        """
+        table = cls(header['min_table_size'], header['max_load_factor'], header['min_load_factor'], header['seeded'])
+        table._hash_a = header['hash_a']
+        table._hash_b = header['hash_b']
+        return table
 
-    def __iter__(self):
+    def __iter__(self) -> Iterator[V]:
         """
-        Returns an iterator for the hash table
+        Returns an iterator over the data in the hash table, see iter_values.
         :complexity:
-            Best: O(1) when the next spot in the table has a non-empty list, or the current list has more items.
+            Best: O(1) when the next spot in the table has a non-empty chain, or the current chain has more items.
             Worst: O(N) where N is the table capacity, when we have to skip over many empty spots
-            in the table until we find the next non-empty list.
+            in the table until we find the next non-empty chain.
         """
-        for list in self._table:
-            if list is not None:
-                for item in list:
-                    yield item[1]
+        return self.iter_values()
 
     def __len__(self) -> int:
         """
@@ -0,0 +1,83 @@
+from __future__ import annotations
+from data_structures.referential_array import ArrayR
+
+class HashTableStats:
+    """
+    Counters kept by a hash table while its statistics are enabled (see HashTable.enable_stats).
+    Recording only increments counters, so it is cheap enough to leave on.
+
+    Probe lengths are the number of positions (or chain items) visited after the first one
+    before finding the key or the place where it should go. They are recorded in a histogram
+    with power of two buckets: bucket 0 counts probes of length 0, bucket 1 of length 1,
+    bucket 2 of lengths 2-3, bucket 3 of lengths 4-7, and so on, with the last bucket
+    counting everything longer.
+
+    attributes:
+        probe_histogram: number of probes in each bucket
+        probes: total number of probes
+        max_probe_length: longest probe so far
+        rehashes: number of times the table was resized or rebuilt
+        rehash_time: total time (in seconds) spent resizing or rebuilding the table
+    """
+
+    PROBE_BUCKETS = 16
+
+    def __init__(self) -> None:
+        """
+        :complexity: O(1)
+        """
+        self.probe_histogram: ArrayR[int] = ArrayR(HashTableStats.PROBE_BUCKETS)
+        for i in range(HashTableStats.PROBE_BUCKETS):
+            self.probe_histogram[i] = 0
+        self.probes = 0
+        self.max_probe_length = 0
+        self.rehashes = 0
+        self.rehash_time = 0.0
+
+    def record_probe(self, length: int) -> None:
+        """
+        Records a probe of the given length.
+        :complexity: O(1)
+        """
+        bucket = min(length.bit_length(), HashTableStats.PROBE_BUCKETS - 1)
+        self.probe_histogram[bucket] += 1
+        self.probes += 1
+        if length > self.max_probe_length:
+            self.max_probe_length = length
+
+    def record_rehash(self, seconds: float) -> None:
+        """
+        Records a resize or rebuild of the table which took the given time.
+        :complexity: O(1)
+        """
+        self.rehashes += 1
+        self.rehash_time += seconds
+
+    def average_probe_length(self) -> float:
+        """
+        Returns an estimate of the average probe length, taking the lower bound of each bucket.
+        :complexity: O(1)
+        """
+        if self.probes == 0:
+            return 0.0
+        total = sum(self.probe_histogram[bucket] * (1 << bucket >> 1)
+                    for bucket in range(HashTableStats.PROBE_BUCKETS))
+        return total / self.probes
+
+    def as_dict(self) -> dict:
+        """
+        Returns the counters as a dictionary. The histogram is copied, so later probes do not
+        change the returned one.
+        :complexity: O(1)
+        """
+        probe_histogram = ArrayR(HashTableStats.PROBE_BUCKETS)
+        for i in range(HashTableStats.PROBE_BUCKETS):
+            probe_histogram[i] = self.probe_histogram[i]
+        return {
+            'probe_histogram': probe_histogram,
+            'probes': self.probes,
+            'max_probe_length': self.max_probe_length,
+            'average_probe_length': self.average_probe_length(),
+            'rehashes': self.rehashes,
+            'rehash_time': self.rehash_time,
+        }
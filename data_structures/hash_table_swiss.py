@@ -0,0 +1,367 @@
+from __future__ import annotations
+import time
+from typing import Tuple, List, Iterable, Mapping
+from data_structures.abstract_hash_table import HashTable, K, V
+from data_structures.hash_table_linear_probing import LinearProbeTable
+from data_structures.referential_array import ArrayR
+
+class SwissTable(LinearProbeTable[K, V]):
+    """
+    Swiss Table.
+    Defines a Hash Table using Linear Probing for collision resolution, where each slot
+    also has a control byte stored in a compact bytearray next to the main array.
+
+    A control byte is either EMPTY, DELETED (a tombstone), or the 7-bit fingerprint of the
+    key stored in that slot. Probing scans the control bytes first (using bytearray.find,
+    which runs over the raw bytes), and only compares keys on a fingerprint hit. On average
+    only 1 in 128 non-matching keys is ever compared.
+
+    Type Arguments:
+        - K:    Key Type.
+        - V:    Value Type.
+
+    Unless stated otherwise, all methods have O(1) complexity.
+    """
+
+    EMPTY = 0x80
+    DELETED = 0xFE
+    MAX_LOAD_FACTOR = 7 / 8
+
+    def __init__(self, sizes: None | List[int] = None, hash_base: int | None = 31,
+                 max_load_factor: float | None = None, min_load_factor: float | None = None,
+                 seeded: bool = False) -> None:
+        """
+        :param sizes: Optional list of sizes to use for the hash table.
+                      If not provided, a default list of sizes will be used.
+        :param max_load_factor: See LinearProbeTable.__init__.
+        :param min_load_factor: See LinearProbeTable.__init__.
+        :param seeded: See LinearProbeTable.__init__.
+        :complexity: O(1) - See LinearProbeTable.__init__.
+        """
+        LinearProbeTable.__init__(self, sizes, hash_base, max_load_factor, min_load_factor, seeded)
+        self._control = bytearray([SwissTable.EMPTY]) * self.table_size
+        self._tombstones = 0
+
+    def hash(self, key: K) -> int:
+        """
+        Hash a key for insert/retrieve/update into the hashtable.
+        The low 7 bits of the full hash are reserved for the fingerprint, so the
+        position is taken from the remaining bits.
+        :complexity: See _full_hash.
+        """
+        return (self._full_hash(key) >> 7) % self.table_size
+
+    def fingerprint(self, key: K) -> int:
+        """
+        Returns the 7-bit fingerprint of a key, stored in the control byte of its slot.
+        :complexity: See _full_hash.
+        """
+        return self._full_hash(key) & 0x7F
+
+    def _full_hash(self, key: K) -> int:
+        """
+        Hash a key to an integer from which both the position and the fingerprint are taken.
+        Strings use the builtin hash, which is computed once and cached by the string.
+        Any other key uses HashTable._universal_hash, so that for example consecutive int
+        keys do not all get the same position and different fingerprints.
+        Seeded tables use the keyed hash of HashTable._universal_hash for strings too, so that
+        keys colliding under the builtin hash do not collide for every table.
+        :complexity: O(K) where K is the length of the key (O(1) for a str once its hash is cached).
+            See HashTable._universal_hash for other keys.
+        """
+        if isinstance(key, str) and not self._seeded:
+            return hash(key)
+        return self._universal_hash(key)
+
+    def __find_slot(self, key: K, is_insert: bool) -> int:
+        """
+        Find the position of this key in the hash table by scanning the control bytes.
+        The probe sequence runs from the hashed position to the first EMPTY control byte,
+        wrapping around at the end of the table. Within it, keys are only compared at
+        slots whose control byte equals the key's fingerprint.
+
+        :complexity:
+            Best: O(K) happens when we hash the key and the position is empty.
+            Worst: O(N + K) happens when the probe sequence covers the entire table.
+            N is the number of items in the table.
+            K is the length of the key.
+        :returns: the position of the key, or when it is not present, the first free
+            slot (EMPTY or DELETED) in the probe sequence if is_insert, -1 otherwise.
+        """
+        full_hash = self._full_hash(key)
+        fingerprint = full_hash & 0x7F
+        control = self._control
+        array = self._array
+        start = (full_hash >> 7) % len(control)
+        free = -1
+
+        # A probe sequence wraps around at most once, so it is split in two ranges.
+        stop = control.find(SwissTable.EMPTY, start)
+        if stop != -1:
+            ranges = ((start, stop),)
+        else:
+            stop = control.find(SwissTable.EMPTY)
+            ranges = ((start, len(control)), (0, stop if stop != -1 else start))
+
+        for low, high in ranges:
+            position = control.find(fingerprint, low, high)
+            while position != -1:
+                if array[position][0] == key:
+                    if self._stats is not None:
+                        self._stats.record_probe((position - start) % len(control))
+                    return position
+                position = control.find(fingerprint, position + 1, high)
+            if is_insert and free == -1:
+                free = control.find(SwissTable.DELETED, low, high)
+
+        if not is_insert:
+            if self._stats is not None:
+                self._stats.record_probe((stop - start) % len(control) if stop != -1 else len(control))
+            return -1
+        if free == -1:
+            # No tombstone to reuse, so take the EMPTY slot ending the probe sequence.
+            free = stop
+        if free == -1:
+            raise RuntimeError("Table is full!")
+        if self._stats is not None:
+            self._stats.record_probe((free - start) % len(control))
+        return free
+
+    def items(self) -> ArrayR[Tuple[K, V]]:
+        """
+        Returns all keys in the hash table.
+        :complexity: O(N) where N is the table size.
+        """
+        res = ArrayR(self._length)
+        i = 0
+        for x in range(self.table_size):
+            if self._control[x] < SwissTable.EMPTY:
+                res[i] = self._array[x]
+                i += 1
+        return res
+
+    def __delitem__(self, key: K) -> None:
+        """
+        Deletes a (key, value) pair in our hash table.
+        The slot is marked with a tombstone, so that probe sequences running over it are
+        not broken, and no other element has to be moved.
+
+        :complexity: See __find_slot.
+        :raises KeyError: when the key doesn't exist.
+        """
+        position = self.__find_slot(key, False)
+        if position == -1:
+            raise KeyError(key)
+        self._array[position] = None
+        self._control[position] = SwissTable.DELETED
+        self._length -= 1
+        self._tombstones += 1
+        self._modifications += 1
+        self._shrink()
+
+    def __getitem__(self, key: K) -> V:
+        """
+        Get the value at a certain key
+
+        :complexity: See __find_slot.
+        :raises KeyError: when the key doesn't exist.
+        """
+        position = self.__find_slot(key, False)
+        if position == -1:
+            raise KeyError(key)
+        return self._array[position][1]
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the value at a certain key, or default when the key doesn't exist.
+
+        :complexity: See __find_slot.
+        """
+        position = self.__find_slot(key, False)
+        if position == -1:
+            return default
+        return self._array[position][1]
+
+    def setdefault(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the value at a certain key, inserting default for it first when the key doesn't exist.
+        :complexity: See HashTable.setdefault.
+        """
+        return HashTable.setdefault(self, key, default)
+
+    def __setitem__(self, key: K, data: V) -> None:
+        """
+        Set an (key, value) pair in our hash table.
+
+        :complexity:
+            Best: Same as __find_slot, when no rehashing is needed.
+            Worst: Same as __rehash.
+        """
+        position = self.__find_slot(key, True)
+
+        if self._control[position] >= SwissTable.EMPTY:
+            if self._control[position] == SwissTable.DELETED:
+                self._tombstones -= 1
+            self._control[position] = self.fingerprint(key)
+            self._length += 1
+            self._modifications += 1
+
+        self._array[position] = (key, data)
+
+        # Tombstones lengthen probe sequences just like elements, so they count towards the load.
+        if self._length + self._tombstones > self.table_size * self.MAX_LOAD_FACTOR:
+            self.__rehash()
+
+    def update(self, items: Iterable[Tuple[K, V]] | Mapping[K, V]) -> None:
+        """
+        Set every (key, data) pair in items, or in items.items() (see HashTable.update).
+        The table is resized once up front (and cleared of tombstones), assuming all the
+        keys are new, so the loop only has to probe and store.
+
+        :complexity: O(S + M * (N + K)) in the worst case, where S is the new table size and
+            M is the number of items. See reserve and __find_slot.
+        """
+        items = HashTable._sized_pairs(items)
+        self.reserve(len(self) + len(items))
+        if self._tombstones > 0:
+            self._resize(self._size_index)
+        array = self._array
+        control = self._control
+        for key, data in items:
+            position = self.__find_slot(key, True)
+            if control[position] == SwissTable.EMPTY:
+                control[position] = self.fingerprint(key)
+                self._length += 1
+                self._modifications += 1
+            array[position] = (key, data)
+
+    def get_many(self, keys: Iterable[K]) -> ArrayR[V]:
+        """
+        Returns an array with the data associated to each of the keys, in the same order.
+
+        :complexity: O(M * (N + K)) in the worst case, where M is the number of keys. See __find_slot.
+        :raises KeyError: when one of the keys doesn't exist.
+        """
+        keys = keys if hasattr(keys, '__len__') else list(keys)
+        res = ArrayR(len(keys))
+        array = self._array
+        for i, key in enumerate(keys):
+            position = self.__find_slot(key, False)
+            if position == -1:
+                raise KeyError(key)
+            res[i] = array[position][1]
+        return res
+
+    def delete_many(self, keys: Iterable[K]) -> int:
+        """
+        Deletes every key in keys which is in the table, ignoring the others.
+        Each deletion only leaves a tombstone, and the table is shrunk at most once at the end.
+
+        :complexity: O(M * (N + K)) in the worst case, where M is the number of keys. See __find_slot.
+        :returns: the number of items deleted.
+        """
+        deleted = 0
+        for key in keys:
+            position = self.__find_slot(key, False)
+            if position != -1:
+                self._array[position] = None
+                self._control[position] = SwissTable.DELETED
+                deleted += 1
+        self._length -= deleted
+        self._tombstones += deleted
+        if deleted > 0:
+            self._modifications += 1
+        self._shrink()
+        return deleted
+
+    def __rehash(self) -> None:
+        """
+        Resize the table, or rebuild it at the same size if at least half of its load is tombstones.
+        :complexity: See _resize.
+        """
+        if self._length > self.table_size * self.MAX_LOAD_FACTOR / 2:
+            self._resize(self._size_index + 1)
+        else:
+            self._resize(self._size_index)
+
+    def _resize(self, size_index: int) -> None:
+        """
+        Rebuild the table with the size at the given index of TABLE_SIZES and reinsert all values.
+        Every key is hashed again, as its control byte only keeps the fingerprint, but no key is
+        compared: the new table has no tombstones and its keys are distinct, so each one goes to
+        the first EMPTY slot from its hashed position, and its control byte is copied over.
+
+        :complexity:
+            Best: O(N) happens when all items can be inserted immediately after being hashed.
+            Worst: O(N * N) happens when all items need maximum probing to be inserted in the new table.
+            N is the number of items in the table.
+        """
+        start = time.perf_counter()
+        old_array = self._array
+        old_control = self._control
+        new_size = self._table_size_at(size_index)
+        self._size_index = size_index
+        self._array = ArrayR(new_size)
+        self._control = bytearray([SwissTable.EMPTY]) * new_size
+        self._tombstones = 0
+        self._modifications += 1
+        for position in range(len(old_control)):
+            if old_control[position] < SwissTable.EMPTY:
+                item = old_array[position]
+                new_position = self._control.find(SwissTable.EMPTY, (self._full_hash(item[0]) >> 7) % new_size)
+                if new_position == -1:
+                    new_position = self._control.find(SwissTable.EMPTY)
+                self._array[new_position] = item
+                self._control[new_position] = old_control[position]
+        if self._stats is not None:
+            self._stats.record_rehash(time.perf_counter() - start)
+
+    def _layout_stats(self) -> dict:
+        """
+        Returns the size of the largest cluster (run of non-EMPTY control bytes, including
+        tombstones, as they lengthen probe sequences just like elements) and the number of tombstones.
+        :complexity: O(N) where N is the table size.
+        """
+        control = self._control
+        empty = control.find(SwissTable.EMPTY)
+        if empty == -1:
+            max_cluster = len(control)
+        else:
+            # Rotated so that no cluster is split by wrapping around.
+            rotated = control[empty:] + control[:empty]
+            max_cluster = max(len(run) for run in rotated.split(bytes([SwissTable.EMPTY])))
+        return {'max_cluster': max_cluster, 'tombstones': self._tombstones}
+
+    def _portable_key(self, key: K) -> bool:
+        """
+        Returns whether the key hashes to the same position in any process, given the same
+        hash parameters. Unless the table is seeded, strings use the builtin hash here, so only
+        int and bytes keys are.
+        """
+        return type(key) is int or type(key) is bytes or (type(key) is str and self._seeded)
+
+    def _dump_header(self) -> dict:
+        """
+        Returns the parameters of the table and of its hash functions, the control bytes and
+        the number of tombstones.
+        """
+        header = LinearProbeTable._dump_header(self)
+        header['control'] = bytes(self._control)
+        header['tombstones'] = self._tombstones
+        return header
+
+    def _load_extra(self, header: dict) -> None:
+        """
+        Restores the control bytes and the number of tombstones.
+        """
+        self._control = bytearray(header['control'])
+        self._tombstones = header['tombstones']
+
+    def __str__(self) -> str:
+        """
+        Returns all they key/value pairs in our hash table (no particular
+        order).
+        """
+        items = self.items()
+        items = '\n'.join(map(lambda x: f"({x[0]}, {x[1]})", items))
+        return f"<SwissTable\n{items}\n>"
@@ -0,0 +1,327 @@
+from __future__ import annotations
+import functools
+from typing import TypeVar, Generic, Callable, Tuple
+from data_structures.hash_table_linear_probing import LinearProbeTable
+from data_structures.node_double import DoubleNode
+from data_structures.referential_array import ArrayR
+
+K = TypeVar('K')
+V = TypeVar('V')
+
+# Separates the positional from the keyword arguments in the keys of memoise, so that no
+# positional arguments make the same key as keyword arguments.
+_KWARGS_MARK = object()
+
+class LRUCache(Generic[K, V]):
+    """
+    Least Recently Used Cache.
+    A bounded map which, when full, evicts the entry which was used least recently.
+
+    Every entry is a DoubleNode (holding the key, the data and the number of times it was used),
+    found through a hash table (LinearProbeTable by default) and linked in a circular doubly
+    linked list ordered from the least to the most recently used entry. The list starts and
+    ends at a sentinel node, so linking and unlinking never has to check for the ends.
+    Getting, setting and evicting an entry are all O(1) on top of the cost of the hash table.
+
+    The cache is bounded by a maximum number of entries, a maximum total weight, or both.
+    The weight of an entry is given by the weigher function (1 for every entry by default),
+    which is called when the entry is set and again when it is removed, so it should always
+    give the same weight for the same key and data.
+
+    attributes:
+        hits: number of lookups which found their key
+        misses: number of lookups which did not find their key
+        evictions: number of entries evicted to make room for others
+
+    Unless stated otherwise, all methods have O(1) complexity, plus the cost of the hash table.
+    """
+
+    def __init__(self, max_entries: int | None = None, max_weight: int | None = None,
+                 weigher: Callable[[K, V], int] | None = None, table_type: type = LinearProbeTable) -> None:
+        """
+        :param max_entries: maximum number of entries, or None for no bound on the number of entries.
+        :param max_weight: maximum total weight of the entries, or None for no bound on the weight.
+        :param weigher: function giving the weight of a (key, data) pair. If not provided, every entry weighs 1.
+        :param table_type: hash table class used to find the entries.
+        :raises ValueError: when no bound is given, or a bound is not positive.
+        """
+        if max_entries is None and max_weight is None:
+            raise ValueError("Either max_entries or max_weight should be given.")
+        if (max_entries is not None and max_entries <= 0) or (max_weight is not None and max_weight <= 0):
+            raise ValueError("Bounds should be larger than 0.")
+
+        self._max_entries = max_entries
+        self._max_weight = max_weight
+        self._weigher = weigher
+        self._table = table_type()
+        self._weight = 0
+        self._head: DoubleNode[K, V] = DoubleNode()
+        self._head._previous = self._head._next = self._head
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _weigh(self, key: K, data: V) -> int:
+        """ Returns the weight of a (key, data) pair. """
+        return 1 if self._weigher is None else self._weigher(key, data)
+
+    @staticmethod
+    def _link_before(node: DoubleNode[K, V], successor: DoubleNode[K, V]) -> None:
+        """ Links the node right before the successor. """
+        node._previous = successor._previous
+        node._next = successor
+        successor._previous._next = node
+        successor._previous = node
+
+    def _link_new(self, node: DoubleNode[K, V]) -> None:
+        """ Links a new entry as the most recently used one. """
+        LRUCache._link_before(node, self._head)
+
+    def _unlink(self, node: DoubleNode[K, V]) -> None:
+        """ Unlinks an entry from the list. """
+        node._previous._next = node._next
+        node._next._previous = node._previous
+        node._previous = node._next = None
+
+    def _touch(self, node: DoubleNode[K, V]) -> None:
+        """ Records a use of an entry, moving it to the most recently used end of the list. """
+        node._size += 1
+        self._unlink(node)
+        LRUCache._link_before(node, self._head)
+
+    def _victim(self) -> DoubleNode[K, V]:
+        """ Returns the entry to evict next, the least recently used one. """
+        return self._head._next
+
+    def _remove(self, node: DoubleNode[K, V]) -> None:
+        """ Removes an entry from the list and the hash table. """
+        self._unlink(node)
+        del self._table[node._key]
+        self._weight -= self._weigh(node._key, node._item)
+
+    def _evict(self, entries: int, weight: int) -> None:
+        """
+        Evicts entries until the given number of entries and weight can be added without going over the bounds.
+        :complexity: O(E) where E is the number of entries evicted.
+        """
+        while len(self._table) > 0 and (
+                (self._max_entries is not None and len(self._table) + entries > self._max_entries)
+                or (self._max_weight is not None and self._weight + weight > self._max_weight)):
+            self._remove(self._victim())
+            self.evictions += 1
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """
+        Get the data at a certain key, or default when the key is not cached.
+        Counts as a use of the entry.
+        """
+        node = self._table.get(key)
+        if node is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._touch(node)
+        return node._item
+
+    def __getitem__(self, key: K) -> V:
+        """
+        Get the data at a certain key. Counts as a use of the entry.
+        :raises KeyError: when the key is not cached.
+        """
+        node = self._table.get(key)
+        if node is None:
+            self.misses += 1
+            raise KeyError(key)
+        self.hits += 1
+        self._touch(node)
+        return node._item
+
+    def __setitem__(self, key: K, data: V) -> None:
+        """
+        Set the data at a certain key, evicting other entries if needed to stay within the bounds.
+        Updating the data of a cached key counts as a use of the entry.
+        An entry heavier than max_weight on its own is not cached.
+        :complexity: O(1) plus O(E) where E is the number of entries evicted.
+        """
+        weight = self._weigh(key, data)
+        node = self._table.get(key)
+        if node is not None:
+            self._weight += weight - self._weigh(key, node._item)
+            node._item = data
+            self._touch(node)
+            self._evict(0, 0)
+            return
+
+        if self._max_weight is not None and weight > self._max_weight:
+            return
+        self._evict(1, weight)
+        node = DoubleNode(data, key, 1)
+        # DoubleNode takes its item as key when the key is None, which is a valid key here.
+        node._key = key
+        self._table[key] = node
+        self._link_new(node)
+        self._weight += weight
+
+    def __delitem__(self, key: K) -> None:
+        """
+        Removes a key from the cache.
+        :raises KeyError: when the key is not cached.
+        """
+        node = self._table.get(key)
+        if node is None:
+            raise KeyError(key)
+        self._remove(node)
+
+    def __contains__(self, key: K) -> bool:
+        """
+        Checks whether the key is cached, without counting as a use of the entry or as a hit or miss.
+        """
+        return key in self._table
+
+    def __len__(self) -> int:
+        """ Returns the number of cached entries. """
+        return len(self._table)
+
+    def weight(self) -> int:
+        """ Returns the total weight of the cached entries. """
+        return self._weight
+
+    def hit_rate(self) -> float:
+        """ Returns the fraction of lookups which found their key. """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def items(self) -> ArrayR[Tuple[K, V]]:
+        """
+        Returns all (key, data) pairs in the order they would be evicted.
+        :complexity: O(N) where N is the number of cached entries.
+        """
+        res = ArrayR(len(self))
+        i = 0
+        node = self._head._next
+        while node is not self._head:
+            res[i] = (node._key, node._item)
+            i += 1
+            node = node._next
+        return res
+
+    def __str__(self) -> str:
+        """
+        Returns all the key/value pairs in the cache, in the order they would be evicted.
+        """
+        items = '\n'.join(map(lambda x: f"({x[0]}, {x[1]})", self.items()))
+        return f"<{type(self).__name__}\n{items}\n>"
+
+
+class LFUCache(LRUCache[K, V]):
+    """
+    Least Frequently Used Cache.
+    A bounded map which, when full, evicts the entry which was used the least number of times,
+    breaking ties by evicting the least recently used of them.
+
+    Entries with the same number of uses are kept in a bucket, a circular doubly linked list
+    from the least to the most recently used entry. The buckets themselves are DoubleNodes
+    (keyed by their number of uses, and holding the sentinel of their list of entries), linked
+    in increasing number of uses, and found by number of uses through a hash table.
+    Using an entry moves it to the bucket for one more use, which is either the next bucket or
+    a new bucket linked right after its current one, so the buckets stay sorted without searching.
+    The next entry to evict is the first entry of the first bucket.
+
+    Unless stated otherwise, all methods have O(1) complexity, plus the cost of the hash tables.
+    """
+
+    def __init__(self, max_entries: int | None = None, max_weight: int | None = None,
+                 weigher: Callable[[K, V], int] | None = None, table_type: type = LinearProbeTable) -> None:
+        """
+        See LRUCache.__init__.
+        """
+        LRUCache.__init__(self, max_entries, max_weight, weigher, table_type)
+        # Here, the list from the sentinel links buckets.
+        self._buckets = table_type()
+
+    def __bucket_after(self, previous: DoubleNode, uses: int) -> DoubleNode:
+        """
+        Returns the bucket of entries used the given number of times, creating it right after
+        the previous bucket (or the sentinel) when it does not exist.
+        """
+        bucket = self._buckets.get(uses)
+        if bucket is None:
+            bucket = DoubleNode(DoubleNode(), uses)
+            bucket._item._previous = bucket._item._next = bucket._item
+            LRUCache._link_before(bucket, previous._next)
+            self._buckets[uses] = bucket
+        return bucket
+
+    def _link_new(self, node: DoubleNode[K, V]) -> None:
+        """ Links a new entry at the end of the bucket of entries used once. """
+        LRUCache._link_before(node, self.__bucket_after(self._head, node._size)._item)
+
+    def _unlink(self, node: DoubleNode[K, V]) -> None:
+        """ Unlinks an entry from its bucket, removing the bucket if it is left empty. """
+        LRUCache._unlink(self, node)
+        bucket = self._buckets[node._size]
+        if bucket._item._next is bucket._item:
+            LRUCache._unlink(self, bucket)
+            del self._buckets[node._size]
+
+    def _touch(self, node: DoubleNode[K, V]) -> None:
+        """ Records a use of an entry, moving it to the end of the next bucket. """
+        bucket = self._buckets[node._size]
+        # The next bucket is found (or created) before unlinking, which may remove the current one.
+        next_bucket = self.__bucket_after(bucket, node._size + 1)
+        self._unlink(node)
+        node._size += 1
+        LRUCache._link_before(node, next_bucket._item)
+
+    def _victim(self) -> DoubleNode[K, V]:
+        """ Returns the entry to evict next, the least recently used of the least used ones. """
+        return self._head._next._item._next
+
+    def items(self) -> ArrayR[Tuple[K, V]]:
+        """
+        Returns all (key, data) pairs in the order they would be evicted.
+        :complexity: O(N) where N is the number of cached entries.
+        """
+        res = ArrayR(len(self))
+        i = 0
+        bucket = self._head._next
+        while bucket is not self._head:
+            node = bucket._item._next
+            while node is not bucket._item:
+                res[i] = (node._key, node._item)
+                i += 1
+                node = node._next
+            bucket = bucket._next
+        return res
+
+
+def memoise(max_entries: int | None = 128, max_weight: int | None = None,
+            cache_type: type = LRUCache, **cache_args) -> Callable:
+    """
+    Decorator which caches the results of a function by its arguments, using a cache of the
+    given type and bounds. The cache can be inspected through the cache attribute of the
+    decorated function. All arguments should be hashable.
+
+    For example:
+    ```
+    @memoise(max_entries=1000)
+    def fibonacci(n):
+        return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+    ```
+    """
+    def decorator(function: Callable) -> Callable:
+        cache = cache_type(max_entries, max_weight, **cache_args)
+        missing = object()
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = args if not kwargs else args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+            result = cache.get(key, missing)
+            if result is missing:
+                result = function(*args, **kwargs)
+                cache[key] = result
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,16 @@
+from typing import TypeVar
+from data_structures.node_binary import BinaryNode
+T = TypeVar('T')
+K = TypeVar('K')
+
+class AVLNode(BinaryNode[K, T]):
+    """ Binary node for AVL trees.
+    Also has the height of the subtree rooted at the node (1 for a leaf), so that _size is
+    left for the number of nodes in the subtree.
+    """
+    def __init__(self, item: T = None, key: K = None, size: int = 0, height: int = 1):
+        BinaryNode.__init__(self, item, key, size)
+        self._height = height
+
+    def __str__(self):
+        return f"AVLNode({self._item}, {self._key}, {self._size}, {self._height}, {'...' if self._left else 'None'}, {'...' if self._right else 'None'})"
@@ -0,0 +1,60 @@
+from typing import TypeVar, Generic
+from data_structures.referential_array import ArrayR
+T = TypeVar('T')
+K = TypeVar('K')
+
+class BPlusNode(Generic[K, T]):
+    """ Node of a B+ tree.
+    Holds up to capacity sorted keys in an ArrayR block, of which the first _count are used.
+    The blocks have room for one key more than a node may keep, so that a node can take
+    one key too many before being split.
+    """
+    def __init__(self, capacity: int):
+        self._keys: ArrayR[K] = ArrayR(capacity + 1)
+        self._count = 0
+
+    def __str__(self):
+        return f"{type(self).__name__}({', '.join(str(self._keys[i]) for i in range(self._count))})"
+
+
+class BPlusLeaf(BPlusNode[K, T]):
+    """ Leaf of a B+ tree.
+    Holds the item of each key, at the same index in _items, and a link to the next leaf
+    (in key order), so that ranges of keys are read without going back up the tree.
+    """
+    def __init__(self, capacity: int):
+        BPlusNode.__init__(self, capacity)
+        self._items: ArrayR[T] = ArrayR(capacity + 1)
+        self._next: BPlusLeaf[K, T] | None = None
+
+
+class BPlusInternal(BPlusNode[K, T]):
+    """ Internal node of a B+ tree.
+    Has one child more than it has keys: the keys of child i are smaller than key i, and those of
+    child i + 1 are larger than or equal to it.
+    """
+    def __init__(self, capacity: int):
+        BPlusNode.__init__(self, capacity)
+        self._children: ArrayR[BPlusNode[K, T]] = ArrayR(capacity + 2)
+
+
+class PagedBPlusLeaf(BPlusLeaf[K, T]):
+    """ Leaf of a PagedBPlusTree, read from (and written back to) page _page of its file.
+    _next is the page of the next leaf, and _dirty tells whether the leaf was modified since
+    it was last written.
+    """
+    def __init__(self, capacity: int, page: int):
+        BPlusLeaf.__init__(self, capacity)
+        self._page = page
+        self._dirty = False
+
+
+class PagedBPlusInternal(BPlusInternal[K, T]):
+    """ Internal node of a PagedBPlusTree, read from (and written back to) page _page of its file.
+    _children holds the pages of the children, and _dirty tells whether the node was modified
+    since it was last written.
+    """
+    def __init__(self, capacity: int, page: int):
+        BPlusInternal.__init__(self, capacity)
+        self._page = page
+        self._dirty = False
@@ -0,0 +1,19 @@
+from typing import TypeVar, Generic
+T = TypeVar('T')
+K = TypeVar('K')
+
+class DoubleNode(Generic[K, T]):
+    """ Simple doubly linked node.
+    Has links to the previous and next nodes, so that it can be unlinked from the middle of a
+    list in O(1) given only the node.
+    Has general attribute size which may store a count, a frequency or any other metadata.
+    """
+    def __init__(self, item: T = None, key: K = None, size: int = 0):
+        self._item = item
+        self._key = key if key is not None else item
+        self._size = size
+        self._previous: DoubleNode[K, T] | None = None
+        self._next: DoubleNode[K, T] | None = None
+
+    def __str__(self):
+        return f"DoubleNode({self._item}, {self._key}, {self._size}, {'...' if self._previous else 'None'}, {'...' if self._next else 'None'})"
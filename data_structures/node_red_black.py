@@ -0,0 +1,17 @@
+from typing import TypeVar
+from data_structures.node_binary import BinaryNode
+T = TypeVar('T')
+K = TypeVar('K')
+
+class RedBlackNode(BinaryNode[K, T]):
+    """ Binary node for red-black trees.
+    Also has a colour (red or black) and a link to its parent, so that the tree can be
+    rebalanced going back up from a node without recursion.
+    """
+    def __init__(self, item: T = None, key: K = None, size: int = 0, red: bool = True):
+        BinaryNode.__init__(self, item, key, size)
+        self._red = red
+        self._parent: RedBlackNode[K, T] | None = None
+
+    def __str__(self):
+        return f"RedBlackNode({self._item}, {self._key}, {self._size}, {'red' if self._red else 'black'}, {'...' if self._left else 'None'}, {'...' if self._right else 'None'})"
@@ -0,0 +1,319 @@
+""" Red-Black Tree.
+    Defines a self-balancing Binary Search Tree with linked nodes, each coloured red or black.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from typing import Tuple
+
+from data_structures.abstract_binary_search_tree import K, V
+from data_structures.binary_search_tree import BinarySearchTree
+from data_structures.linked_stack import LinkedStack
+from data_structures.node_red_black import RedBlackNode
+
+
+class RedBlackTree(BinarySearchTree[K, V]):
+    """ Red-black tree.
+        A binary search tree where every node is red or black, such that:
+            - the root is black,
+            - a red node has no red child, and
+            - every path from a node down to a missing child goes through the same number of black nodes.
+        So no path from the root is more than twice as long as any other, and the height of a tree
+        of N nodes is at most 2 * log2(N + 1). Lookups, insertions and deletions are all O(CompK * log N).
+
+        Balancing is looser than in an AVLTree, so trees may be a little taller, but an insertion
+        makes at most two rotations and a deletion at most three (the rest of the fixing up only
+        recolours nodes), where an AVL deletion may rotate at every level.
+        Nodes are RedBlackNodes, which link to their parent, so insertions and deletions walk down
+        and back up the tree without recursion. Going back up also updates the size of each node
+        (see BinarySearchTree), and rotations recompute the sizes of the two nodes they move.
+    """
+
+    @staticmethod
+    def from_node(node: RedBlackNode[K, V] | None, length: int = 0, check_invariant: bool = False) -> RedBlackTree[K, V]:
+        """
+            Creates a red-black tree object from a red-black node, keeping the colours of the nodes
+            and setting the links to their parents and their sizes. The root is coloured black.
+            Length argument is not checked if passed in.
+            :raises TypeError: when the node is not a RedBlackNode.
+            :raises ValueError: when check_invariant is set and the tree does not satisfy the
+                search invariant, or a red node has a red child, or the paths do not all go through
+                the same number of black nodes.
+            :complexity: O(N) where N is the number of nodes in the tree.
+        """
+        if not isinstance(node, (RedBlackNode, type(None))):
+            raise TypeError(f"Cannot instantiate red-black tree with node type: {type(node)}")
+
+        tree = BinarySearchTree.from_node(node, length, check_invariant)
+        if node is not None:
+            node._parent = None
+            node._red = False
+        if not RedBlackTree.__link_parents(node) and check_invariant:
+            raise ValueError("Constructed RedBlackTree does not satisfy the red-black invariants.")
+
+        red_black = RedBlackTree()
+        red_black._root = tree._root
+        red_black._length = tree._length
+        return red_black
+
+    @staticmethod
+    def __link_parents(root: RedBlackNode[K, V] | None) -> bool:
+        """
+            Links every node in the subtree to its parent, going down in pre-order.
+            :returns: whether no red node has a red child and every path to a missing child goes
+                through the same number of black nodes.
+        """
+        valid = True
+        black_height = None
+        stack = LinkedStack[Tuple[RedBlackNode[K, V], int]]()
+        if root is not None:
+            stack.push((root, 0))
+        while not stack.is_empty():
+            current, blacks = stack.pop()
+            blacks += 0 if current._red else 1
+            for child in (current._left, current._right):
+                if child is None:
+                    if black_height is None:
+                        black_height = blacks
+                    valid = valid and blacks == black_height
+                else:
+                    child._parent = current
+                    valid = valid and not (current._red and child._red)
+                    stack.push((child, blacks))
+        return valid
+
+    @staticmethod
+    def _new_node(key: K, item: V) -> RedBlackNode[K, V]:
+        """ Creates a red-black node, for from_sorted_pairs. """
+        return RedBlackNode(item, key)
+
+    @staticmethod
+    def _place_node(current: RedBlackNode[K, V], depth: int, full_levels: int) -> None:
+        """
+            Colours the nodes of a perfectly balanced tree: those of the full levels black, and those
+            of the last level (when it is not full) red, so that every path goes through full_levels
+            black nodes. Also links the subtrees to the node, which is linked to its own parent
+            when that is placed (the root keeps no parent).
+        """
+        current._red = depth > full_levels
+        current._parent = None
+        for child in (current._left, current._right):
+            if child is not None:
+                child._parent = current
+
+    @staticmethod
+    def _is_red(current: RedBlackNode[K, V] | None) -> bool:
+        """ Returns whether a node is red. Missing children count as black. """
+        return current is not None and current._red
+
+    def _stack_capacity(self) -> int:
+        """ Returns the initial capacity of the stacks of the iterators, enough for the height of the tree. """
+        return 2 * (len(self) + 1).bit_length() + 1
+
+    def _rotate_left(self, current: RedBlackNode[K, V]) -> None:
+        """
+            Rotates the subtree left, so that the right child of current takes its place.
+            :complexity: O(1)
+        """
+        root = current._right
+        current._right = root._left
+        if root._left is not None:
+            root._left._parent = current
+        self.__replace_child(current, root)
+        root._left = current
+        current._parent = root
+        root._size = current._size
+        current._size = 1 + RedBlackTree._subtree_size(current._left) + RedBlackTree._subtree_size(current._right)
+
+    def _rotate_right(self, current: RedBlackNode[K, V]) -> None:
+        """
+            Rotates the subtree right, so that the left child of current takes its place.
+            :complexity: O(1)
+        """
+        root = current._left
+        current._left = root._right
+        if root._right is not None:
+            root._right._parent = current
+        self.__replace_child(current, root)
+        root._right = current
+        current._parent = root
+        root._size = current._size
+        current._size = 1 + RedBlackTree._subtree_size(current._left) + RedBlackTree._subtree_size(current._right)
+
+    def __replace_child(self, current: RedBlackNode[K, V], replacement: RedBlackNode[K, V] | None) -> None:
+        """ Puts replacement in the place of current, below the parent of current (or as the root). """
+        parent = current._parent
+        if replacement is not None:
+            replacement._parent = parent
+        if parent is None:
+            self._root = replacement
+        elif current is parent._left:
+            parent._left = replacement
+        else:
+            parent._right = replacement
+
+    def __setitem__(self, key: K, item: V) -> None:
+        """
+            Inserts an item into the tree as a red leaf, or replaces the item of an existing key,
+            then fixes any red node with a red child going back up.
+            :complexity: O(CompK * log N) where N is the number of nodes in the tree.
+        """
+        parent = None
+        current = self._root
+        while current is not None:
+            parent = current
+            if key < current._key:
+                current = current._left
+            elif key > current._key:
+                current = current._right
+            else:
+                current._item = item
+                return
+
+        node = RedBlackNode(item, key, 1)
+        node._parent = parent
+        if parent is None:
+            self._root = node
+        elif key < parent._key:
+            parent._left = node
+        else:
+            parent._right = node
+        self._length += 1
+        while parent is not None:
+            parent._size += 1
+            parent = parent._parent
+        self.__insert_fixup(node)
+
+    def __insert_fixup(self, current: RedBlackNode[K, V]) -> None:
+        """
+            Restores the invariants after inserting the red node current.
+            While its parent is red too: if its uncle is red, the parent and uncle become black and the
+            grandparent red, moving the problem two levels up. Otherwise one or two rotations fix it.
+            :complexity: O(log N), with at most two rotations.
+        """
+        while RedBlackTree._is_red(current._parent):
+            parent = current._parent
+            # The parent is red, so it is not the root, and the grandparent exists.
+            grandparent = parent._parent
+            if parent is grandparent._left:
+                uncle = grandparent._right
+                if RedBlackTree._is_red(uncle):
+                    parent._red = uncle._red = False
+                    grandparent._red = True
+                    current = grandparent
+                    continue
+                if current is parent._right:
+                    self._rotate_left(parent)
+                    parent = current
+                parent._red = False
+                grandparent._red = True
+                self._rotate_right(grandparent)
+                break
+            else:
+                uncle = grandparent._left
+                if RedBlackTree._is_red(uncle):
+                    parent._red = uncle._red = False
+                    grandparent._red = True
+                    current = grandparent
+                    continue
+                if current is parent._left:
+                    self._rotate_right(parent)
+                    parent = current
+                parent._red = False
+                grandparent._red = True
+                self._rotate_left(grandparent)
+                break
+        self._root._red = False
+
+    def __delitem__(self, key: K) -> None:
+        """
+            Deletes the item of a key from the tree. A node with two children takes the key and item of
+            its successor, whose node is removed instead. Removing a black node leaves its paths one
+            black node short, which is then fixed going back up.
+            :raises KeyError: when the key is not in the tree.
+            :complexity: O(CompK * log N) where N is the number of nodes in the tree.
+        """
+        current = self._root
+        while current is not None and key != current._key:
+            current = current._left if key < current._key else current._right
+        if current is None:
+            raise KeyError('Deleting non-existent item')
+
+        if current._left is not None and current._right is not None:
+            successor = current._right
+            while successor._left is not None:
+                successor = successor._left
+            current._key = successor._key
+            current._item = successor._item
+            current = successor
+
+        # current now has at most one child, which takes its place.
+        child = current._left if current._left is not None else current._right
+        parent = current._parent
+        self.__replace_child(current, child)
+        self._length -= 1
+        ancestor = parent
+        while ancestor is not None:
+            ancestor._size -= 1
+            ancestor = ancestor._parent
+        if not current._red:
+            self.__delete_fixup(child, parent)
+
+    def __delete_fixup(self, current: RedBlackNode[K, V] | None, parent: RedBlackNode[K, V] | None) -> None:
+        """
+            Restores the invariants after removing a black node, whose place was taken by current
+            (possibly None) below parent: paths through current are one black node short.
+            A red current is simply made black. Otherwise, depending on the colours of its sibling and
+            the sibling's children, either the sibling is made red (moving the problem one level up),
+            or one to three rotations fix it.
+            :complexity: O(log N), with at most three rotations.
+        """
+        while current is not self._root and not RedBlackTree._is_red(current):
+            # The paths through current are short of a black node, so its sibling exists.
+            if current is parent._left:
+                sibling = parent._right
+                if sibling._red:
+                    sibling._red = False
+                    parent._red = True
+                    self._rotate_left(parent)
+                    sibling = parent._right
+                if not RedBlackTree._is_red(sibling._left) and not RedBlackTree._is_red(sibling._right):
+                    sibling._red = True
+                    current = parent
+                    parent = current._parent
+                    continue
+                if not RedBlackTree._is_red(sibling._right):
+                    sibling._left._red = False
+                    sibling._red = True
+                    self._rotate_right(sibling)
+                    sibling = parent._right
+                sibling._red = parent._red
+                parent._red = False
+                sibling._right._red = False
+                self._rotate_left(parent)
+            else:
+                sibling = parent._left
+                if sibling._red:
+                    sibling._red = False
+                    parent._red = True
+                    self._rotate_right(parent)
+                    sibling = parent._left
+                if not RedBlackTree._is_red(sibling._left) and not RedBlackTree._is_red(sibling._right):
+                    sibling._red = True
+                    current = parent
+                    parent = current._parent
+                    continue
+                if not RedBlackTree._is_red(sibling._left):
+                    sibling._right._red = False
+                    sibling._red = True
+                    self._rotate_left(sibling)
+                    sibling = parent._left
+                sibling._red = parent._red
+                parent._red = False
+                sibling._left._red = False
+                self._rotate_right(parent)
+            current = self._root
+        if current is not None:
+            current._red = False
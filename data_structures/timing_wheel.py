@@ -0,0 +1,151 @@
+from __future__ import annotations
+import math
+from typing import Iterator
+from data_structures.node_double import DoubleNode
+from data_structures.referential_array import ArrayR
+
+class TimingWheel:
+    """
+    Hierarchical Timing Wheel.
+    Schedules timers (DoubleNodes) to fire at a given tick, and finds the timers which fired
+    when time advances, without ever scanning the timers which did not.
+
+    Each level is a ring of SLOTS slots, used like a CircularQueue: the slot of a timer is its
+    tick modulo the number of slots. A slot of level 0 spans one tick, and a slot of level l spans
+    SLOTS ** l ticks, so LEVELS levels cover SLOTS ** LEVELS ticks. A timer goes in the lowest level
+    which covers the time left until it fires. Whenever time reaches the start of a slot of a
+    higher level, the timers in it are moved down (cascaded) to the lower levels.
+    Timers further away than the wheel covers go in the top level, and are moved again each time
+    their slot is cascaded until they are close enough.
+
+    Each slot is a circular doubly linked list starting and ending at a sentinel node, so a timer
+    is added, cancelled or moved in O(1). The tick of a timer is kept in the _size of its node.
+    It may be fractional (e.g. an exact time measured in ticks), in which case the timer fires
+    at the next whole tick.
+
+    attributes:
+        _current: the last tick processed
+        _count: the number of scheduled timers
+    """
+
+    SLOTS = 64
+    LEVELS = 4
+
+    def __init__(self, current: int = 0) -> None:
+        """
+        :param current: the tick to start from.
+        :complexity: O(SLOTS * LEVELS) to create the sentinel of every slot.
+        """
+        self._current = current
+        self._count = 0
+        self._levels: ArrayR[ArrayR[DoubleNode]] = ArrayR(self.LEVELS)
+        for level in range(self.LEVELS):
+            slots = ArrayR(self.SLOTS)
+            for slot in range(self.SLOTS):
+                sentinel = DoubleNode()
+                sentinel._previous = sentinel._next = sentinel
+                slots[slot] = sentinel
+            self._levels[level] = slots
+
+    def current(self) -> int:
+        """
+        Returns the last tick processed.
+        :complexity: O(1)
+        """
+        return self._current
+
+    def __len__(self) -> int:
+        """
+        Returns the number of scheduled timers.
+        :complexity: O(1)
+        """
+        return self._count
+
+    def schedule(self, node: DoubleNode, tick: float) -> None:
+        """
+        Schedules the timer to fire at the given tick, or at the next tick if that is already past.
+        The node should not already be scheduled.
+        :complexity: O(LEVELS) to find its level.
+        """
+        node._size = tick if math.ceil(tick) > self._current else self._current + 1
+        self.__insert(node)
+        self._count += 1
+
+    def cancel(self, node: DoubleNode) -> None:
+        """
+        Cancels a scheduled timer. Does nothing if it is not scheduled (e.g. it already fired).
+        :complexity: O(1)
+        """
+        if node._previous is not None:
+            TimingWheel.__unlink(node)
+            self._count -= 1
+
+    def advance(self, tick: int) -> Iterator[DoubleNode]:
+        """
+        Advances time up to the given tick, yielding every timer which fires on the way, in order.
+        The timers are unscheduled before being yielded. The iterator should be consumed in full.
+        :complexity: O(T + F + C) where T is the number of ticks advanced (O(1) when no timer is
+            scheduled), F is the number of timers fired and C is the number of timers cascaded.
+            Each timer is cascaded at most LEVELS - 1 times unless it is further away than the
+            wheel covers, so this is O(1) amortised per timer and per tick.
+        """
+        while self._current < tick:
+            if self._count == 0:
+                self._current = tick
+                return
+            self._current += 1
+            self.__cascade()
+            sentinel = self._levels[0][self._current % self.SLOTS]
+            while sentinel._next is not sentinel:
+                node = sentinel._next
+                TimingWheel.__unlink(node)
+                self._count -= 1
+                yield node
+
+    def __cascade(self) -> None:
+        """
+        Moves the timers in the slots of higher levels which start at the current tick down to lower levels.
+        Higher levels are cascaded first, so their timers can be moved down more than one level at once.
+        """
+        level = 1
+        span = self.SLOTS
+        while level < self.LEVELS and self._current % span == 0:
+            level += 1
+            span *= self.SLOTS
+        for level in range(level - 1, 0, -1):
+            span = self.SLOTS ** level
+            sentinel = self._levels[level][(self._current // span) % self.SLOTS]
+            # Detached first, as timers further away than the wheel covers go back to this level.
+            node = sentinel._next
+            sentinel._previous = sentinel._next = sentinel
+            while node is not sentinel:
+                next_node = node._next
+                self.__insert(node)
+                node = next_node
+
+    def __insert(self, node: DoubleNode) -> None:
+        """
+        Links the timer in the slot of the lowest level which covers the time left until it fires.
+        """
+        tick = math.ceil(node._size)
+        delta = tick - self._current
+        level = 0
+        span = 1
+        while level < self.LEVELS - 1 and delta >= span * self.SLOTS:
+            level += 1
+            span *= self.SLOTS
+        if delta >= span * self.SLOTS:
+            # Too far away, so it goes in the last slot of the top level to be cascaded.
+            tick = self._current + span * self.SLOTS - 1
+        sentinel = self._levels[level][(tick // span) % self.SLOTS]
+        node._previous = sentinel._previous
+        node._next = sentinel
+        sentinel._previous._next = node
+        sentinel._previous = node
+
+    @staticmethod
+    def __unlink(node: DoubleNode) -> None:
+        """ Unlinks a timer from its slot. """
+        node._previous._next = node._next
+        node._next._previous = node._previous
+        node._previous = node._next = None
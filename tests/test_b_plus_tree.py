@@ -0,0 +1,223 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+from data_structures.b_plus_tree import BPlusTree
+from data_structures.b_plus_tree_paged import PagedBPlusTree
+from data_structures.node_b_plus import BPlusInternal, BPlusLeaf
+
+
+def check_b_plus_invariant(tree: BPlusTree) -> None:
+    """
+    Checks that every node has sorted keys, between the bounds set by its ancestors, and is full
+    enough, that every leaf is at the same depth as the height of the tree, and that the linked
+    leaves hold every key in order.
+    """
+    leaves = []
+
+    def check(node, low, high, depth):
+        keys = [node._keys[i] for i in range(node._count)]
+        assert keys == sorted(keys) and len(set(keys)) == len(keys), f"Unsorted node {node}"
+        assert all((low is None or low <= key) and (high is None or key < high) for key in keys), f"Node {node} out of bounds"
+        assert node._count <= tree._fanout, f"Node {node} has too many keys"
+        if node is not tree._node(tree._root):
+            assert node._count >= tree._fanout // 2, f"Node {node} has too few keys"
+        if isinstance(node, BPlusLeaf):
+            assert depth == tree.height(), f"Leaf {node} at depth {depth}"
+            leaves.append(node)
+            return
+        assert isinstance(node, BPlusInternal) and (node is not tree._node(tree._root) or node._count > 0)
+        bounds = [low] + keys + [high]
+        children = [node._children[i] for i in range(node._count + 1)]
+        for i, child in enumerate(children):
+            check(tree._node(child), bounds[i], bounds[i + 1], depth + 1)
+
+    check(tree._node(tree._root), None, None, 1)
+    for leaf, following in zip(leaves, leaves[1:] + [None]):
+        expected = tree._ref(following) if following is not None else None
+        assert leaf._next == expected, f"Leaf {leaf} is not linked to the next one"
+    assert sum(leaf._count for leaf in leaves) == len(tree)
+
+
+class TestBPlusTree(TestCase):
+    FANOUTS = [3, 4, 5, 32]
+
+    def setUp(self):
+        self._empty = BPlusTree()
+        self._trees = []
+        for fanout in self.FANOUTS:
+            tree = BPlusTree(fanout)
+            for i in range(100):
+                tree[i] = i
+            self._trees.append(tree)
+
+    def test_init(self):
+        self.assertTrue(self._empty.is_empty())
+        self.assertEqual((len(self._empty), self._empty.height()), (0, 1))
+        self.assertRaises(ValueError, lambda: BPlusTree(2))
+        self.assertEqual(list(self._empty), [])
+        self.assertRaises(KeyError, lambda: self._empty[0])
+
+    def test_setup_invariant(self):
+        for tree in self._trees:
+            check_b_plus_invariant(tree)
+            self.assertEqual(len(tree), 100)
+            self.assertFalse(tree.is_empty())
+        self.assertEqual(self._trees[-1].height(), 2)
+
+    def test_get_contains(self):
+        for tree in self._trees:
+            for i in range(100):
+                self.assertEqual(tree[i], i)
+                self.assertIn(i, tree)
+            for key in (-1, 100, 0.5):
+                self.assertRaises(KeyError, lambda: tree[key])
+                self.assertNotIn(key, tree)
+            tree[50] = 'fifty'
+            self.assertEqual((tree[50], len(tree)), ('fifty', 100))
+
+    def test_iter_items(self):
+        for tree in self._trees:
+            self.assertEqual(list(tree), [(i, i) for i in range(100)])
+            self.assertEqual(list(tree.items()), [(i, i) for i in range(100)])
+            self.assertEqual(list(tree.keys()), list(range(100)))
+            self.assertEqual(list(tree.values()), list(range(100)))
+
+    def test_range_iter(self):
+        for tree in self._trees:
+            self.assertEqual(list(tree.range_iter(10, 20)), [(i, i) for i in range(10, 20)])
+            self.assertEqual(list(tree.range_iter(10, 20, inclusive=(False, True))), [(i, i) for i in range(11, 21)])
+            self.assertEqual(list(tree.range_iter(9.5, 12.5)), [(i, i) for i in range(10, 13)])
+            self.assertEqual(list(tree.range_iter(high=3)), [(i, i) for i in range(3)])
+            self.assertEqual(list(tree.range_iter(97)), [(i, i) for i in range(97, 100)])
+            self.assertEqual(list(tree.range_iter(150)), [])
+            self.assertEqual(list(tree.range_iter(20, 10)), [])
+
+    def test_delete(self):
+        for tree in self._trees:
+            self.assertRaises(KeyError, lambda: tree.__delitem__(100))
+            for i in range(0, 100, 2):
+                del tree[i]
+                check_b_plus_invariant(tree)
+            self.assertEqual(list(tree.keys()), list(range(1, 100, 2)))
+            for i in range(99, 0, -2):
+                del tree[i]
+            check_b_plus_invariant(tree)
+            self.assertTrue(tree.is_empty())
+            self.assertEqual(tree.height(), 1)
+            tree[1] = 1
+            self.assertEqual(list(tree), [(1, 1)])
+
+    def test_random(self):
+        random.seed(48)
+        for fanout in self.FANOUTS:
+            tree = BPlusTree(fanout)
+            reference = {}
+            for i in range(3000):
+                key = random.randrange(500)
+                if key in reference and random.random() < 0.5:
+                    del tree[key]
+                    del reference[key]
+                else:
+                    tree[key] = i
+                    reference[key] = i
+                if i % 250 == 0:
+                    check_b_plus_invariant(tree)
+            check_b_plus_invariant(tree)
+            self.assertEqual(list(tree), sorted(reference.items()))
+
+    def test_from_sorted(self):
+        for fanout in self.FANOUTS:
+            for n in list(range(50)) + [500, 1234]:
+                tree = BPlusTree.from_sorted(range(n), check_invariant=True, fanout=fanout)
+                check_b_plus_invariant(tree)
+                self.assertEqual(list(tree), [(i, i) for i in range(n)])
+            tree = BPlusTree.from_sorted_pairs(((i, str(i)) for i in range(0, 1000, 2)), fanout=fanout)
+            self.assertEqual(tree[500], '500')
+            for i in range(1, 1000, 2):
+                tree[i] = str(i)
+            for i in range(0, 1000, 3):
+                del tree[i]
+            check_b_plus_invariant(tree)
+            self.assertEqual(list(tree.keys()), [i for i in range(1000) if i % 3])
+        self.assertRaises(ValueError, lambda: BPlusTree.from_sorted([1, 3, 2], check_invariant=True))
+        self.assertRaises(ValueError, lambda: BPlusTree.from_sorted([1, 1], check_invariant=True))
+
+    def test_str(self):
+        self.assertEqual(str(self._empty), "<BPlusTree()>")
+        tree = BPlusTree(3)
+        for i in range(4):
+            tree[i] = i * 10
+        self.assertEqual(str(tree), "<BPlusTree[(0: 0, 1: 10) 2 (2: 20, 3: 30)]>")
+
+
+class TestPagedBPlusTree(TestCase):
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, "tree.bpt")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_persistence(self):
+        random.seed(49)
+        reference = {}
+        with PagedBPlusTree(self._path, fanout=8, page_size=512, buffer_pages=4) as tree:
+            self.assertTrue(tree.is_empty())
+            for i in range(2000):
+                key = random.randrange(800)
+                if key in reference and random.random() < 0.4:
+                    del tree[key]
+                    del reference[key]
+                else:
+                    tree[key] = str(i)
+                    reference[key] = str(i)
+            check_b_plus_invariant(tree)
+            self.assertEqual(list(tree), sorted(reference.items()))
+            self.assertLessEqual(len(tree._pool), 4)
+
+        with PagedBPlusTree(self._path, buffer_pages=16) as tree:
+            self.assertEqual((tree._fanout, tree._page_size), (8, 512))
+            self.assertEqual(len(tree), len(reference))
+            check_b_plus_invariant(tree)
+            self.assertEqual(list(tree.range_iter(100, 200)), sorted((key, item) for key, item in reference.items() if 100 <= key < 200))
+            pages = tree._pages
+            for key in list(reference)[:200]:
+                del tree[key]
+                del reference[key]
+            for key in range(1000, 1100):
+                tree[key] = key
+                reference[key] = key
+            # The pages of merged nodes are reused.
+            self.assertLessEqual(tree._pages, pages + 2)
+
+        with PagedBPlusTree(self._path) as tree:
+            check_b_plus_invariant(tree)
+            self.assertEqual(list(tree), sorted(reference.items()))
+
+    def test_lookup_pages(self):
+        with PagedBPlusTree.from_sorted(range(5000), False, self._path, fanout=16, buffer_pages=4) as tree:
+            check_b_plus_invariant(tree)
+            self.assertEqual(tree.height(), 4)
+        with PagedBPlusTree(self._path, buffer_pages=4) as tree:
+            for key in random.sample(range(5000), 100):
+                reads = tree.reads
+                self.assertEqual(tree[key], key)
+                self.assertLessEqual(tree.reads - reads, tree.height())
+            self.assertRaises(KeyError, lambda: tree[5000])
+            self.assertEqual(tree.pool_stats()['pool_pages'], 4)
+
+    def test_errors(self):
+        with open(self._path, 'wb') as file:
+            file.write(b"not a tree")
+        self.assertRaises(ValueError, lambda: PagedBPlusTree(self._path))
+        os.remove(self._path)
+        self.assertRaises(ValueError, lambda: PagedBPlusTree(self._path, buffer_pages=3))
+        self.assertRaises(ValueError, lambda: PagedBPlusTree(self._path, page_size=32))
+        with PagedBPlusTree(self._path, fanout=4, page_size=64) as tree:
+            tree[0] = 0
+            self.assertRaises(ValueError, lambda: tree.__setitem__(1, "x" * 100) or tree.flush())
+            tree[1] = 1
+        with PagedBPlusTree(self._path) as tree:
+            self.assertEqual(list(tree), [(0, 0), (1, 1)])
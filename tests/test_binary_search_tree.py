@@ -1,5 +1,11 @@
+import random
+import sys
 from unittest import TestCase
+from data_structures.avl_tree import AVLTree
 from data_structures.binary_search_tree import BinarySearchTree, BinaryNode
+from data_structures.node_avl import AVLNode
+from data_structures.node_red_black import RedBlackNode
+from data_structures.red_black_tree import RedBlackTree
 
 
 def check_bst_invariant(node: BinaryNode | None, l=None, r=None) -> bool:
@@ -13,6 +19,21 @@ def check_bst_invariant(node: BinaryNode | None, l=None, r=None) -> bool:
             check_bst_invariant(node._right, node._key, r))
 
 
+def check_sizes(node: BinaryNode | None) -> int:
+    """ Checks that every node holds the number of nodes in its subtree, returning that of the tree. """
+    if node is None:
+        return 0
+    size = 1 + check_sizes(node._left) + check_sizes(node._right)
+    assert node._size == size, f"Node {node._key} has the wrong size"
+    return size
+
+
+def node_height(node: BinaryNode | None) -> int:
+    if node is None:
+        return 0
+    return 1 + max(node_height(node._left), node_height(node._right))
+
+
 def double(iterator):
     for x in iterator:
         yield (x, x)
@@ -20,13 +41,14 @@ def double(iterator):
 
 class TestBinarySearchTree(TestCase):
     NUM_ITEMS = 15
+    TREE_TYPE = BinarySearchTree
 
     def setUp(self):
-        self._empty = BinarySearchTree()
-        self._one = BinarySearchTree()
-        self._left_tree = BinarySearchTree()
-        self._right_tree = BinarySearchTree()
-        self._balanced = BinarySearchTree()
+        self._empty = self.TREE_TYPE()
+        self._one = self.TREE_TYPE()
+        self._left_tree = self.TREE_TYPE()
+        self._right_tree = self.TREE_TYPE()
+        self._balanced = self.TREE_TYPE()
         self._one[0] = 0
         balanced_items = [7, 3, 1, 0, 2, 5, 4, 6, 11, 9, 8, 10, 13, 12, 14]
         for i in range(self.NUM_ITEMS):
@@ -36,7 +58,12 @@ class TestBinarySearchTree(TestCase):
 
         self._trees = [self._empty, self._one, self._left_tree, self._right_tree, self._balanced]
         
-        self._table = BinarySearchTree()
+        self._table = self.TREE_TYPE()
+
+    def check_tree(self, tree):
+        """ Checks the invariants of a tree of TREE_TYPE. """
+        self.assertTrue(check_bst_invariant(tree._root))
+        self.assertEqual(check_sizes(tree._root), len(tree))
 
     def test_len(self):
         self.assertEqual(len(self._empty), 0)
@@ -48,6 +75,7 @@ class TestBinarySearchTree(TestCase):
     def test_setup_invariant(self):
         for tree in self._trees:
             self.assertTrue(check_bst_invariant(tree._root))
+            self.assertEqual(check_sizes(tree._root), len(tree))
 
         incorrect = BinaryNode(1, 1)
         incorrect._right = BinaryNode(0, 0)
@@ -108,6 +136,29 @@ class TestBinarySearchTree(TestCase):
 
         self.assertEqual(lists[4], list(double([0, 2, 1, 4, 6, 5, 3, 8, 10, 9, 12, 14, 13, 11, 7])))
 
+    def test_morris_iter(self):
+        for tree in self._trees:
+            pre_order = list(tree.pre_iter())
+            self.assertEqual(list(tree.morris_iter()), list(tree))
+            # The links made while iterating are all removed.
+            self.assertEqual(list(tree.pre_iter()), pre_order)
+            self.assertEqual(check_sizes(tree._root), len(tree))
+
+            expected = list(tree)[:5]
+            iterator = tree.morris_iter()
+            self.assertEqual([next(iterator) for _ in expected], expected)
+            iterator.close()
+            self.assertEqual(list(tree.pre_iter()), pre_order)
+            self.assertRaises(StopIteration, lambda: next(iterator))
+
+        random.seed(46)
+        tree = self.TREE_TYPE()
+        keys = random.sample(range(10000), 1000)
+        for key in keys:
+            tree[key] = key
+        self.assertEqual(list(tree.morris_iter()), list(double(sorted(keys))))
+        self.assertEqual(list(tree.items()), list(double(sorted(keys))))
+
     def test_remove(self):
         self._table["Key Three"] = 3
         self._table["Key One"] = 1
@@ -185,6 +236,194 @@ class TestBinarySearchTree(TestCase):
         self.assertRaises(TypeError, lambda: BinarySearchTree.from_node("hello"))
 
 
+    def test_degenerate(self):
+        # Deeper than the recursion limit, for trees which do not rebalance.
+        n = sys.getrecursionlimit() + 500
+        tree = self.TREE_TYPE()
+        for i in range(n):
+            tree[i] = str(i)
+        self.assertEqual(tree[n - 1], str(n - 1))
+        self.assertIn(0, tree)
+        self.assertNotIn(n, tree)
+        for i in range(0, n, 2):
+            del tree[i]
+        self.assertEqual(len(tree), n // 2)
+        self.assertEqual([key for key, _ in tree], list(range(1, n, 2)))
+
+        node = BinaryNode(0)
+        current = node
+        for i in range(1, n):
+            current._right = BinaryNode(i)
+            current = current._right
+        tree = BinarySearchTree.from_node(node, check_invariant=True)
+        self.assertEqual(len(tree), n)
+        current._right = BinaryNode(-1)
+        self.assertRaises(ValueError, lambda: BinarySearchTree.from_node(node, check_invariant=True))
+
+    def test_order_statistics(self):
+        for tree in self._trees:
+            for k in range(1, len(tree) + 1):
+                self.assertEqual(tree.kth_smallest(k), (k - 1, k - 1))
+                self.assertEqual(tree.rank(k - 1), k - 1)
+            self.assertRaises(IndexError, lambda: tree.kth_smallest(0))
+            self.assertRaises(IndexError, lambda: tree.kth_smallest(len(tree) + 1))
+            self.assertEqual(tree.rank(-5), 0)
+            self.assertEqual(tree.rank(100), len(tree))
+            self.assertEqual(tree.count_range(-100, 100), len(tree))
+
+        random.seed(44)
+        tree = self.TREE_TYPE()
+        reference = {}
+        for i in range(3000):
+            key = random.randrange(400)
+            if key in reference and random.random() < 0.5:
+                del tree[key]
+                del reference[key]
+            else:
+                tree[key] = i
+                reference[key] = i
+            if i % 300 == 0:
+                self.assertEqual(check_sizes(tree._root), len(reference))
+        self.assertRaises(KeyError, lambda: tree.__delitem__(400))
+        self.assertRaises(KeyError, lambda: tree.__delitem__(200.5))
+        self.assertEqual(check_sizes(tree._root), len(reference))
+
+        keys = sorted(reference)
+        for k in range(1, len(keys) + 1, 7):
+            self.assertEqual(tree.kth_smallest(k), (keys[k - 1], reference[keys[k - 1]]))
+        for key in range(-1, 402, 5):
+            self.assertEqual(tree.rank(key), sum(1 for other in keys if other < key))
+        for low, high in ((0, 400), (10, 20), (100.5, 300.5), (50, 50), (60, 40)):
+            self.assertEqual(tree.count_range(low, high), sum(1 for key in keys if low <= key < high))
+
+    def test_range_queries(self):
+        for tree in self._trees[2:]:
+            self.assertEqual(list(tree.range_iter(3, 7)), list(double(range(3, 7))))
+            self.assertEqual(list(tree.range_iter(3, 7, inclusive=(False, True))), list(double(range(4, 8))))
+            self.assertEqual(list(tree.range_iter(high=2)), list(double(range(2))))
+            self.assertEqual(list(tree.range_iter(12)), list(double(range(12, 15))))
+            self.assertEqual(list(tree.range_iter(-0.5, 2.5)), list(double(range(3))))
+            self.assertEqual(list(tree.range_iter(7, 3)), [])
+            self.assertEqual((tree.min(), tree.max()), ((0, 0), (14, 14)))
+            self.assertEqual((tree.floor(5), tree.floor(5.5), tree.ceiling(5), tree.ceiling(5.5)),
+                             ((5, 5), (5, 5), (5, 5), (6, 6)))
+            self.assertEqual((tree.predecessor(5), tree.successor(5)), ((4, 4), (6, 6)))
+            self.assertRaises(KeyError, lambda: tree.floor(-1))
+            self.assertRaises(KeyError, lambda: tree.predecessor(0))
+            self.assertRaises(KeyError, lambda: tree.ceiling(14.5))
+            self.assertRaises(KeyError, lambda: tree.successor(14))
+        self.assertEqual(list(self._empty.range_iter()), [])
+        self.assertRaises(KeyError, self._empty.min)
+        self.assertRaises(KeyError, self._empty.max)
+        self.assertRaises(KeyError, lambda: self._empty.floor(0))
+
+        random.seed(45)
+        tree = self.TREE_TYPE()
+        keys = sorted(random.sample(range(0, 2000, 2), 500))
+        for key in random.sample(keys, len(keys)):
+            tree[key] = -key
+        for low, high in ((None, None), (101, 301), (100, 300), (-5, 50), (1990, 3000), (500, 500)):
+            for inclusive in ((True, False), (True, True), (False, False), (False, True)):
+                expected = [(key, -key) for key in keys
+                            if (low is None or low < key or (inclusive[0] and key == low))
+                            and (high is None or key < high or (inclusive[1] and key == high))]
+                self.assertEqual(list(tree.range_iter(low, high, inclusive)), expected)
+        for key in range(keys[0], keys[-1], 7):
+            self.assertEqual(tree.floor(key)[0], max(other for other in keys if other <= key))
+            self.assertEqual(tree.ceiling(key)[0], min(other for other in keys if other >= key))
+            self.assertEqual(tree.successor(key)[0], min(other for other in keys if other > key))
+            self.assertEqual(tree.predecessor(key + 1)[0], max(other for other in keys if other < key + 1))
+
+    def test_from_sorted(self):
+        for n in range(40):
+            tree = self.TREE_TYPE.from_sorted(range(n), check_invariant=True)
+            self.assertIs(type(tree), self.TREE_TYPE)
+            self.check_tree(tree)
+            self.assertEqual(list(tree), list(double(range(n))))
+            self.assertEqual(node_height(tree._root), n.bit_length())
+
+        tree = self.TREE_TYPE.from_sorted_pairs((i, str(i)) for i in range(100))
+        self.assertEqual((len(tree), tree[42]), (100, '42'))
+        for i in range(100, 200):
+            tree[i] = str(i)
+        for i in range(0, 200, 3):
+            del tree[i]
+        self.check_tree(tree)
+        self.assertEqual([key for key, _ in tree], [i for i in range(200) if i % 3])
+        self.assertRaises(ValueError, lambda: self.TREE_TYPE.from_sorted([3, 1, 2], check_invariant=True))
+
+    def test_rebuild(self):
+        for tree in self._trees:
+            pairs = list(tree)
+            tree.rebuild()
+            self.check_tree(tree)
+            self.assertEqual(list(tree), pairs)
+            self.assertEqual(node_height(tree._root), len(tree).bit_length())
+
+        random.seed(47)
+        tree = self.TREE_TYPE()
+        keys = random.sample(range(5000), 500)
+        for key in sorted(keys):
+            tree[key] = key
+        for key in keys[:250]:
+            del tree[key]
+        tree.rebuild()
+        self.check_tree(tree)
+        self.assertEqual(node_height(tree._root), len(tree).bit_length())
+        self.assertEqual(list(tree), list(double(sorted(keys[250:]))))
+        for key in keys[:100]:
+            tree[key] = key
+        for key in keys[250:350]:
+            del tree[key]
+        self.check_tree(tree)
+        self.assertEqual(list(tree), list(double(sorted(keys[:100] + keys[350:]))))
+
+    def test_split_join(self):
+        for tree in self._trees:
+            pairs = list(tree)
+            for key in [-1, 0, 3.5, 7, 14, 20]:
+                left, right = tree.split(key)
+                self.assertEqual((type(left), type(right)), (self.TREE_TYPE, self.TREE_TYPE))
+                self.check_tree(left)
+                self.check_tree(right)
+                self.assertEqual(list(left), [pair for pair in pairs if pair[0] < key])
+                self.assertEqual(list(right), [pair for pair in pairs if pair[0] >= key])
+                self.assertEqual(node_height(left._root), len(left).bit_length())
+                joined = self.TREE_TYPE.join(left, right)
+                self.check_tree(joined)
+                self.assertEqual(list(joined), pairs)
+            self.assertEqual(list(tree), pairs)
+
+        self.assertRaises(ValueError, lambda: self.TREE_TYPE.join(self._balanced, self._one))
+        left, right = self._balanced.split(10)
+        joined = self.TREE_TYPE.join(left, right)
+        joined[20] = 20
+        del joined[3]
+        self.check_tree(joined)
+        self.assertEqual(list(self._balanced), list(double(range(15))))
+
+    def test_union(self):
+        random.seed(50)
+        mine, theirs = self.TREE_TYPE(), self.TREE_TYPE()
+        expected = {}
+        for key in random.sample(range(1000), 300):
+            mine[key] = 'mine'
+            expected[key] = 'mine'
+        for key in random.sample(range(1000), 300):
+            theirs[key] = 'theirs'
+            expected[key] = 'theirs'
+        union = mine.union(theirs)
+        self.assertIs(type(union), self.TREE_TYPE)
+        self.check_tree(union)
+        self.assertEqual(list(union), sorted(expected.items()))
+        self.assertEqual(node_height(union._root), len(union).bit_length())
+        self.assertEqual((len(mine), len(theirs)), (300, 300))
+
+        for tree in self._trees:
+            self.assertEqual(list(tree.union(self._empty)), list(tree))
+            self.assertEqual(list(self._empty.union(tree)), list(tree))
+            self.assertEqual(list(tree.union(tree)), list(tree))
+
     def test_str(self):
         empty_str = str(self._empty)
         self.assertEqual(empty_str, "<BinarySearchTree(None)>")
@@ -485,3 +724,249 @@ class TestBinarySearchTree(TestCase):
     )
   )
 )>""")
+
+
+def check_avl_invariant(node: BinaryNode | None) -> int:
+    """ Checks that every node is balanced and holds its height, returning the height of the tree. """
+    if node is None:
+        return 0
+    left, right = check_avl_invariant(node._left), check_avl_invariant(node._right)
+    assert abs(left - right) <= 1, f"Node {node._key} is not balanced"
+    assert node._height == 1 + max(left, right), f"Node {node._key} has the wrong height"
+    return node._height
+
+
+class TestAVLTree(TestBinarySearchTree):
+    """ Runs the BinarySearchTree tests on AVL trees, where inserting in order gives balanced trees too. """
+    TREE_TYPE = AVLTree
+    BALANCED = [7, 3, 1, 0, 2, 5, 4, 6, 11, 9, 8, 10, 13, 12, 14]
+    BALANCED_STR = "(7, 7, (3, 3, (1, 1, (0, 0, None, None), (2, 2, None, None)), (5, 5, (4, 4, None, None), (6, 6, None, None))), (11, 11, (9, 9, (8, 8, None, None), (10, 10, None, None)), (13, 13, (12, 12, None, None), (14, 14, None, None))))"
+
+    def check_tree(self, tree):
+        TestBinarySearchTree.check_tree(self, tree)
+        check_avl_invariant(tree._root)
+
+    def test_setup_invariant(self):
+        for tree in self._trees:
+            self.assertTrue(check_bst_invariant(tree._root))
+            check_avl_invariant(tree._root)
+            self.assertEqual(check_sizes(tree._root), len(tree))
+        self.assertEqual([tree.height() for tree in self._trees], [0, 1, 4, 4, 4])
+
+    def test_preorder_iter(self):
+        self.assertEqual(list(self._empty.pre_iter()), [])
+        self.assertEqual(list(self._one.pre_iter()), [(0, 0)])
+        for tree in self._trees[2:]:
+            self.assertEqual(list(tree.pre_iter()), list(double(self.BALANCED)))
+
+    def test_postorder_iter(self):
+        self.assertEqual(list(self._empty.post_iter()), [])
+        self.assertEqual(list(self._one.post_iter()), [(0, 0)])
+        for tree in self._trees[2:]:
+            self.assertEqual(list(tree.post_iter()), list(double([0, 2, 1, 4, 6, 5, 3, 8, 10, 9, 12, 14, 13, 11, 7])))
+
+    def test_static(self):
+        tree = AVLTree.from_node(None)
+        self.assertIs(type(tree), AVLTree)
+        self.assertEqual(len(tree), 0)
+
+        node = AVLNode(1)
+        node._left = AVLNode(0)
+        node._left._left = AVLNode(-1)
+        tree = AVLTree.from_node(node)
+        self.assertEqual((len(tree), tree.height()), (3, 3))
+        self.assertRaises(ValueError, lambda: AVLTree.from_node(node, check_invariant=True))
+        # Inserting rebalances the tree from the computed heights and sizes.
+        tree[-2] = -2
+        check_avl_invariant(tree._root)
+        self.assertEqual(check_sizes(tree._root), 4)
+
+        node = AVLNode(1)
+        node._left = AVLNode(2)
+        self.assertRaises(ValueError, lambda: AVLTree.from_node(node, check_invariant=True))
+        self.assertRaises(TypeError, lambda: AVLTree.from_node(BinaryNode(1)))
+        self.assertRaises(TypeError, lambda: AVLTree.from_node("hello"))
+
+    def test_str(self):
+        self.assertEqual(str(self._empty), "<AVLTree(None)>")
+        self.assertEqual(str(self._one), "<AVLTree(0, 0, None, None)>")
+        for tree in self._trees[2:]:
+            self.assertEqual(str(tree), f"<AVLTree{self.BALANCED_STR}>")
+
+    def test_str_indent(self):
+        two_tree = AVLTree()
+        two_tree[2] = "two"
+        two_tree[1] = 1
+        self.assertEqual(two_tree.str(indent=2),
+"""<AVLTree
+(
+  2, 
+  two, 
+  (
+    1, 
+    1, 
+    None, 
+    None
+  ), 
+  None
+)>""")
+
+    def test_sorted(self):
+        tree = AVLTree()
+        for i in range(5000):
+            tree[i] = i
+        for i in range(5000, 0, -1):
+            tree[-i] = -i
+        self.assertEqual(len(tree), 10000)
+        self.assertEqual(check_avl_invariant(tree._root), tree.height())
+        self.assertLessEqual(tree.height(), 19)
+        self.assertEqual([key for key, _ in tree], list(range(-5000, 5000)))
+
+    def test_random(self):
+        random.seed(41)
+        tree = AVLTree()
+        reference = {}
+        for i in range(5000):
+            key = random.randrange(500)
+            if key in reference and random.random() < 0.5:
+                del tree[key]
+                del reference[key]
+            else:
+                tree[key] = i
+                reference[key] = i
+            if i % 500 == 0:
+                check_avl_invariant(tree._root)
+        self.assertEqual(list(tree), sorted(reference.items()))
+        self.assertRaises(KeyError, lambda: tree.__delitem__(-1))
+        check_avl_invariant(tree._root)
+
+
+def check_red_black_invariant(node: RedBlackNode | None, parent: RedBlackNode | None = None) -> int:
+    """
+    Checks the links to the parents, that no red node has a red child, and that every path goes
+    through the same number of black nodes, returning that number.
+    """
+    if node is None:
+        return 0
+    assert node._parent is parent, f"Node {node._key} has the wrong parent"
+    for child in (node._left, node._right):
+        assert not (node._red and child is not None and child._red), f"Red node {node._key} has a red child"
+    left, right = check_red_black_invariant(node._left, node), check_red_black_invariant(node._right, node)
+    assert left == right, f"Paths below node {node._key} have different numbers of black nodes"
+    return left + (0 if node._red else 1)
+
+
+class TestRedBlackTree(TestBinarySearchTree):
+    """ Runs the BinarySearchTree tests on red-black trees, with the shapes they give. """
+    TREE_TYPE = RedBlackTree
+    # Pre-order and post-order of the left (descending inserts), right (ascending) and balanced trees.
+    PRE_ORDERS = [[11, 7, 5, 3, 1, 0, 2, 4, 6, 9, 8, 10, 13, 12, 14],
+                  [3, 1, 0, 2, 7, 5, 4, 6, 9, 8, 11, 10, 13, 12, 14],
+                  [5, 3, 1, 0, 2, 4, 9, 7, 6, 8, 11, 10, 13, 12, 14]]
+    POST_ORDERS = [[0, 2, 1, 4, 3, 6, 5, 8, 10, 9, 7, 12, 14, 13, 11],
+                   [0, 2, 1, 4, 6, 5, 8, 10, 12, 14, 13, 11, 9, 7, 3],
+                   [0, 2, 1, 4, 3, 6, 8, 7, 10, 12, 14, 13, 11, 9, 5]]
+
+    def check_tree(self, tree):
+        TestBinarySearchTree.check_tree(self, tree)
+        check_red_black_invariant(tree._root)
+        self.assertFalse(tree._root is not None and tree._root._red)
+
+    def test_setup_invariant(self):
+        for tree in self._trees:
+            self.assertTrue(check_bst_invariant(tree._root))
+            check_red_black_invariant(tree._root)
+            self.assertEqual(check_sizes(tree._root), len(tree))
+            self.assertFalse(tree._root is not None and tree._root._red)
+
+    def test_preorder_iter(self):
+        self.assertEqual(list(self._empty.pre_iter()), [])
+        self.assertEqual(list(self._one.pre_iter()), [(0, 0)])
+        for tree, order in zip(self._trees[2:], self.PRE_ORDERS):
+            self.assertEqual(list(tree.pre_iter()), list(double(order)))
+
+    def test_postorder_iter(self):
+        self.assertEqual(list(self._empty.post_iter()), [])
+        self.assertEqual(list(self._one.post_iter()), [(0, 0)])
+        for tree, order in zip(self._trees[2:], self.POST_ORDERS):
+            self.assertEqual(list(tree.post_iter()), list(double(order)))
+
+    def test_static(self):
+        tree = RedBlackTree.from_node(None)
+        self.assertIs(type(tree), RedBlackTree)
+        self.assertEqual(len(tree), 0)
+
+        node = RedBlackNode(2)
+        node._left = RedBlackNode(1)
+        node._right = RedBlackNode(4, red=False)
+        node._right._left = RedBlackNode(3)
+        self.assertRaises(ValueError, lambda: RedBlackTree.from_node(node, check_invariant=True))
+        node._left._red = False
+        tree = RedBlackTree.from_node(node, check_invariant=True)
+        self.assertEqual(len(tree), 4)
+        check_red_black_invariant(tree._root)
+        for i in range(5, 20):
+            tree[i] = i
+        del tree[2]
+        check_red_black_invariant(tree._root)
+        self.assertEqual(check_sizes(tree._root), 18)
+        self.assertEqual([key for key, _ in tree], [1] + list(range(3, 20)))
+
+        self.assertRaises(TypeError, lambda: RedBlackTree.from_node(BinaryNode(1)))
+        self.assertRaises(TypeError, lambda: RedBlackTree.from_node("hello"))
+
+    def test_str(self):
+        self.assertEqual(str(self._empty), "<RedBlackTree(None)>")
+        self.assertEqual(str(self._one), "<RedBlackTree(0, 0, None, None)>")
+        self.assertEqual(str(self._right_tree),
+                         "<RedBlackTree(3, 3, (1, 1, (0, 0, None, None), (2, 2, None, None)), (7, 7, (5, 5, (4, 4, None, None), (6, 6, None, None)), (9, 9, (8, 8, None, None), (11, 11, (10, 10, None, None), (13, 13, (12, 12, None, None), (14, 14, None, None))))))>")
+
+    def test_str_indent(self):
+        two_tree = RedBlackTree()
+        two_tree[2] = "two"
+        two_tree[1] = 1
+        self.assertEqual(two_tree.str(indent=2),
+"""<RedBlackTree
+(
+  2, 
+  two, 
+  (
+    1, 
+    1, 
+    None, 
+    None
+  ), 
+  None
+)>""")
+
+    def test_sorted(self):
+        tree = RedBlackTree()
+        for i in range(10000):
+            tree[i] = i
+        black_height = check_red_black_invariant(tree._root)
+        # Every path has black_height black nodes, and at most as many red ones.
+        self.assertLessEqual(black_height, 14)
+        for i in range(0, 10000, 2):
+            del tree[i]
+        check_red_black_invariant(tree._root)
+        self.assertEqual([key for key, _ in tree], list(range(1, 10000, 2)))
+
+    def test_random(self):
+        random.seed(42)
+        tree = RedBlackTree()
+        reference = {}
+        for i in range(5000):
+            key = random.randrange(500)
+            if key in reference and random.random() < 0.5:
+                del tree[key]
+                del reference[key]
+            else:
+                tree[key] = i
+                reference[key] = i
+            if i % 500 == 0:
+                check_red_black_invariant(tree._root)
+        self.assertEqual(list(tree), sorted(reference.items()))
+        self.assertRaises(KeyError, lambda: tree.__delitem__(-1))
+        for key in list(reference):
+            del tree[key]
+        self.assertTrue(tree.is_empty())
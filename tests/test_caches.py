@@ -0,0 +1,132 @@
+from unittest import TestCase
+
+from data_structures.hash_table_separate_chaining import HashTableSeparateChaining
+from data_structures.lru_cache import LRUCache, LFUCache, memoise
+
+
+class TestLRUCache(TestCase):
+    def test_eviction(self):
+        cache = LRUCache(max_entries=3)
+        for i in range(3):
+            cache[i] = str(i)
+        self.assertEqual(cache.get(0), "0")
+        cache[3] = "3"
+        # 1 was the least recently used, since 0 was just looked up.
+        self.assertNotIn(1, cache)
+        self.assertEqual([key for key, _ in cache.items()], [2, 0, 3])
+        cache[2] = "two"
+        cache[4] = "4"
+        self.assertEqual([key for key, _ in cache.items()], [3, 2, 4])
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.evictions, 2)
+        self.assertEqual(str(cache), "<LRUCache\n(3, 3)\n(2, two)\n(4, 4)\n>")
+
+    def test_none_key(self):
+        cache = LRUCache(max_entries=2)
+        cache[None] = 'a'
+        cache[1] = 'b'
+        self.assertEqual(cache[None], 'a')
+        cache[2] = 'c'
+        self.assertNotIn(1, cache)
+        cache[3] = 'd'
+        self.assertNotIn(None, cache)
+        self.assertEqual([key for key, _ in cache.items()], [2, 3])
+
+    def test_counters(self):
+        cache = LRUCache(max_entries=2)
+        cache["a"] = None
+        self.assertIsNone(cache["a"])
+        self.assertEqual(cache.get("b", -1), -1)
+        self.assertRaises(KeyError, lambda: cache["b"])
+        self.assertIn("a", cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertAlmostEqual(cache.hit_rate(), 1 / 3)
+
+        del cache["a"]
+        self.assertEqual(len(cache), 0)
+        self.assertRaises(KeyError, lambda: cache.__delitem__("a"))
+
+    def test_weight(self):
+        cache = LRUCache(max_weight=10, weigher=lambda key, data: len(data))
+        cache["a"] = "xxxx"
+        cache["b"] = "xxxx"
+        self.assertEqual(cache.weight(), 8)
+        cache["c"] = "xxxxx"
+        self.assertEqual([key for key, _ in cache.items()], ["b", "c"])
+        self.assertEqual(cache.weight(), 9)
+        # Growing an entry evicts others.
+        cache["c"] = "xxxxxxxx"
+        self.assertEqual([key for key, _ in cache.items()], ["c"])
+        # Entries heavier than the maximum weight are not cached.
+        cache["d"] = "x" * 11
+        self.assertNotIn("d", cache)
+        self.assertEqual(cache.weight(), 8)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, lambda: LRUCache())
+        self.assertRaises(ValueError, lambda: LRUCache(max_entries=0))
+        self.assertRaises(ValueError, lambda: LFUCache(max_weight=-1))
+
+
+class TestLFUCache(TestCase):
+    def test_eviction(self):
+        cache = LFUCache(max_entries=3, table_type=HashTableSeparateChaining)
+        for i in range(3):
+            cache[i] = i
+        for _ in range(3):
+            cache.get(0)
+        cache.get(1)
+        cache[3] = 3
+        # 2 was used the least.
+        self.assertEqual([key for key, _ in cache.items()], [3, 1, 0])
+        cache.get(3)
+        cache[4] = 4
+        # 3 and 1 were both used twice, but 1 less recently.
+        self.assertEqual([key for key, _ in cache.items()], [4, 3, 0])
+        self.assertEqual(cache.evictions, 2)
+
+    def test_many(self):
+        cache = LFUCache(max_entries=50)
+        for i in range(1000):
+            cache[i % 100] = i
+            for _ in range(i % 7):
+                cache.get(i % 100)
+        self.assertEqual(len(cache), 50)
+        self.assertEqual(len(cache.items()), 50)
+        for key, data in cache.items():
+            self.assertEqual(data % 100, key)
+
+
+class TestMemoise(TestCase):
+    def test_memoise(self):
+        calls = []
+
+        @memoise(max_entries=100)
+        def fibonacci(n):
+            calls.append(n)
+            return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)
+
+        self.assertEqual(fibonacci(80), 23416728348467685)
+        self.assertEqual(sorted(calls), list(range(81)))
+        self.assertEqual(fibonacci.cache.misses, 81)
+        self.assertEqual(fibonacci.__name__, "fibonacci")
+
+        @memoise(max_entries=None, max_weight=100, cache_type=LFUCache, weigher=lambda key, data: len(data))
+        def repeat(text, times=1):
+            return text * times
+
+        self.assertEqual(repeat("ab", times=3), "ababab")
+        self.assertEqual(repeat("ab", times=3), "ababab")
+        self.assertEqual(repeat("ab", 3), "ababab")
+        self.assertEqual((repeat.cache.hits, repeat.cache.misses), (1, 2))
+
+    def test_memoise_keyword_arguments(self):
+        @memoise(8)
+        def arguments(*args, **kwargs):
+            return args, kwargs
+
+        self.assertEqual(arguments(1, a=2), ((1,), {'a': 2}))
+        self.assertEqual(arguments((1,), (('a', 2),)), (((1,), (('a', 2),)), {}))
+        self.assertEqual(arguments(1, ('a', 2)), ((1, ('a', 2)), {}))
+        self.assertEqual(arguments(1, a=2), ((1,), {'a': 2}))
+        self.assertEqual((arguments.cache.hits, arguments.cache.misses), (1, 3))
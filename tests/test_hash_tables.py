@@ -1,9 +1,29 @@
+import io
+import math
+import os
+import pickle
+import random
+import sys
+import tempfile
+import threading
+from decimal import Decimal
+from fractions import Fraction
 from unittest import TestCase
 
+from algorithms.primes import is_prime
+
+from data_structures.abstract_hash_table import HASH_PRIME
 from data_structures.hash_table_linear_probing import LinearProbeTable
 from data_structures.hash_table_quadratic_probing import QuadraticProbeTable
 from data_structures.hash_table_double_hashing import DoubleHashingTable
 from data_structures.hash_table_separate_chaining import HashTableSeparateChaining
+from data_structures.hash_table_swiss import SwissTable
+from data_structures.hash_table_incremental_rehashing import IncrementalRehashTable
+from data_structures.hash_table_concurrent import ConcurrentHashTable
+from data_structures.hash_table_expiring import ExpiringHashTable
+from data_structures.hash_table_mapped import MappedHashTable
+from data_structures.node_double import DoubleNode
+from data_structures.timing_wheel import TimingWheel
 from data_structures.binary_search_tree import BinarySearchTree
 
 class TestLinearProbeTable(TestCase):
@@ -22,6 +42,518 @@ class TestHashTableSeparateChaining(TestCase):
     def setUp(self):
         self._table = HashTableSeparateChaining()
 
+    def test_chains(self):
+        # A tiny table which never grows, so that chains get long.
+        table = HashTableSeparateChaining(2, max_load_factor=1000)
+        expected = {}
+        for i in range(100):
+            table[str(i)] = i
+            expected[str(i)] = i
+        for i in range(0, 100, 3):
+            table[str(i)] = -i
+            expected[str(i)] = -i
+        self.assertEqual(table.table_size, 2)
+        self.assertEqual(len(table), 100)
+        for i in range(0, 100, 2):
+            del table[str(i)]
+            del expected[str(i)]
+            self.assertRaises(KeyError, lambda: table[str(i)])
+        self.assertEqual(len(table), len(expected))
+        for key, value in expected.items():
+            self.assertEqual(table[key], value)
+
+        # Emptying the chains goes through the single item representation.
+        for key in expected:
+            del table[key]
+        self.assertTrue(table.is_empty())
+        self.assertEqual(table.items().to_list(), [])
+
+    def test_resize(self):
+        for i in range(1000):
+            self._table[str(i)] = i
+        self.assertLessEqual(self._table.load_factor(), HashTableSeparateChaining.MAX_LOAD_FACTOR)
+        self.assertGreater(self._table.table_size, HashTableSeparateChaining.DEFAULT_TABLE_SIZE)
+        self.assertEqual(sorted(self._table), list(range(1000)))
+
+class TestSwissTable(TestCase):
+    def setUp(self):
+        self._table = SwissTable()
+
+    def test_tombstones(self):
+        for i in range(10):
+            self._table[str(i)] = i
+        for i in range(0, 10, 2):
+            del self._table[str(i)]
+        self.assertEqual(len(self._table), 5)
+        self.assertEqual(self._table._tombstones, 5)
+        for i in range(10):
+            self.assertEqual(str(i) in self._table, i % 2 == 1)
+
+        # Reinserting a deleted key reuses a tombstone in its probe sequence.
+        self._table["0"] = 0
+        self.assertEqual(self._table["0"], 0)
+        self.assertEqual(len(self._table), 6)
+        self.assertLessEqual(self._table._tombstones, 4)
+
+    def test_many(self):
+        expected = {}
+        for i in range(2000):
+            self._table[f"key{i}"] = i
+            expected[f"key{i}"] = i
+            if i % 3 == 0:
+                del self._table[f"key{i // 2}"]
+                del expected[f"key{i // 2}"]
+        self.assertEqual(len(self._table), len(expected))
+        for key, value in expected.items():
+            self.assertEqual(self._table[key], value)
+        self.assertEqual(sorted(self._table.keys().to_list()), sorted(expected))
+        # Every control byte is a fingerprint exactly where there is an item.
+        for position in range(self._table.table_size):
+            is_item = self._table._control[position] < SwissTable.EMPTY
+            self.assertEqual(is_item, self._table._array[position] is not None)
+
+class TestIncrementalRehashTable(TestCase):
+    def setUp(self):
+        self._table = IncrementalRehashTable()
+
+    def test_migration(self):
+        for i in range(200):
+            self._table[str(i)] = i
+        # Keep inserting until a migration starts.
+        i = 200
+        while not self._table.is_migrating():
+            self._table[str(i)] = i
+            i += 1
+        old_size = len(self._table._old_array)
+        self.assertGreater(self._table.table_size, old_size)
+
+        # Lookups, updates and deletions work across both arrays.
+        for j in range(i):
+            self.assertEqual(self._table[str(j)], j)
+        self._table["0"] = "zero"
+        self.assertEqual(self._table["0"], "zero")
+        del self._table["1"]
+        self.assertNotIn("1", self._table)
+        self.assertEqual(len(self._table), i - 1)
+
+        # The migration completes within a bounded number of operations.
+        for _ in range(old_size // IncrementalRehashTable.MIGRATION_STEP + 1):
+            _ = "0" in self._table
+        self.assertFalse(self._table.is_migrating())
+        self.assertEqual(len(self._table.items()), i - 1)
+        self.assertEqual(self._table["0"], "zero")
+
+    def test_many(self):
+        expected = {}
+        for i in range(5000):
+            self._table[f"key{i}"] = i
+            expected[f"key{i}"] = i
+            if i % 3 == 0:
+                del self._table[f"key{i // 2}"]
+                del expected[f"key{i // 2}"]
+        self.assertEqual(len(self._table), len(expected))
+        for key, value in expected.items():
+            self.assertEqual(self._table[key], value)
+
+class TestConcurrentHashTable(TestCase):
+    WRITERS = 4
+    READERS = 4
+    KEYS = 2000
+
+    def setUp(self):
+        # Switch threads as often as possible, so that operations interleave.
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def run_threads(self, targets):
+        threads = [threading.Thread(target=target) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_stress(self):
+        # Few segments, which start small, so that reads often race with a resize.
+        table = ConcurrentHashTable(segments=2)
+        done = threading.Event()
+        errors = []
+
+        def write(writer):
+            for i in range(self.KEYS):
+                table[(writer, i)] = 2 * i
+            for i in range(0, self.KEYS, 2):
+                del table[(writer, i)]
+
+        def read():
+            i = 0
+            while not done.is_set():
+                key = (i % self.WRITERS, i % self.KEYS)
+                data = table.get(key)
+                if data is not None and data != 2 * key[1]:
+                    errors.append((key, data))
+                i += 7
+
+        readers = [threading.Thread(target=read) for _ in range(self.READERS)]
+        for reader in readers:
+            reader.start()
+        self.run_threads([lambda writer=writer: write(writer) for writer in range(self.WRITERS)])
+        done.set()
+        for reader in readers:
+            reader.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(table), self.WRITERS * self.KEYS // 2)
+        for writer in range(self.WRITERS):
+            for i in range(self.KEYS):
+                self.assertEqual(table.get((writer, i)), None if i % 2 == 0 else 2 * i)
+        self.assertEqual(len(table.items()), len(table))
+
+    def test_atomic_updates(self):
+        table = ConcurrentHashTable(segments=2)
+        table.update((i, i) for i in range(self.KEYS))
+        winners = []
+        popped = []
+
+        def race(thread):
+            winners.append(table.setdefault("shared", thread))
+            for i in range(self.KEYS):
+                if table.pop(i, None) is not None:
+                    popped.append(i)
+
+        self.run_threads([lambda thread=thread: race(thread) for thread in range(self.WRITERS)])
+        # Every thread saw the same value, and every key was popped exactly once.
+        self.assertEqual(len(set(winners)), 1)
+        self.assertEqual(sorted(popped), list(range(self.KEYS)))
+        self.assertEqual(len(table), 1)
+
+    def test_segments(self):
+        table = ConcurrentHashTable(segments=8, table_type=HashTableSeparateChaining, table_size=5)
+        self.assertEqual(table.segment_count(), 8)
+        self.assertRaises(ValueError, lambda: ConcurrentHashTable(segments=0))
+        table.enable_stats()
+        table.update((str(i), i) for i in range(400))
+        # Iterating while modifying the table does not raise.
+        for key in table.iter_keys():
+            table[key + "!"] = 0
+        stats = table.stats()
+        self.assertEqual(stats['segments'], 8)
+        self.assertEqual(sum(segment['size'] for segment in stats['segment_stats']), len(table))
+        self.assertGreater(stats['segment_stats'][0]['probes'], 0)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTimingWheel(TestCase):
+    def check_wheel(self, wheel, ticks):
+        nodes = [DoubleNode(i) for i in range(len(ticks))]
+        for node, tick in zip(nodes, ticks):
+            wheel.schedule(node, tick)
+        # Cancelled timers never fire.
+        for node in nodes[::10]:
+            wheel.cancel(node)
+        self.assertEqual(len(wheel), len(ticks) - len(nodes[::10]))
+
+        fired = []
+        target = 0
+        while len(wheel) > 0:
+            target += random.randint(1, 500)
+            for node in wheel.advance(target):
+                # Every timer fires at the first tick after (or at) its own.
+                self.assertTrue(target - 500 < ticks[node._item] <= wheel.current() <= target)
+                self.assertEqual(wheel.current(), -(-ticks[node._item] // 1))
+                fired.append(node._item)
+        expected = [i for i in range(len(ticks)) if i % 10 != 0]
+        self.assertEqual(sorted(fired), expected)
+
+    def test_wheel(self):
+        random.seed(1008)
+        ticks = [random.choice([random.randint(1, 100), random.randint(1, 300_000)]) + random.random()
+                 for _ in range(2000)]
+        self.check_wheel(TimingWheel(), ticks)
+
+    def test_overflow(self):
+        class SmallWheel(TimingWheel):
+            # Covers 4 ** 2 = 16 ticks.
+            SLOTS = 4
+            LEVELS = 2
+
+        random.seed(1008)
+        self.check_wheel(SmallWheel(), [random.randint(1, 5000) for _ in range(500)])
+
+
+class TestExpiringHashTable(TestCase):
+    def test_expiry(self):
+        clock = FakeClock()
+        table = ExpiringHashTable(default_ttl=10, clock=clock)
+        table["a"] = 1
+        table.set("b", 2, ttl=0.5)
+        table.set("forever", 3)
+        table.set("forever", 3, ttl=math.inf)
+        table.set("none", None, ttl=math.inf)
+        self.assertEqual(len(table), 4)
+        self.assertAlmostEqual(table.ttl("a"), 10)
+        self.assertIsNone(table.ttl("forever"))
+        self.assertRaises(ValueError, lambda: table.set("c", 3, ttl=0))
+
+        clock.now += 0.5
+        # Expired lazily on access, before the wheel reaches its tick.
+        self.assertNotIn("b", table)
+        self.assertEqual(table.expirations, 1)
+
+        clock.now += 5
+        table["a"] = 4
+        clock.now += 9
+        self.assertEqual(table["a"], 4)
+        self.assertEqual(sorted(table.keys().to_list()), ["a", "forever", "none"])
+        clock.now += 2
+        # Removed by the wheel, without being accessed.
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table["forever"], 3)
+        self.assertEqual(table.expirations, 2)
+        self.assertGreater(table.bytes_reclaimed, 0)
+        self.assertRaises(KeyError, lambda: table["a"])
+
+        del table["forever"]
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.stats()['scheduled'], 0)
+
+    def test_none_key(self):
+        clock = FakeClock()
+        table = ExpiringHashTable(clock=clock)
+        table.set(None, 'x', ttl=2)
+        table.set(1, 'y', ttl=5)
+        self.assertEqual(table[None], 'x')
+        clock.now += 3
+        table.expire()
+        self.assertNotIn(None, table)
+        self.assertEqual((len(table), table[1]), (1, 'y'))
+
+    def test_many(self):
+        clock = FakeClock()
+        table = ExpiringHashTable(clock=clock, resolution=0.1)
+        for i in range(1000):
+            table.set(i, str(i), ttl=1.005 + i % 100)
+            clock.now += 0.01
+        table.expire()
+        self.assertEqual(table.stats()['scheduled'], len(table))
+        for i in range(1000):
+            self.assertEqual(table.get(i), str(i) if 1.005 + i % 100 > (1000 - i) * 0.01 else None)
+        clock.now += 200
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.expirations, 1000)
+
+
+class TestHashFlooding(TestCase):
+    """ Crafts keys which all collide under the polynomial hash, and checks that seeded tables are not affected. """
+    COUNT = 150
+
+    def colliding_keys(self, table) -> list[str]:
+        """ Brute forces COUNT keys which all hash to the same position as "0" in the given table. """
+        target = table.hash("0")
+        keys = []
+        i = 0
+        while len(keys) < self.COUNT:
+            key = str(i)
+            if table.hash(key) == target:
+                keys.append(key)
+            i += 1
+        return keys
+
+    def load(self, table_type, keys, seeded):
+        table = table_type.with_capacity(self.COUNT, seeded=seeded)
+        table.enable_stats()
+        for key in keys:
+            table[key] = None
+        for key in keys:
+            self.assertIn(key, table)
+        return table
+
+    def test_seeded(self):
+        for table_type in (LinearProbeTable, QuadraticProbeTable, IncrementalRehashTable, HashTableSeparateChaining):
+            keys = self.colliding_keys(table_type.with_capacity(self.COUNT))
+
+            flooded = self.load(table_type, keys, False)
+            seeded = self.load(table_type, keys, True)
+            self.assertEqual(flooded.table_size, seeded.table_size)
+            self.assertEqual(flooded.stats()['rehashes'], 0)
+
+            # Every key collides, so the probes grow with the number of keys...
+            self.assertGreater(flooded.stats()['average_probe_length'], self.COUNT / 8)
+            self.assertGreaterEqual(flooded.stats()['max_probe_length'], self.COUNT - 1)
+            # ... but stay flat for the seeded table.
+            self.assertLess(seeded.stats()['average_probe_length'], 2)
+            self.assertLess(seeded.stats()['max_probe_length'], self.COUNT / 4)
+
+    def test_seeded_numeric_keys(self):
+        # These keys have the same builtin hash, as it is reduced modulo HASH_PRIME, so they all
+        # collide whatever the parameters of the universal hash are.
+        for keys in ([5 + i * HASH_PRIME for i in range(self.COUNT)],
+                     [(5 + i * HASH_PRIME, 0) for i in range(self.COUNT)]):
+            for table_type in (LinearProbeTable, QuadraticProbeTable, DoubleHashingTable, SwissTable,
+                               IncrementalRehashTable, HashTableSeparateChaining):
+                flooded = self.load(table_type, keys, False)
+                seeded = self.load(table_type, keys, True)
+                self.assertGreater(flooded.stats()['average_probe_length'], self.COUNT / 8)
+                # Swiss tables fill up to a higher load factor, so their probes are a bit longer.
+                self.assertLess(seeded.stats()['average_probe_length'], 4)
+
+    def test_seeded_tables(self):
+        for table_type in (LinearProbeTable, QuadraticProbeTable, DoubleHashingTable, SwissTable,
+                           IncrementalRehashTable, HashTableSeparateChaining):
+            table = table_type(seeded=True)
+            for i in range(300):
+                table[str(i)] = i
+            for i in range(0, 300, 2):
+                del table[str(i)]
+            self.assertEqual(len(table), 150)
+            for i in range(300):
+                self.assertEqual(table.get(str(i)), i if i % 2 else None)
+
+
+class TestPersistence(TestCase):
+    TABLE_TYPES = (LinearProbeTable, QuadraticProbeTable, DoubleHashingTable, SwissTable,
+                   IncrementalRehashTable, HashTableSeparateChaining)
+
+    def build(self, table_type, keys, **kwargs):
+        table = table_type(**kwargs)
+        for i, key in enumerate(keys):
+            table[key] = i
+        # Leaves tombstones (or reinserted clusters) behind.
+        for key in keys[::3]:
+            del table[key]
+        return table
+
+    def reload(self, table, mapped=False):
+        fileobj = io.BytesIO()
+        table.dump(fileobj)
+        fileobj.seek(0)
+        return type(table).load(fileobj, mapped)
+
+    def test_layout(self):
+        for table_type in self.TABLE_TYPES:
+            table = self.build(table_type, list(range(0, 3000, 7)), max_load_factor=0.75)
+            loaded = self.reload(table)
+            self.assertEqual(sorted(loaded.items()), sorted(table.items()))
+            self.assertEqual(loaded.MAX_LOAD_FACTOR, 0.75)
+            if table_type is not HashTableSeparateChaining:
+                # Every item is back in its position, with the same hash parameters.
+                self.assertEqual(loaded.table_size, table.table_size)
+                self.assertEqual(list(loaded._array), list(table._array))
+                self.assertEqual(loaded.hash(12345), table.hash(12345))
+                self.assertEqual(loaded.stats(), table.stats())
+            # The loaded table is fully usable.
+            for key in range(0, 3000, 7):
+                loaded[key] = -key
+            for key in range(0, 3000, 7):
+                self.assertEqual(loaded[key], -key)
+
+    def test_not_portable(self):
+        # Swiss tables hash strings with the builtin hash, and double hashing takes their step from it.
+        for table in (self.build(SwissTable, [str(i) for i in range(500)]),
+                      self.build(DoubleHashingTable, [str(i) for i in range(500)]),
+                      self.build(HashTableSeparateChaining, [(i, str(i)) for i in range(500)])):
+            loaded = self.reload(table)
+            self.assertEqual(sorted(loaded.items()), sorted(table.items()))
+            self.assertRaises(ValueError, lambda: self.reload(table, mapped=True))
+
+    def test_concurrent(self):
+        table = ConcurrentHashTable(segments=3, table_type=HashTableSeparateChaining)
+        for key in range(300):
+            table[key] = str(key)
+        loaded = self.reload(table)
+        self.assertEqual(loaded.segment_count(), 3)
+        self.assertIs(type(loaded._segments[0]), HashTableSeparateChaining)
+        self.assertEqual(sorted(loaded.items()), sorted(table.items()))
+
+    def test_mapped(self):
+        for table_type in self.TABLE_TYPES[:-1]:
+            keys = list(range(500))
+            if table_type is not DoubleHashingTable:
+                # Unless seeded, double hashing takes the step of bytes keys from the builtin hash.
+                keys += [f"key-{i}".encode() for i in range(100)]
+            table = self.build(table_type, keys)
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "table.bin")
+                with open(path, "wb") as fileobj:
+                    table.dump(fileobj)
+                with open(path, "rb") as fileobj:
+                    mapped = type(table).load(fileobj, mapped=True)
+                self.assertIsInstance(mapped, MappedHashTable)
+                self.assertEqual(len(mapped), len(table))
+                self.assertEqual(list(mapped.iter_items()), list(table.iter_items()))
+                for key, data in table.items():
+                    self.assertEqual(mapped[key], data)
+                self.assertNotIn(0, mapped)
+                self.assertIsNone(mapped.get(-1))
+                self.assertRaises(TypeError, lambda: mapped.__setitem__(1, 1))
+                self.assertRaises(TypeError, lambda: mapped.__delitem__(1))
+                mapped.close()
+
+    def test_mapped_seeded(self):
+        # Seeded tables hash strings with a hash keyed by their parameters, so they can be mapped.
+        for table_type in self.TABLE_TYPES[:-1]:
+            table = self.build(table_type, [str(i) for i in range(500)], seeded=True)
+            loaded = self.reload(table)
+            self.assertEqual(list(loaded._array), list(table._array))
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "table.bin")
+                with open(path, "wb") as fileobj:
+                    table.dump(fileobj)
+                with open(path, "rb") as fileobj:
+                    mapped = table_type.load(fileobj, mapped=True)
+                for key, data in table.items():
+                    self.assertEqual(mapped[key], data)
+                self.assertNotIn("0", mapped)
+                mapped.close()
+
+    def test_invalid(self):
+        fileobj = io.BytesIO()
+        LinearProbeTable().dump(fileobj)
+        fileobj.seek(0)
+        self.assertRaises(ValueError, lambda: SwissTable.load(fileobj))
+        self.assertRaises(ValueError, lambda: LinearProbeTable.load(io.BytesIO(b"not a table")))
+
+    def test_untrusted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            victim = os.path.join(directory, "victim")
+            open(victim, "w").close()
+
+            class Malicious:
+                def __reduce__(self):
+                    return os.remove, (victim,)
+
+            # Whether the item is reinserted, put back in its position, or read from the mapped file.
+            for table, mapped in ((HashTableSeparateChaining(), False), (LinearProbeTable(), False),
+                                  (LinearProbeTable(), True)):
+                table[1] = Malicious()
+                path = os.path.join(directory, "table.bin")
+                with open(path, "wb") as fileobj:
+                    table.dump(fileobj)
+                with open(path, "rb") as fileobj:
+                    loaded = type(table).load(fileobj, mapped=mapped) if mapped else None
+                    self.assertRaises(pickle.UnpicklingError,
+                                      lambda: loaded[1] if mapped else type(table).load(fileobj))
+                if mapped:
+                    loaded.close()
+                self.assertTrue(os.path.exists(victim))
+
+            # The header is checked too.
+            fileobj = io.BytesIO()
+            LinearProbeTable._write_header(fileobj, {'type': 'LinearProbeTable', 'layout': Malicious()})
+            fileobj.seek(0)
+            self.assertRaises(pickle.UnpicklingError, lambda: LinearProbeTable.load(fileobj))
+            self.assertTrue(os.path.exists(victim))
+
+
 class TestHashTables(TestCase):
     def setUp(self):
         self.dictionaries = [
@@ -29,6 +561,7 @@ class TestHashTables(TestCase):
             DoubleHashingTable(),
             QuadraticProbeTable(),
             HashTableSeparateChaining(),
+            IncrementalRehashTable(),
         ]
     
     def test_resize(self):
@@ -36,15 +569,312 @@ class TestHashTables(TestCase):
             LinearProbeTable([2,10]),
             DoubleHashingTable([2,10]),
             QuadraticProbeTable([2,10]),
+            SwissTable([2,10]),
+            IncrementalRehashTable([2,10]),
             # HashTableSeparateChaining([2,10])
         ]
         for table in restricted_tables:
             for i in range(5):
                 table[str(i)] = i
-            table["5"] = 5 #This will call resize, but fail as reached max size
-            table["6"] = 5 #This again will call resize as it is still above load factor, this should work as well
+            table["5"] = 5 #This will call resize, growing past the last preset size
+            table["6"] = 5 #This again will call resize if it is still above load factor, this should work as well
             for _ in range(30):
                 table["6"] = 6
+            self.assertLessEqual(len(table), table.table_size * table.MAX_LOAD_FACTOR)
+            for i in range(7):
+                self.assertIn(str(i), table)
+
+    def test_unbounded_growth(self):
+        table = LinearProbeTable([5, 11])
+        for i in range(1000):
+            table[str(i)] = i
+        self.assertEqual(len(table), 1000)
+        self.assertLessEqual(len(table), table.table_size / 2)
+        self.assertTrue(is_prime(table.table_size))
+        for i in range(1000):
+            self.assertEqual(table[str(i)], i)
+        # The preset list of the class is left untouched.
+        self.assertEqual(LinearProbeTable.TABLE_SIZES[-1], 1572869)
+
+    def test_generic_keys(self):
+        keys = (list(range(-50, 200)) + [10 ** 30, -(10 ** 30)]
+                + [(i, str(i)) for i in range(50)]
+                + [bytes([i, 255 - i]) * (i % 4) for i in range(50)]
+                + [frozenset([i, i + 1]) for i in range(50)] + [3.5, None, "str"])
+        tables = [
+            LinearProbeTable(),
+            QuadraticProbeTable(),
+            DoubleHashingTable(),
+            SwissTable(),
+            IncrementalRehashTable(),
+            HashTableSeparateChaining(),
+        ]
+        for table in tables:
+            for i, key in enumerate(keys):
+                table[key] = i
+            # Keys which are equal (e.g. b"" repeated) are only stored once.
+            expected = {key: i for i, key in enumerate(keys)}
+            self.assertEqual(len(table), len(expected))
+            for key, value in expected.items():
+                self.assertEqual(table[key], value)
+                self.assertTrue(0 <= table.hash(key) < table.table_size)
+            self.assertNotIn(200, table)
+            self.assertNotIn(b"missing", table)
+            self.assertNotIn((0, 0), table)
+            for key in expected:
+                del table[key]
+            self.assertTrue(table.is_empty())
+
+    def test_equal_keys(self):
+        # Keys which are equal but of different types should be found as the same key.
+        equal_keys = [(-1, -1.0, -1 + 0j, Fraction(-1), Decimal(-1)),
+                      (1, True, 1.0, Decimal('1.0')),
+                      (0, False, -0.0),
+                      (0.5, Fraction(1, 2), Decimal('0.5')),
+                      (2 ** 70, float(2 ** 70), Fraction(2 ** 70)),
+                      ((1, 2), (1.0, True + 1))]
+        for seeded in (False, True):
+            for table in (LinearProbeTable(seeded=seeded), QuadraticProbeTable(seeded=seeded),
+                          DoubleHashingTable(seeded=seeded), SwissTable(seeded=seeded),
+                          IncrementalRehashTable(seeded=seeded), HashTableSeparateChaining(seeded=seeded),
+                          ConcurrentHashTable(), ExpiringHashTable()):
+                for i, keys in enumerate(equal_keys):
+                    table[keys[0]] = i
+                for i, keys in enumerate(equal_keys):
+                    for key in keys:
+                        self.assertIn(key, table)
+                        self.assertEqual((table[key], table.get(key)), (i, i))
+                    table[keys[-1]] = -i
+                    self.assertEqual(table[keys[0]], -i)
+                self.assertEqual(len(table), len(equal_keys))
+
+    def test_bulk(self):
+        tables = [
+            LinearProbeTable(),
+            QuadraticProbeTable(),
+            DoubleHashingTable(),
+            SwissTable(),
+            IncrementalRehashTable(),
+            HashTableSeparateChaining(),
+        ]
+        for table in tables:
+            table["existing"] = -1
+            # A generator, which cannot be sized without consuming it.
+            table.update((str(i), i) for i in range(1000))
+            table.update([("existing", -2), ("0", 0)])
+            self.assertEqual(len(table), 1001)
+            self.assertLessEqual(table.load_factor(), table.MAX_LOAD_FACTOR)
+
+            values = table.get_many(str(i) for i in range(0, 1000, 10))
+            self.assertEqual(values.to_list(), list(range(0, 1000, 10)))
+            self.assertEqual(table.get_many(["existing"]).to_list(), [-2])
+            self.assertRaises(KeyError, lambda: table.get_many(["0", "missing"]))
+
+            # Few keys, then many keys (including duplicates and missing ones).
+            self.assertEqual(table.delete_many(["existing", "missing"]), 1)
+            self.assertEqual(table.delete_many([str(i) for i in range(500)] + ["0", "missing"]), 500)
+            self.assertEqual(len(table), 500)
+            for i in range(1000):
+                self.assertEqual(str(i) in table, i >= 500)
+
+    def test_update_mapping(self):
+        for table_type in (LinearProbeTable, QuadraticProbeTable, DoubleHashingTable, SwissTable,
+                           IncrementalRehashTable, HashTableSeparateChaining, ConcurrentHashTable):
+            table = table_type()
+            # A dict sets its pairs, as in dict.update, rather than unpacking its keys.
+            table.update({'ab': 1, 'cd': 2})
+            self.assertEqual(sorted(table.items().to_list()), [('ab', 1), ('cd', 2)])
+            self.assertNotIn('a', table)
+            other = LinearProbeTable()
+            other.update([('cd', 3), ('ef', 4)])
+            table.update(other)
+            self.assertEqual(sorted(table.items().to_list()), [('ab', 1), ('cd', 3), ('ef', 4)])
+
+    def test_iteration_views(self):
+        tables = [
+            LinearProbeTable(),
+            QuadraticProbeTable(),
+            DoubleHashingTable(),
+            SwissTable(),
+            IncrementalRehashTable(),
+            HashTableSeparateChaining(),
+        ]
+        for table in tables:
+            table.update((str(i), i) for i in range(300))
+            self.assertEqual(sorted(table.iter_items()), sorted(table.items().to_list()))
+            self.assertEqual(sorted(table.iter_keys(), key=int), [str(i) for i in range(300)])
+            self.assertEqual(sorted(table.iter_values()), list(range(300)))
+
+            # Updating existing keys (and looking them up) is allowed during iteration.
+            for key in table.iter_keys():
+                table[key] = table[key] + 1
+            self.assertEqual(sorted(table.values().to_list()), list(range(1, 301)))
+
+            with self.assertRaises(RuntimeError):
+                for key in table.iter_keys():
+                    table["new"] = 0
+            with self.assertRaises(RuntimeError):
+                for key in table.iter_keys():
+                    del table[key]
+            # Modifying the table after the last item is still detected.
+            with self.assertRaises(RuntimeError):
+                for i, key in enumerate(table.iter_keys()):
+                    if i == len(table) - 1:
+                        table[f"new-{key}"] = 0
+
+    def test_get_setdefault_pop(self):
+        tables = [
+            LinearProbeTable(),
+            QuadraticProbeTable(),
+            DoubleHashingTable(),
+            SwissTable(),
+            IncrementalRehashTable(),
+            HashTableSeparateChaining(),
+        ]
+        for table in tables:
+            for i in range(100):
+                self.assertEqual(table.setdefault(str(i), i), i)
+            self.assertEqual(table.setdefault("0", -1), 0)
+            self.assertEqual(len(table), 100)
+
+            self.assertEqual(table.get("5"), 5)
+            self.assertIsNone(table.get("missing"))
+            self.assertEqual(table.get("missing", -1), -1)
+            # A stored None is told apart from a missing key.
+            table["none"] = None
+            self.assertIn("none", table)
+            self.assertNotIn("missing", table)
+
+            self.assertEqual(table.pop("5"), 5)
+            self.assertEqual(table.pop("5", -1), -1)
+            self.assertRaises(KeyError, lambda: table.pop("5"))
+            self.assertIsNone(table.pop("none"))
+            self.assertEqual(len(table), 99)
+            for i in range(100):
+                self.assertEqual(table.get(str(i)), None if i == 5 else i)
+
+    def test_stats(self):
+        tables = [
+            LinearProbeTable(),
+            QuadraticProbeTable(),
+            DoubleHashingTable(),
+            SwissTable(),
+            IncrementalRehashTable(),
+            HashTableSeparateChaining(),
+        ]
+        for table in tables:
+            table["before"] = 0
+            stats = table.stats()
+            self.assertEqual(stats['size'], 1)
+            self.assertEqual(stats['load_factor'], 1 / table.table_size)
+            self.assertNotIn('probes', stats)
+
+            table.enable_stats()
+            for i in range(200):
+                table[str(i)] = i
+            for i in range(200):
+                _ = table.get(str(i))
+                _ = table.get(f"missing-{i}")
+            del table["before"]
+
+            stats = table.stats()
+            self.assertEqual(stats['size'], 200)
+            self.assertGreaterEqual(stats['probes'], 600)
+            self.assertEqual(sum(stats['probe_histogram'].to_list()), stats['probes'])
+            self.assertGreaterEqual(stats['max_probe_length'], stats['average_probe_length'])
+            self.assertGreater(stats['rehashes'], 0)
+            self.assertGreaterEqual(stats['rehash_time'], 0)
+            if isinstance(table, HashTableSeparateChaining):
+                histogram = stats['chain_length_histogram'].to_list()
+                self.assertEqual(len(histogram), stats['max_chain'] + 1)
+                self.assertEqual(sum(histogram), table.table_size)
+                self.assertEqual(sum(i * count for i, count in enumerate(histogram)), 200)
+            else:
+                self.assertGreaterEqual(stats['max_cluster'], 1)
+                self.assertGreaterEqual(stats['tombstones'], 1 if isinstance(table, SwissTable) else 0)
+
+            table.disable_stats()
+            self.assertNotIn('probes', table.stats())
+
+    def test_stats_rebuilds(self):
+        tables = [
+            LinearProbeTable(),
+            QuadraticProbeTable(),
+            DoubleHashingTable(),
+            SwissTable(),
+            IncrementalRehashTable(),
+            HashTableSeparateChaining(),
+        ]
+        for table in tables:
+            table.enable_stats()
+            for i in range(200):
+                table[str(i)] = i
+            stats = table.stats()
+            self.assertGreater(stats['rehashes'], 0)
+            # Only the user inserts are recorded, not the reinserts when the table grows. During
+            # a migration, an insert also probes the old array of an IncrementalRehashTable.
+            if isinstance(table, IncrementalRehashTable):
+                self.assertLessEqual(stats['probes'], 400)
+            else:
+                self.assertEqual(stats['probes'], 200)
+
+            # The returned histogram is a copy.
+            histogram = stats['probe_histogram'].to_list()
+            table["more"] = 0
+            self.assertEqual(stats['probe_histogram'].to_list(), histogram)
+            self.assertGreater(sum(table.stats()['probe_histogram'].to_list()), stats['probes'])
+
+    def test_load_factors(self):
+        tables = [
+            LinearProbeTable(max_load_factor=0.25, min_load_factor=0.1),
+            QuadraticProbeTable(max_load_factor=0.25, min_load_factor=0.1),
+            DoubleHashingTable(max_load_factor=0.25, min_load_factor=0.1),
+            SwissTable(max_load_factor=0.25, min_load_factor=0.1),
+            IncrementalRehashTable(max_load_factor=0.25, min_load_factor=0.1),
+            HashTableSeparateChaining(max_load_factor=3, min_load_factor=0.5),
+        ]
+        for table in tables:
+            for i in range(400):
+                table[str(i)] = i
+                self.assertLessEqual(table.load_factor(), table.MAX_LOAD_FACTOR)
+            full_size = table.table_size
+
+            for i in range(390):
+                del table[str(i)]
+            self.assertLess(table.table_size, full_size)
+            self.assertLessEqual(table.load_factor(), table.MAX_LOAD_FACTOR)
+            for i in range(390, 400):
+                self.assertEqual(table[str(i)], i)
+
+    def test_load_factors_invalid(self):
+        for min_load, max_load in [(0.5, 0.5), (-0.1, 0.5), (0.1, 1), (0.3, 0.2)]:
+            self.assertRaises(ValueError, lambda: LinearProbeTable(max_load_factor=max_load, min_load_factor=min_load))
+        self.assertRaises(ValueError, lambda: HashTableSeparateChaining(max_load_factor=1, min_load_factor=1))
+        self.assertRaises(ValueError, lambda: HashTableSeparateChaining(max_load_factor=0))
+        # Chains can be longer than 1 on average.
+        HashTableSeparateChaining(max_load_factor=4)
+
+    def test_reserve(self):
+        tables = [
+            LinearProbeTable.with_capacity(1000),
+            QuadraticProbeTable.with_capacity(1000),
+            DoubleHashingTable.with_capacity(1000),
+            SwissTable.with_capacity(1000),
+            IncrementalRehashTable.with_capacity(1000),
+            HashTableSeparateChaining.with_capacity(1000),
+        ]
+        for table in tables:
+            size = table.table_size
+            self.assertGreaterEqual(size * table.MAX_LOAD_FACTOR, 1000)
+            for i in range(1000):
+                table[str(i)] = i
+            self.assertEqual(table.table_size, size)
+
+            # Reserving on a non-empty table keeps its items.
+            table.reserve(5000)
+            self.assertGreater(table.table_size, size)
+            for i in range(1000):
+                self.assertEqual(table[str(i)], i)
     
     def test_str(self):
         for dictionary in self.dictionaries:
@@ -66,6 +896,10 @@ class TestDictionaries(TestCase):
             QuadraticProbeTable(),
             DoubleHashingTable(),
             HashTableSeparateChaining(),
+            SwissTable(),
+            IncrementalRehashTable(),
+            ConcurrentHashTable(),
+            ExpiringHashTable(default_ttl=3600),
             BinarySearchTree()
         ]
     
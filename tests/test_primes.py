@@ -0,0 +1,33 @@
+from unittest import TestCase
+from algorithms.primes import is_prime, next_prime
+
+
+def is_prime_naive(n: int) -> bool:
+    if n < 2:
+        return False
+    return all(n % d != 0 for d in range(2, int(n ** 0.5) + 1))
+
+
+class TestPrimes(TestCase):
+    def test_is_prime(self):
+        for n in range(-5, 5000):
+            self.assertEqual(is_prime(n), is_prime_naive(n), n)
+
+        # Strong pseudoprimes to several small bases.
+        for n in [2047, 1373653, 25326001, 3215031751, 2152302898747, 3474749660383, 341550071728321]:
+            self.assertFalse(is_prime(n), n)
+
+        for n in [1572869, 2147483647, 2305843009213693951]:
+            self.assertTrue(is_prime(n), n)
+
+    def test_next_prime(self):
+        self.assertEqual(next_prime(-3), 2)
+        self.assertEqual(next_prime(2), 2)
+        self.assertEqual(next_prime(3), 3)
+        self.assertEqual(next_prime(4), 5)
+        self.assertEqual(next_prime(24), 29)
+        self.assertEqual(next_prime(2 * 1572869 + 1), 3145739)
+        for n in range(0, 1000):
+            p = next_prime(n)
+            self.assertTrue(is_prime_naive(p))
+            self.assertTrue(all(not is_prime_naive(m) for m in range(n, p)))
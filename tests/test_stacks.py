@@ -95,6 +95,21 @@ class TestStack(TestCase):
         roomy_str = '<ArrayStack [0, 1, 2]>'
         self.assertEqual(roomy_str, str(self._roomy_stack))
 
+    def test_resizable(self) -> None:
+        full = ArrayStack(2)
+        full.push(0)
+        full.push(1)
+        self.assertRaises(Exception, lambda: full.push(2))
+
+        stack = ArrayStack(1, resizable=True)
+        for i in range(self.CAPACITY):
+            stack.push(i)
+        self.assertEqual(len(stack), self.CAPACITY)
+        self.assertEqual(str(stack), f'<ArrayStack [{", ".join(str(i) for i in range(self.CAPACITY))}]>')
+        for i in range(self.CAPACITY - 1, -1, -1):
+            self.assertEqual(stack.pop(), i)
+        self.assertTrue(stack.is_empty())
+
 
 class TestLinkedStack(TestCase):
     